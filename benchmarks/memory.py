@@ -0,0 +1,44 @@
+"""
+Measure the memory of the cached legal processes, as parsed dicts and as
+compact records.
+
+    python -m benchmarks.memory [processes]
+"""
+import os
+import sys
+import tracemalloc
+
+from crawler_api.crawlers import TJALCrawler, TJMSCrawler
+from crawler_api.crawlers.parsers import PARSER_BACKENDS
+
+FIXTURES = os.path.join(os.path.dirname(__file__), '..', 'tests', 'crawler', 'fixtures')
+PAGES = (
+    (TJALCrawler, 'tjal.html'),
+    (TJMSCrawler, 'tjms_first_degree.html'),
+    (TJMSCrawler, 'tjms_second_degree.html'),
+)
+
+
+def measure(build, processes):
+    tracemalloc.start()
+    values = [build() for _ in range(processes)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del values
+    return size / processes
+
+
+def main(processes=1000):
+    for crawler_class, fixture in PAGES:
+        with open(os.path.join(FIXTURES, fixture), 'rb') as f:
+            body = f.read()
+        crawler = crawler_class(None, parser_backend=PARSER_BACKENDS['lxml'])
+        parsed = measure(lambda: crawler.parse_body(body, 'utf-8', '1º'), processes)
+        compact = measure(lambda: crawler.compact(crawler.parse_body(body, 'utf-8', '1º')), processes)
+        print(fixture)
+        print(f'  dict: {parsed:.0f} bytes/process')
+        print(f'  record: {compact:.0f} bytes/process')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
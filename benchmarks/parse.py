@@ -0,0 +1,34 @@
+"""
+Compare the parser backends on the crawlers fixtures.
+
+    python -m benchmarks.parse [iterations]
+"""
+import os
+import sys
+import timeit
+
+from crawler_api.crawlers import TJALCrawler, TJMSCrawler
+from crawler_api.crawlers.parsers import PARSER_BACKENDS
+
+FIXTURES = os.path.join(os.path.dirname(__file__), '..', 'tests', 'crawler', 'fixtures')
+PAGES = (
+    (TJALCrawler, 'tjal.html'),
+    (TJMSCrawler, 'tjms_first_degree.html'),
+    (TJMSCrawler, 'tjms_second_degree.html'),
+)
+
+
+def main(iterations=200):
+    for crawler_class, fixture in PAGES:
+        with open(os.path.join(FIXTURES, fixture), 'rb') as f:
+            body = f.read()
+        crawlers = {name: crawler_class(None, parser_backend=backend) for name, backend in PARSER_BACKENDS.items()}
+        assert len({repr(crawler.parse_body(body, 'utf-8', None)) for crawler in crawlers.values()}) == 1
+        print(fixture)
+        for name, crawler in crawlers.items():
+            total = timeit.timeit(lambda: crawler.parse_body(body, 'utf-8', None), number=iterations)
+            print(f'  {name}: {total / iterations * 1000:.3f} ms/page')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
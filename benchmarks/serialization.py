@@ -0,0 +1,44 @@
+"""
+Compare the response model serialization with the fast serialization on a
+large legal process result.
+
+    python -m benchmarks.serialization [updates] [iterations]
+"""
+import os
+import sys
+import timeit
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from crawler_api.crawlers import TJMSCrawler
+from crawler_api.crawlers.parsers import PARSER_BACKENDS
+from crawler_api.models.response import LegalProcessDetailResponse
+
+FIXTURE = os.path.join(os.path.dirname(__file__), '..', 'tests', 'crawler', 'fixtures', 'tjms_second_degree.html')
+
+
+def response_model(content):
+    response = LegalProcessDetailResponse(**content)
+    content = LegalProcessDetailResponse.validate(response.dict(by_alias=True, exclude_unset=True))
+    return JSONResponse(jsonable_encoder(content, by_alias=True, exclude_unset=True)).body
+
+
+def fast_serialization(content):
+    return ORJSONResponse(content).body
+
+
+def main(updates=2000, iterations=20):
+    with open(FIXTURE, 'rb') as f:
+        result = TJMSCrawler(None, parser_backend=PARSER_BACKENDS['lxml']).parse_body(f.read(), 'utf-8', '2º')
+    result['updates'] = (result['updates'] * updates)[:updates]
+    result['parties_involved'] = result['parties_involved'] * (updates // 10)
+    content = {'degrees': [result, result], 'timed_out': []}
+    print(f'{updates} updates by degree, {len(fast_serialization(content))} bytes')
+    for name, serialize in (('response_model', response_model), ('fast', fast_serialization)):
+        total = timeit.timeit(lambda: serialize(content), number=iterations)
+        print(f'  {name}: {total / iterations * 1000:.3f} ms/response')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,42 @@
+"""
+Compare the LegalProcess number validators with the bulk validation on
+random numbers, a fifth of them with a wrong digit.
+
+    python -m benchmarks.validation [numbers]
+"""
+import random
+import sys
+import time
+
+from crawler_api.models.requests import LegalProcess
+from crawler_api.validation import validate_numbers
+
+
+def random_number():
+    number, year, segment, unit, court = (random.randrange(10 ** size) for size in (7, 4, 1, 2, 4))
+    check_digit = 98 - int(f'{number:07}{year:04}{segment}{unit:02}{court:04}00') % 97
+    return f'{number:07}-{check_digit:02}.{year:04}.{segment}.{unit:02}.{court:04}'
+
+
+def validators(numbers):
+    for number in numbers:
+        try:
+            LegalProcess.check_number(number)
+            LegalProcess.check_digit_validation(number)
+        except (ValueError, AssertionError):
+            pass
+
+
+def main(size=1000000):
+    numbers = [random_number() for _ in range(size)]
+    for index in range(0, size, 5):
+        numbers[index] = numbers[index][:-1] + str((int(numbers[index][-1]) + 1) % 10)
+    print(f'{size} numbers')
+    for name, validate in (('validators', validators), ('bulk', validate_numbers)):
+        started_at = time.perf_counter()
+        validate(numbers)
+        print(f'  {name}: {time.perf_counter() - started_at:.3f} s')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,80 @@
+import asyncio
+import logging
+from collections import defaultdict
+from itertools import islice
+
+from crawler_api.crawlers import COURTS
+from crawler_api.crawlers.base import COURT_ERRORS, get_error_message
+from crawler_api.crawlers.scheduler import NORMAL
+from crawler_api.models.requests import get_court
+
+logger = logging.getLogger(__name__)
+
+
+class BatchLookup:
+    """
+    Run many legal process lookups at once, limiting how many crawlers
+    are running in total and how many of them hit the same court.
+    """
+
+    def __init__(self, max_concurrency, court_max_concurrency, crawler_options=None):
+        self.max_concurrency = max_concurrency
+        self.court_max_concurrency = court_max_concurrency
+        self.crawler_options = crawler_options or {}
+        self.loop = None
+        self.semaphore = None
+        self.court_semaphores = None
+
+    def _bind_loop(self):
+        # The semaphores are created on the running loop, not at import time,
+        # and again when the lookups move to another loop
+        loop = asyncio.get_event_loop()
+        if loop is not self.loop:
+            self.loop = loop
+            self.semaphore = asyncio.Semaphore(self.max_concurrency)
+            self.court_semaphores = defaultdict(lambda: asyncio.Semaphore(self.court_max_concurrency))
+
+    async def run(self, session, numbers, timeout=None, priority=NORMAL):
+        return await asyncio.gather(*(self.lookup(session, number, timeout, priority) for number in numbers))
+
+    async def stream(self, session, numbers, timeout=None, priority=NORMAL):
+        """
+        Yield each lookup result as soon as it is done, in completion order.
+        Only `max_concurrency` lookups are scheduled at a time, so the memory
+        does not grow with the amount of numbers.
+        """
+        numbers = iter(numbers)
+        pending = set()
+        try:
+            while True:
+                for number in islice(numbers, self.max_concurrency - len(pending)):
+                    pending.add(asyncio.ensure_future(self.lookup(session, number, timeout, priority)))
+                if not pending:
+                    return
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def lookup(self, session, number, timeout=None, priority=NORMAL):
+        court = get_court(number)
+        try:
+            crawler = COURTS[court](session, **self.crawler_options)
+        except KeyError:
+            return {'number': number, 'error': 'Crawler not implemented'}
+        self._bind_loop()
+        try:
+            async with self.court_semaphores[court], self.semaphore:
+                result = tuple(await crawler.execute(number=number, timeout=timeout, priority=priority))
+        except COURT_ERRORS as error:
+            return {'number': number, 'error': get_error_message(error)}
+        except Exception:
+            logger.exception('Lookup of %s failed', number)
+            return {'number': number, 'error': 'Legal Process lookup failed'}
+        if not result and crawler.timed_out:
+            return {'number': number, 'timed_out': crawler.timed_out, 'error': 'Legal Process request timed out'}
+        if not result:
+            return {'number': number, 'error': 'Legal Process not found'}
+        return {'number': number, 'degrees': result, 'timed_out': crawler.timed_out, 'failed': crawler.failed}
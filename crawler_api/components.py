@@ -0,0 +1,98 @@
+"""
+Crawler components shared by the API and the offline crawl, built from the settings.
+"""
+from crawler_api import settings
+from crawler_api.crawlers.breaker import CircuitBreaker
+from crawler_api.crawlers.cache import ResultCache
+from crawler_api.crawlers.coalescing import SingleFlight
+from crawler_api.crawlers.executor import ParseExecutor
+from crawler_api.crawlers.helper import HostRegistry
+from crawler_api.crawlers.limiter import RateLimiter
+from crawler_api.crawlers.parsers import get_parser_backend
+from crawler_api.crawlers.retry import RetryPolicy
+from crawler_api.crawlers.scheduler import PriorityScheduler
+from crawler_api.crawlers.store import PageStore
+from crawler_api.crawlers.streaming import StreamParse
+from crawler_api.session import HttpAsyncSession
+
+http_async_session = HttpAsyncSession(
+    limit=settings.SESSION_LIMIT,
+    limit_per_host=settings.SESSION_LIMIT_PER_HOST,
+    keepalive_timeout=settings.SESSION_KEEPALIVE_TIMEOUT,
+    dns_cache_ttl=settings.SESSION_DNS_CACHE_TTL,
+    timeout=settings.SESSION_TIMEOUT,
+    connect_timeout=settings.SESSION_CONNECT_TIMEOUT,
+    read_timeout=settings.SESSION_READ_TIMEOUT
+)
+result_cache = (
+    ResultCache(settings.CACHE_TTL, settings.CACHE_NEGATIVE_TTL, settings.CACHE_MAX_ENTRIES)
+    if settings.CACHE_MAX_ENTRIES else None
+)
+single_flight = SingleFlight()
+parse_executor = ParseExecutor(settings.PARSE_EXECUTOR, settings.PARSE_WORKERS)
+retry_policies = HostRegistry(
+    lambda: RetryPolicy(
+        max_attempts=settings.RETRY_MAX_ATTEMPTS,
+        backoff=settings.RETRY_BACKOFF,
+        max_backoff=settings.RETRY_MAX_BACKOFF,
+        statuses=settings.RETRY_STATUSES,
+        hedge_percentile=settings.HEDGE_PERCENTILE
+    )
+)
+circuit_breakers = (
+    HostRegistry(
+        lambda: CircuitBreaker(
+            failure_ratio=settings.BREAKER_FAILURE_RATIO,
+            window=settings.BREAKER_WINDOW,
+            min_calls=settings.BREAKER_MIN_CALLS,
+            open_duration=settings.BREAKER_OPEN_DURATION,
+            half_open_calls=settings.BREAKER_HALF_OPEN_CALLS,
+            slow_call_duration=settings.BREAKER_SLOW_CALL_DURATION
+        )
+    )
+    if settings.BREAKER_WINDOW else None
+)
+rate_limiters = (
+    HostRegistry(
+        lambda: RateLimiter(
+            rate=settings.RATE_LIMIT,
+            burst=settings.RATE_LIMIT_BURST,
+            max_concurrency=settings.RATE_LIMIT_MAX_CONCURRENCY,
+            adaptive=settings.RATE_LIMIT_ADAPTIVE,
+            min_concurrency=settings.RATE_LIMIT_MIN_CONCURRENCY,
+            latency_target=settings.RATE_LIMIT_LATENCY_TARGET
+        )
+    )
+    if settings.RATE_LIMIT or settings.RATE_LIMIT_MAX_CONCURRENCY else None
+)
+schedulers = (
+    HostRegistry(
+        lambda: PriorityScheduler(
+            settings.SCHEDULER_MAX_CONCURRENCY,
+            weights=settings.SCHEDULER_WEIGHTS,
+            reserved=settings.SCHEDULER_RESERVED
+        )
+    )
+    if settings.SCHEDULER_MAX_CONCURRENCY else None
+)
+stream_parse = (
+    StreamParse(marker_max_bytes=settings.STREAM_PARSE_MARKER_BYTES, max_body_size=settings.STREAM_PARSE_MAX_BODY_SIZE)
+    if settings.STREAM_PARSE else None
+)
+parser_backend = get_parser_backend(settings.PARSER_BACKEND)
+page_store = (
+    PageStore(settings.PAGE_STORE_PATH, max_age=settings.PAGE_STORE_MAX_AGE)
+    if settings.PAGE_STORE_PATH else None
+)
+crawler_options = {
+    'cache': result_cache,
+    'single_flight': single_flight,
+    'parse_executor': parse_executor,
+    'retry_policies': retry_policies,
+    'circuit_breakers': circuit_breakers,
+    'rate_limiters': rate_limiters,
+    'stream_parse': stream_parse,
+    'parser_backend': parser_backend,
+    'page_store': page_store,
+    'schedulers': schedulers
+}
@@ -0,0 +1,244 @@
+"""
+Crawl many legal processes without the API, writing each result as a JSON line.
+
+    python -m crawler_api.crawl NUMBERS_FILE [--output results.jsonl.gz] [--checkpoint crawl.checkpoint]
+
+The numbers are read one by line, `-` reads them from the stdin. With a
+checkpoint, a killed crawl run again with the same arguments resumes after
+the last results committed.
+"""
+import argparse
+import asyncio
+import gzip
+import os
+import sys
+import time
+from collections import deque
+from itertools import islice
+
+import orjson
+
+from crawler_api import settings
+from crawler_api.batch import BatchLookup
+from crawler_api.components import crawler_options, http_async_session, parse_executor
+from crawler_api.crawlers.scheduler import BULK
+from crawler_api.serialization import dumps_batch_item
+from crawler_api.validation import validate_numbers
+
+VALIDATE_CHUNK_SIZE = 1000
+
+
+class Checkpoint:
+    """
+    Numbers already crawled and the output size after their results.
+
+    Each commit is a JSON line appended to `path`. A partial line left by a
+    killed crawl is dropped when the checkpoint is loaded.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.done = set()
+        self.offset = 0
+        size = 0
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                for line in f:
+                    try:
+                        commit = orjson.loads(line)
+                    except orjson.JSONDecodeError:
+                        break
+                    self.done.update(commit['numbers'])
+                    self.offset = commit['offset']
+                    size += len(line)
+        self.file = open(path, 'ab')
+        self.file.truncate(size)
+
+    def commit(self, numbers, offset):
+        self.file.write(orjson.dumps({'offset': offset, 'numbers': numbers}) + b'\n')
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class ResultWriter:
+    """
+    Write JSON lines to `path`, gzip compressed when it ends with `.gz`, or to
+    the stdout when it is `-`.
+
+    The file is truncated on `offset`, the size of the last commit. Each
+    commit closes the gzip member, so a compressed file is valid on any
+    committed size.
+    """
+
+    def __init__(self, path, offset=0):
+        self.path = path
+        self.compress = path.endswith('.gz')
+        if path == '-':
+            self.file = sys.stdout.buffer
+            return
+        with open(path, 'ab') as f:
+            f.truncate(offset)
+        self.file = self._open()
+
+    def _open(self):
+        return gzip.open(self.path, 'ab') if self.compress else open(self.path, 'ab')
+
+    def write(self, line):
+        self.file.write(line)
+
+    def commit(self):
+        """
+        Return the output size after the lines written, or None for the stdout.
+        """
+        if self.path == '-':
+            self.file.flush()
+            return None
+        self.file.close()
+        self.file = self._open()
+        return os.path.getsize(self.path)
+
+    def close(self):
+        if self.path == '-':
+            self.file.flush()
+        else:
+            self.file.close()
+
+
+async def crawl(
+        session, numbers, done=(), max_concurrency=50, court_max_concurrency=10, timeout=None, crawler_options=None
+):
+    """
+    Yield the batch result of each number not `done`, in completion order.
+    The invalid numbers are not crawled and their result has the validation error.
+    The court requests wait on the schedulers as bulk requests.
+    """
+    batch_lookup = BatchLookup(max_concurrency, court_max_concurrency, crawler_options=crawler_options)
+    seen = set(done)
+    invalid = deque()
+
+    def valid_numbers():
+        # The numbers are validated by chunks with the vectorized validation
+        remaining = iter(numbers)
+        chunks = iter(lambda: list(islice(remaining, VALIDATE_CHUNK_SIZE)), [])
+        for chunk in chunks:
+            chunk = [number for number in dict.fromkeys(chunk) if number not in seen]
+            seen.update(chunk)
+            if not chunk:
+                continue
+            validation = validate_numbers(chunk)
+            for number, valid, error in zip(chunk, validation.valid, validation.errors):
+                if valid:
+                    yield number
+                else:
+                    invalid.append({'number': number, 'error': error})
+
+    async for item in batch_lookup.stream(session, valid_numbers(), timeout=timeout, priority=BULK):
+        while invalid:
+            yield invalid.popleft()
+        yield item
+    while invalid:
+        yield invalid.popleft()
+
+
+class Progress:
+    """
+    Count the crawled numbers and report the throughput each `report_every` seconds.
+    """
+
+    def __init__(self, report_every=10, clock=time.monotonic):
+        self.report_every = report_every
+        self.clock = clock
+        self.started_at = self.reported_at = clock()
+        self.count = 0
+        self.errors = 0
+
+    def update(self, item):
+        self.count += 1
+        self.errors += item.get('error') is not None
+        now = self.clock()
+        if self.report_every and now - self.reported_at >= self.report_every:
+            self.reported_at = now
+            self.report()
+
+    def report(self):
+        elapsed = self.clock() - self.started_at
+        rate = self.count / elapsed if elapsed else 0
+        print(
+            f'{self.count} numbers crawled ({self.errors} errors) in {elapsed:.1f}s, {rate:.1f} numbers/s',
+            file=sys.stderr
+        )
+
+
+async def run(args, session, crawler_options=None):
+    checkpoint = args.checkpoint and Checkpoint(args.checkpoint)
+    writer = ResultWriter(args.output, offset=checkpoint.offset if checkpoint else 0)
+    progress = Progress(args.report_every)
+    committing = []
+
+    def commit():
+        offset = writer.commit()
+        if checkpoint:
+            checkpoint.commit(committing, offset)
+        committing.clear()
+
+    numbers_file = sys.stdin if args.numbers == '-' else open(args.numbers)
+    try:
+        numbers = (line.strip() for line in numbers_file if line.strip())
+        async for item in crawl(
+                session,
+                numbers,
+                done=checkpoint.done if checkpoint else (),
+                max_concurrency=args.concurrency,
+                court_max_concurrency=args.court_concurrency,
+                timeout=args.timeout,
+                crawler_options=crawler_options
+        ):
+            writer.write(dumps_batch_item(item))
+            committing.append(item['number'])
+            progress.update(item)
+            if len(committing) >= args.commit_every:
+                commit()
+        if committing:
+            commit()
+    finally:
+        writer.close()
+        if checkpoint:
+            checkpoint.close()
+        if numbers_file is not sys.stdin:
+            numbers_file.close()
+    progress.report()
+
+
+async def start(args):
+    http_async_session.start()
+    try:
+        await run(args, http_async_session(), crawler_options)
+    finally:
+        await http_async_session.stop()
+        parse_executor.shutdown()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Crawl many legal processes and write the results as JSON lines')
+    parser.add_argument('numbers', help='File with a legal process number by line. `-` reads the stdin')
+    parser.add_argument(
+        '--output', default='-', help='JSON lines output file, gzip compressed on `.gz`. Default is the stdout'
+    )
+    parser.add_argument('--checkpoint', help='File of the numbers already crawled, to resume a killed crawl')
+    parser.add_argument('--concurrency', type=int, default=settings.BATCH_MAX_CONCURRENCY, help='Max lookups at once')
+    parser.add_argument(
+        '--court-concurrency', type=int, default=settings.BATCH_COURT_MAX_CONCURRENCY, help='Max lookups at once by court'
+    )
+    parser.add_argument('--timeout', type=float, default=settings.REQUEST_TIMEOUT, help='Seconds to wait for each lookup')
+    parser.add_argument('--commit-every', type=int, default=1000, help='Results written between checkpoint commits')
+    parser.add_argument('--report-every', type=float, default=10, help='Seconds between throughput reports. 0 disables them')
+    args = parser.parse_args(argv)
+    if args.checkpoint and args.output == '-':
+        parser.error('--checkpoint requires --output')
+    asyncio.run(start(args))
+
+
+if __name__ == "__main__":
+    main()
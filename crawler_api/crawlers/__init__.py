@@ -1,3 +1,4 @@
+from crawler_api.crawlers.helper import get_origin
 from crawler_api.crawlers.tjal import TJALCrawler
 from crawler_api.crawlers.tjms import TJMSCrawler
 
@@ -5,3 +6,7 @@ COURTS = {
     '02': TJALCrawler,
     '12': TJMSCrawler
 }
+
+
+def get_court_origins():
+    return sorted({get_origin(url) for crawler in COURTS.values() for url in crawler.paths.values()})
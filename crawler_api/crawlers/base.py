@@ -1,25 +1,270 @@
 import asyncio
+import hashlib
 from abc import ABC, abstractmethod
+from functools import partial
+from typing import NamedTuple, Optional, Tuple
 
-from parsel import Selector
+from aiohttp import ClientError
+
+from crawler_api.crawlers.breaker import CircuitOpenError
+from crawler_api.crawlers.cache import MISSING
+from crawler_api.crawlers.helper import get_origin
+from crawler_api.crawlers.parsers import DEFAULT_PARSE_OPTIONS, SECTIONS, ParseOptions, get_parser_backend
+from crawler_api.crawlers.retry import RETRY_STATUSES, UpstreamError
+from crawler_api.crawlers.scheduler import NORMAL
+from crawler_api.crawlers.streaming import PageTooLargeError
+
+COURT_ERRORS = (CircuitOpenError, PageTooLargeError, UpstreamError, ClientError, asyncio.TimeoutError)
+
+
+def get_error_message(error):
+    """
+    Return the message of a court request error, one of COURT_ERRORS.
+    """
+    if isinstance(error, CircuitOpenError):
+        return 'Court unavailable'
+    if isinstance(error, PageTooLargeError):
+        return 'Court page too large'
+    if isinstance(error, UpstreamError):
+        return str(error)
+    return f'Court request failed: {error.__class__.__name__}'
+
+
+class RefreshState(NamedTuple):
+    """
+    What is known about a legal process degree page: its latest update
+    (date, description), content hash and HTTP validators.
+    """
+
+    latest_update: Optional[Tuple[str, str]] = None
+    content_hash: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
 
 
 class BaseCrawler(ABC):
+    court = None
     paths = {}
+    detail_marker = None
+    encoding = 'utf-8'
 
-    def __init__(self, session):
+    def __init__(
+            self,
+            session,
+            cache=None,
+            single_flight=None,
+            parse_executor=None,
+            retry_policies=None,
+            circuit_breakers=None,
+            rate_limiters=None,
+            stream_parse=None,
+            parser_backend=None,
+            page_store=None,
+            schedulers=None
+    ):
         self.session = session
+        self.cache = cache
+        self.single_flight = single_flight
+        self.parse_executor = parse_executor
+        self.retry_policies = retry_policies
+        self.circuit_breakers = circuit_breakers
+        self.rate_limiters = rate_limiters
+        self.stream_parse = stream_parse
+        self.parser_backend = parser_backend or get_parser_backend('parsel')
+        self.page_store = page_store
+        self.schedulers = schedulers
+        self.timed_out = []
+        self.failed = {}
+
+    async def execute(
+            self, timeout=None, degrees=None, include=SECTIONS, updates_limit=None, priority=NORMAL, **kwargs
+    ):
+        """
+        Request and parse the `degrees` paths, or all of them when it is None.
+        The paths not done after `timeout` seconds are cancelled and their ids
+        are kept on `timed_out`. The error message of each path whose court
+        request failed is kept on `failed`, and the first error is raised
+        only when no path has a result.
+        Only the `include` sections and the first `updates_limit` updates are parsed.
+        The requests wait their turn on the court scheduler as `priority`.
+        """
+        options = ParseOptions(frozenset(include), updates_limit)
+        return await self._run(
+            {
+                _id: self._start_request(_id, url, options=options, priority=priority, **kwargs)
+                for _id, url in self.paths.items()
+                if degrees is None or _id in degrees
+            },
+            timeout
+        )
+
+    async def refresh(self, known, timeout=None, priority=NORMAL, **kwargs):
+        """
+        Request again the `known` degrees, a dict of RefreshState by degree,
+        and return only the updates newer than their latest update.
+        The page is not parsed when the court answers the conditional request
+        with 304 or when its content hash is the known one.
+        """
+        coroutines = {}
+        for _id, state in known.items():
+            if _id in self.paths:
+                url = self.paths[_id].format(**kwargs)
+                coroutines[_id] = self._schedule(priority, url, self._refresh, _id, url, state)
+        return await self._run(coroutines, timeout)
+
+    async def _run(self, coroutines, timeout):
+        tasks = {_id: asyncio.ensure_future(coroutine) for _id, coroutine in coroutines.items()}
+        if tasks:
+            await asyncio.wait(tasks.values(), timeout=timeout)
+        self.timed_out = [_id for _id, task in tasks.items() if not task.done()]
+        for _id in self.timed_out:
+            tasks.pop(_id).cancel()
+        self.failed = {}
+        result = []
+        errors = []
+        for _id, task in tasks.items():
+            error = task.exception()
+            if error is None:
+                result.append(task.result())
+            elif isinstance(error, COURT_ERRORS):
+                self.failed[_id] = get_error_message(error)
+                errors.append(error)
+            else:
+                raise error
+        result = [item for item in result if item]
+        if errors and not result:
+            raise errors[0]
+        return iter(result)
+
+    async def _start_request(self, _id, url, options=DEFAULT_PARSE_OPTIONS, priority=NORMAL, **kwargs):
+        url = url.format(**kwargs)
+        if self.cache is not None:
+            result = self.cache.get((url, options))
+            if result is not MISSING:
+                return self.expand(result)
+        number = kwargs.get('number')
+        # Only the shared call waits on the scheduler, the coalesced callers do not take a slot
+        request = partial(self._schedule, priority, url, self._request)
+        if self.single_flight is not None:
+            return await self.single_flight.do((url, options), request, _id, url, options, number)
+        return await request(_id, url, options, number)
+
+    def _schedule(self, priority, url, request, *args):
+        if self.schedulers is None:
+            return request(*args)
+        return self.schedulers[get_origin(url)].call(priority, request, *args)
+
+    async def _request(self, _id, url, options=DEFAULT_PARSE_OPTIONS, number=None):
+        loop = asyncio.get_event_loop()
+        use_page_store = self.page_store is not None and self.stream_parse is None and number is not None
+        page = use_page_store and await loop.run_in_executor(None, self.page_store.get, self.court, _id, number)
+        if page:
+            body, encoding = page
+        else:
+            status, body, encoding, _ = await self._fetch_with_policies(url)
+            if use_page_store and status == 200 and body is not None:
+                await loop.run_in_executor(None, self.page_store.put, self.court, _id, number, body, encoding)
+        if body is None:
+            result = None
+        elif self.stream_parse is not None:
+            result = self.parse(self.parser_backend.from_root(body), _id=_id, options=options)
+        elif self.parse_executor is not None:
+            result = await self.parse_executor.parse(self, body, encoding, _id, options)
+        else:
+            result = self.parse_body(body, encoding, _id, options)
+        if self.cache is not None:
+            self.cache.set((url, options), self.compact(result))
+        return result
+
+    async def _refresh(self, _id, url, state):
+        headers = {}
+        if state.etag:
+            headers['If-None-Match'] = state.etag
+        if state.last_modified:
+            headers['If-Modified-Since'] = state.last_modified
+        status, body, encoding, validators = await self._fetch_with_policies(url, headers)
+        result = {
+            'degree': _id,
+            'modified': False,
+            'content_hash': state.content_hash,
+            'etag': validators['etag'] or state.etag,
+            'last_modified': validators['last_modified'] or state.last_modified,
+            'updates': []
+        }
+        if status == 304:
+            return result
+        if body is None:
+            return None
+        options = ParseOptions(include=frozenset(['updates']), updates_since=state.latest_update)
+        if self.stream_parse is not None:
+            result['content_hash'] = None
+            parsed = self.parse(self.parser_backend.from_root(body), _id=_id, options=options)
+        else:
+            result['content_hash'] = hashlib.sha256(body).hexdigest()
+            if result['content_hash'] == state.content_hash:
+                return result
+            if self.parse_executor is not None:
+                parsed = await self.parse_executor.parse(self, body, encoding, _id, options)
+            else:
+                parsed = self.parse_body(body, encoding, _id, options)
+        return parsed and {**result, 'modified': True, 'updates': parsed['updates']}
+
+    async def _fetch_with_policies(self, url, *args):
+        """
+        Fetch `url` through the court policies. Raise UpstreamError when the
+        last response still has a retryable or server error status, so its
+        error page is never parsed, cached or stored.
+        """
+        origin = get_origin(url)
+        fetch = self._fetch
+        if self.circuit_breakers is not None:
+            fetch = partial(self.circuit_breakers[origin].call, fetch)
+        if self.rate_limiters is not None:
+            fetch = partial(self.rate_limiters[origin].call, fetch)
+        if self.circuit_breakers is not None:
+            # Each attempt is rejected before waiting on the rate limiter while the circuit is open
+            fetch = partial(self.circuit_breakers[origin].guard, fetch)
+        if self.retry_policies is not None:
+            fetch = partial(self.retry_policies[origin].call, fetch)
+        response = await fetch(url, *args)
+        statuses = self.retry_policies[origin].statuses if self.retry_policies is not None else RETRY_STATUSES
+        if response[0] in statuses or response[0] >= 500:
+            raise UpstreamError(response[0])
+        return response
+
+    async def _fetch(self, url, headers=None):
+        """
+        Return the response status, body, encoding and validators
+        (ETag and Last-Modified headers).
+        """
+        request = self.session.get(url) if headers is None else self.session.get(url, headers=headers)
+        async with request as response:
+            validators = {'etag': response.headers.get('ETag'), 'last_modified': response.headers.get('Last-Modified')}
+            status = response.status
+            if status == 304:
+                return status, None, None, validators
+            if self.stream_parse is not None:
+                encoding = response.charset or self.encoding
+                document = await self.stream_parse.read(response, self.detail_marker, encoding)
+                return status, document, encoding, validators
+            body = await response.read()
+            return status, body, response.get_encoding(), validators
+
+    def parse_body(self, body, encoding, _id, options=DEFAULT_PARSE_OPTIONS):
+        return self.parse(self.parser_backend.document(body, encoding), _id=_id, options=options)
 
-    async def execute(self, **kwargs):
-        task = [self._start_request(_id, url, **kwargs) for _id, url in self.paths.items()]
-        result = await asyncio.gather(*task)
-        return (item for item in result if item)
+    def compact(self, result):
+        """
+        Return the representation of a parsed `result` kept in the cache.
+        """
+        return result
 
-    async def _start_request(self, _id, url, **kwargs):
-        async with self.session.get(url.format(**kwargs)) as response:
-            data = await response.text()
-        return self.parse(Selector(text=data), _id=_id)
+    def expand(self, value):
+        """
+        Return the parsed result of a cached `value`.
+        """
+        return value
 
     @abstractmethod
-    def parse(self, data, _id):
+    def parse(self, data, _id, options=DEFAULT_PARSE_OPTIONS):
         raise NotImplementedError
@@ -0,0 +1,122 @@
+import asyncio
+import time
+from collections import deque
+
+from aiohttp import ClientError
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Stop calling a court while its latest calls are failing.
+
+    The circuit opens when the failure ratio of the last `window` calls reaches
+    `failure_ratio`. A call fails on connection errors, 5xx status or when it
+    takes longer than `slow_call_duration`. While open, calls raise
+    CircuitOpenError. After `open_duration` seconds, `half_open_calls` probes
+    are allowed and their result closes or opens the circuit again.
+    """
+
+    def __init__(
+            self,
+            failure_ratio=0.5,
+            window=20,
+            min_calls=10,
+            open_duration=30,
+            half_open_calls=1,
+            slow_call_duration=None,
+            clock=time.monotonic
+    ):
+        self.failure_ratio = failure_ratio
+        self.min_calls = min_calls
+        self.open_duration = open_duration
+        self.half_open_calls = half_open_calls
+        self.slow_call_duration = slow_call_duration
+        self.clock = clock
+        self.calls = deque(maxlen=window)
+        self.state = CLOSED
+        self.opened_at = None
+        self.probes = 0
+        self.rejected = 0
+
+    async def call(self, function, *args):
+        """
+        `function` must return a tuple starting with the response status.
+        """
+        self._before_call()
+        started_at = self.clock()
+        try:
+            result = await function(*args)
+        except (ClientError, asyncio.TimeoutError):
+            self._after_call(failed=True)
+            raise
+        except BaseException:
+            self._release_probe()
+            raise
+        slow = self.slow_call_duration is not None and self.clock() - started_at > self.slow_call_duration
+        self._after_call(failed=slow or result[0] >= 500)
+        return result
+
+    async def guard(self, function, *args):
+        """
+        Raise CircuitOpenError before calling `function` when the circuit
+        rejects calls, so a rejected call does not wait on the policies
+        wrapped by `function`. The call is not counted by the circuit.
+        """
+        if self._rejects():
+            self.rejected += 1
+            raise CircuitOpenError('Circuit breaker is open')
+        return await function(*args)
+
+    def _rejects(self):
+        if self.state == OPEN:
+            return self.clock() - self.opened_at < self.open_duration
+        return self.state == HALF_OPEN and self.probes >= self.half_open_calls
+
+    def _before_call(self):
+        if self.state == OPEN and self.clock() - self.opened_at >= self.open_duration:
+            self.state = HALF_OPEN
+            self.probes = 0
+        if self._rejects():
+            self.rejected += 1
+            raise CircuitOpenError('Circuit breaker is open')
+        if self.state == HALF_OPEN:
+            self.probes += 1
+
+    def _release_probe(self):
+        if self.state == HALF_OPEN:
+            self.probes -= 1
+
+    def _after_call(self, failed):
+        if self.state == HALF_OPEN:
+            if failed:
+                self._open()
+            else:
+                self._close()
+            return
+        self.calls.append(failed)
+        if len(self.calls) >= self.min_calls and sum(self.calls) / len(self.calls) >= self.failure_ratio:
+            self._open()
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = self.clock()
+
+    def _close(self):
+        self.state = CLOSED
+        self.calls.clear()
+
+    def stats(self):
+        return {
+            'state': self.state,
+            'calls': len(self.calls),
+            'failures': sum(self.calls),
+            'rejected': self.rejected
+        }
@@ -0,0 +1,55 @@
+import time
+from collections import OrderedDict
+
+MISSING = object()
+
+
+class ResultCache:
+    """
+    In memory LRU cache for crawler results with a TTL for each entry.
+    Empty results (legal process not found) use the `negative_ttl`.
+    """
+
+    def __init__(self, ttl, negative_ttl, max_entries, clock=time.monotonic):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        try:
+            expires_at, value = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            return MISSING
+        if expires_at <= self.clock():
+            del self.entries[key]
+            self.misses += 1
+            return MISSING
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value):
+        ttl = self.ttl if value else self.negative_ttl
+        self.entries[key] = (self.clock() + ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self):
+        return {
+            'size': len(self.entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
@@ -0,0 +1,33 @@
+import asyncio
+
+
+class SingleFlight:
+    """
+    Share one in flight call between all concurrent callers of the same key.
+    The shared call is shielded, so cancelling a caller does not cancel it.
+    """
+
+    def __init__(self):
+        self.calls = {}
+        self.coalesced = 0
+
+    async def do(self, key, function, *args, **kwargs):
+        try:
+            future = self.calls[key]
+            self.coalesced += 1
+        except KeyError:
+            future = self.calls[key] = asyncio.ensure_future(function(*args, **kwargs))
+            future.add_done_callback(lambda _: self._done(key, future))
+        return await asyncio.shield(future)
+
+    def _done(self, key, future):
+        if self.calls.get(key) is future:
+            del self.calls[key]
+        if not future.cancelled():
+            future.exception()
+
+    def stats(self):
+        return {
+            'in_flight': len(self.calls),
+            'coalesced': self.coalesced
+        }
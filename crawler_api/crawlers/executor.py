@@ -0,0 +1,44 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from crawler_api.crawlers.parsers import DEFAULT_PARSE_OPTIONS
+
+EXECUTORS = {
+    'inline': None,
+    'thread': ThreadPoolExecutor,
+    'process': ProcessPoolExecutor
+}
+
+
+def parse_page(crawler_class, parser_backend, body, encoding, _id, options=DEFAULT_PARSE_OPTIONS):
+    return crawler_class(None, parser_backend=parser_backend).parse_body(body, encoding, _id, options)
+
+
+class ParseExecutor:
+    """
+    Run the crawlers parse out of the event loop.
+    The `process` mode sends only the crawler class, its parser backend and
+    the raw page to the workers and gets back the parsed dict.
+    """
+
+    def __init__(self, mode='inline', max_workers=None):
+        try:
+            executor_class = EXECUTORS[mode]
+        except KeyError:
+            raise ValueError(f'Invalid parse executor mode: {mode}. Options: {", ".join(EXECUTORS)}')
+        self.mode = mode
+        self.executor = executor_class and executor_class(max_workers)
+
+    async def parse(self, crawler, body, encoding, _id, options=DEFAULT_PARSE_OPTIONS):
+        if self.executor is None:
+            return crawler.parse_body(body, encoding, _id, options)
+        loop = asyncio.get_event_loop()
+        if self.mode == 'process':
+            return await loop.run_in_executor(
+                self.executor, parse_page, type(crawler), crawler.parser_backend, body, encoding, _id, options
+            )
+        return await loop.run_in_executor(self.executor, crawler.parse_body, body, encoding, _id, options)
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown()
@@ -0,0 +1,132 @@
+import re
+from itertools import islice, takewhile
+
+from lxml import etree
+
+from crawler_api.crawlers.helper import sanitize_string
+from crawler_api.crawlers.parsers import DEFAULT_PARSE_OPTIONS
+
+PARTIES_INVOLVED_IDS = ('tableTodasPartes', 'tablePartesPrincipais')
+UPDATES_IDS = ('tabelaTodasMovimentacoes', 'tabelaUltimasMovimentacoes')
+
+
+def compile_xpath(xpath):
+    return etree.XPath(xpath, smart_strings=False)
+
+
+class Field:
+    """
+    A header field of a layout. The `paths` are tried in order until one
+    returns a value and `clean` is applied to the value found.
+    """
+
+    def __init__(self, *paths, clean=None):
+        self.paths = paths
+        self.xpaths = [compile_xpath(path) for path in paths]
+        self.clean = clean
+
+    def extract(self, element):
+        value = None
+        for xpath in self.xpaths:
+            result = xpath(element)
+            value = result[0] if result else None
+            if value:
+                break
+        return self.clean(value) if self.clean and value else value
+
+    def select(self, selector):
+        """
+        Same as `extract` over a parsel Selector, for the parsel backend.
+        """
+        value = None
+        for path in self.paths:
+            value = selector.xpath(path).get()
+            if value:
+                break
+        return self.clean(value) if self.clean and value else value
+
+
+class SoftplanLayout:
+    """
+    Extraction spec of a Softplan (ESAJ) legal process page.
+
+    All the XPaths are compiled on creation. The detail section, the parties
+    table and the updates table are found in a single query over the
+    document and the header fields are looked up only inside the detail.
+    """
+
+    ROWS = compile_xpath('descendant-or-self::tr')
+    CELLS = compile_xpath('./td')
+    PARTY_TYPE = compile_xpath('./span/text()')
+    REPRESENTATIVE_TYPES = compile_xpath('span/text()')
+    TEXTS = compile_xpath('text()[not(preceding-sibling::node()[1][self::br])]')
+    UPDATE_DATE = compile_xpath('.//td[1]/text()')
+    UPDATE_DESCRIPTION = compile_xpath('.//td[3]/*/text()|.//td[3]/text()')
+
+    def __init__(self, detail, fields):
+        self.detail = detail
+        self.fields = fields
+        self.sections = compile_xpath(
+            '|'.join(
+                [detail]
+                + [f'//table[@id="{_id}"]' for _id in PARTIES_INVOLVED_IDS]
+                + [f'//tbody[@id="{_id}"]' for _id in UPDATES_IDS]
+            )
+        )
+
+    def extract(self, root, _id=None, options=DEFAULT_PARSE_OPTIONS):
+        detail = parties_involved = updates = None
+        for element in self.sections(root):
+            element_id = element.get('id')
+            if element.tag == 'table' and element_id in PARTIES_INVOLVED_IDS:
+                parties_involved = element
+            elif element.tag == 'tbody' and element_id in UPDATES_IDS:
+                updates = element
+            elif detail is None:
+                detail = element
+        if detail is None:
+            return None
+        result = self.extract_detail(detail)
+        result['degree'] = _id
+        if 'parties_involved' in options.include:
+            result['parties_involved'] = self.extract_parties_involved(parties_involved)
+        if 'updates' in options.include:
+            result['updates'] = self.extract_updates(updates, options.updates_limit, options.updates_since)
+        return result
+
+    def extract_detail(self, detail):
+        return {name: field.extract(detail) for name, field in self.fields.items()}
+
+    def extract_parties_involved(self, table):
+        if table is None:
+            return []
+        parties_involved = []
+        for tr in self.ROWS(table):
+            td_label, td_value = self.CELLS(tr)
+            type_ = next(iter(self.PARTY_TYPE(td_label)), None)
+            all_texts = [text for text in map(sanitize_string, self.TEXTS(td_value)) if text]
+            all_types = (item for item in map(sanitize_string, self.REPRESENTATIVE_TYPES(td_value)) if item)
+            parties_involved.append({
+                'type': type_ and type_.strip().replace(":", ""),
+                'name': (all_texts and all_texts[0]) or None,
+                'representatives': [
+                    {
+                        'type': re.sub(':|&nbsp', '', item),
+                        'name': all_texts[index]
+                    }
+                    for index, item in enumerate(all_types, start=1)
+                ]
+            })
+        return parties_involved
+
+    def extract_updates(self, tbody, limit=None, since=None):
+        if tbody is None:
+            return []
+        updates = (
+            {
+                'date': sanitize_string(next(iter(self.UPDATE_DATE(row)), None)),
+                'description': " ".join(map(sanitize_string, self.UPDATE_DESCRIPTION(row))).strip()
+            }
+            for row in islice(tbody.iter('tr'), limit)
+        )
+        return list(takewhile(lambda update: (update['date'], update['description']) != since, updates))
@@ -1,5 +1,32 @@
 import re
+from urllib.parse import urlsplit
 
 
 def sanitize_string(string):
     return string and re.sub('\r|\n', ' ', str(string).strip())
+
+
+def clean_value(string):
+    return string and string.replace("  ", "")
+
+
+def get_origin(url):
+    url = urlsplit(url)
+    return f'{url.scheme}://{url.netloc}'
+
+
+class HostRegistry(dict):
+    """
+    Dict of objects by host, created by `factory` on the first access.
+    """
+
+    def __init__(self, factory):
+        super().__init__()
+        self.factory = factory
+
+    def __missing__(self, host):
+        value = self[host] = self.factory()
+        return value
+
+    def stats(self):
+        return {host: value.stats() for host, value in self.items()}
@@ -0,0 +1,130 @@
+import asyncio
+import time
+from collections import deque
+
+OVERLOAD_STATUSES = (429, 503)
+
+
+class RateLimiter:
+    """
+    Limit the requests sent to a court with a token bucket (`rate` requests
+    by second, up to `burst` at once) and a max of concurrent requests.
+
+    In `adaptive` mode the concurrency limit follows AIMD: it grows by
+    `increase` each `concurrency` successful calls and it is multiplied by
+    `decrease` when the court answers 429/503, times out or is slower than
+    `latency_target`.
+    """
+
+    def __init__(
+            self,
+            rate=None,
+            burst=1,
+            max_concurrency=None,
+            adaptive=False,
+            min_concurrency=1,
+            latency_target=None,
+            increase=1,
+            decrease=0.5,
+            clock=time.monotonic
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.adaptive = adaptive and max_concurrency is not None
+        self.min_concurrency = min_concurrency
+        self.latency_target = latency_target
+        self.increase = increase
+        self.decrease = decrease
+        self.clock = clock
+        self.concurrency = max_concurrency
+        self.tokens = burst
+        self.updated_at = clock()
+        self.in_flight = 0
+        self.waiters = deque()
+        self.overloads = 0
+
+    async def call(self, function, *args):
+        """
+        `function` must return a tuple starting with the response status.
+        """
+        await self._acquire_slot()
+        try:
+            await self._acquire_token()
+            started_at = self.clock()
+            try:
+                result = await function(*args)
+            except asyncio.TimeoutError:
+                self._adapt(overloaded=True)
+                raise
+            latency = self.clock() - started_at
+            self._adapt(
+                overloaded=result[0] in OVERLOAD_STATUSES or (
+                    self.latency_target is not None and latency > self.latency_target
+                )
+            )
+            return result
+        finally:
+            self._release_slot()
+
+    @property
+    def limit(self):
+        return self.concurrency and int(self.concurrency)
+
+    async def _acquire_slot(self):
+        while self.limit is not None and self.in_flight >= self.limit:
+            waiter = asyncio.get_event_loop().create_future()
+            self.waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self._wake_up()
+                raise
+            finally:
+                if waiter in self.waiters:
+                    self.waiters.remove(waiter)
+        self.in_flight += 1
+
+    def _release_slot(self):
+        self.in_flight -= 1
+        self._wake_up()
+
+    def _wake_up(self):
+        free_slots = self.limit - self.in_flight if self.limit is not None else len(self.waiters)
+        while self.waiters and free_slots > 0:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free_slots -= 1
+
+    async def _acquire_token(self):
+        if self.rate is None:
+            return
+        while True:
+            now = self.clock()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def _adapt(self, overloaded):
+        if overloaded:
+            self.overloads += 1
+        if not self.adaptive:
+            return
+        if overloaded:
+            self.concurrency = max(self.min_concurrency, self.concurrency * self.decrease)
+        else:
+            self.concurrency = min(self.max_concurrency, self.concurrency + self.increase / self.concurrency)
+            self._wake_up()
+
+    def stats(self):
+        return {
+            'concurrency': self.limit,
+            'in_flight': self.in_flight,
+            'waiting': len(self.waiters),
+            'overloads': self.overloads
+        }
@@ -1,9 +1,24 @@
 import re
+from itertools import takewhile
 
 from crawler_api.crawlers.helper import sanitize_string
+from crawler_api.crawlers.parsers import DEFAULT_PARSE_OPTIONS
+from crawler_api.crawlers.records import LegalProcessRecord
 
 
 class SoftplanTJCrawlerMixin:
+    def parse(self, data, _id=None, options=DEFAULT_PARSE_OPTIONS):
+        return self.parser_backend.parse(self, data, _id, options)
+
+    def compact(self, result):
+        return result and LegalProcessRecord.from_dict(result)
+
+    def expand(self, value):
+        return value and value.to_dict()
+
+    def parse_legal_process_detail(self, data):
+        return {name: field.select(data) for name, field in self.layout.fields.items()}
+
     def parse_parties_involved(self, data):
         trs = data.xpath('//table[@id="tableTodasPartes"]|//table[@id="tablePartesPrincipais"]')
         trs = trs and trs[-1]
@@ -33,10 +48,10 @@ class SoftplanTJCrawlerMixin:
             parties_involved.append(item)
         return parties_involved
 
-    def parse_updates(self, table):
+    def parse_updates(self, table, limit=None, since=None):
         data = table.xpath('//tbody[@id="tabelaTodasMovimentacoes"]|//tbody[@id="tabelaUltimasMovimentacoes"]')
         data = data and data[-1]
-        return [
+        updates = (
             {
                 'date': sanitize_string(row.xpath('.//td[1]/text()').get()),
                 'description': " ".join(
@@ -46,5 +61,6 @@ class SoftplanTJCrawlerMixin:
                     )
                 ).strip()
             }
-            for row in data.css('tr')
-        ]
+            for row in data.css('tr')[:limit]
+        )
+        return list(takewhile(lambda update: (update['date'], update['description']) != since, updates))
@@ -0,0 +1,70 @@
+import codecs
+from typing import FrozenSet, NamedTuple, Optional, Tuple
+
+from lxml import etree
+from parsel import Selector
+
+SECTIONS = frozenset(('parties_involved', 'updates'))
+
+
+class ParseOptions(NamedTuple):
+    """
+    The legal process sections parsed besides the header fields, the max
+    updates parsed and the (date, description) of a known update where the
+    updates parse stops.
+    """
+
+    include: FrozenSet[str] = SECTIONS
+    updates_limit: Optional[int] = None
+    updates_since: Optional[Tuple[str, str]] = None
+
+
+DEFAULT_PARSE_OPTIONS = ParseOptions()
+
+
+class ParselBackend:
+    """
+    Parse the court pages with `parsel.Selector` and the crawlers
+    `parse_selector` method.
+    """
+
+    name = 'parsel'
+
+    def document(self, body, encoding):
+        return Selector(text=body.decode(encoding))
+
+    def from_root(self, root):
+        return Selector(root=root)
+
+    def parse(self, crawler, document, _id, options=DEFAULT_PARSE_OPTIONS):
+        return crawler.parse_selector(document, _id=_id, options=options)
+
+
+class LxmlBackend:
+    """
+    Parse the court pages with raw lxml elements and the crawlers `layout`,
+    without decoding the body or building selector lists.
+    """
+
+    name = 'lxml'
+
+    def document(self, body, encoding):
+        return etree.fromstring(body, parser=etree.HTMLParser(encoding=codecs.lookup(encoding).name))
+
+    def from_root(self, root):
+        return root
+
+    def parse(self, crawler, document, _id, options=DEFAULT_PARSE_OPTIONS):
+        if document is None:
+            return None
+        return crawler.layout.extract(document, _id, options)
+
+
+PARSER_BACKENDS = {backend.name: backend for backend in (ParselBackend(), LxmlBackend())}
+
+
+def get_parser_backend(name):
+    try:
+        return PARSER_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f'Invalid parser backend: {name}. Options: {", ".join(PARSER_BACKENDS)}')
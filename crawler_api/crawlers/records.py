@@ -0,0 +1,96 @@
+import sys
+
+
+def intern(string):
+    return string and sys.intern(string)
+
+
+class Representative:
+    __slots__ = ('type', 'name')
+
+    def __init__(self, type_, name):
+        self.type = intern(type_)
+        self.name = name
+
+    def to_dict(self):
+        return {'type': self.type, 'name': self.name}
+
+
+class Party:
+    __slots__ = ('type', 'name', 'representatives')
+
+    def __init__(self, type_, name, representatives):
+        self.type = intern(type_)
+        self.name = name
+        self.representatives = representatives
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data['type'],
+            data['name'],
+            tuple(Representative(item['type'], item['name']) for item in data['representatives'])
+        )
+
+    def to_dict(self):
+        return {
+            'type': self.type,
+            'name': self.name,
+            'representatives': [representative.to_dict() for representative in self.representatives]
+        }
+
+
+class LegalProcessRecord:
+    """
+    Compact representation of a Softplan legal process result.
+
+    The categorical strings (types, degree, header fields and update dates)
+    are interned, so the repeated values are stored once, and the updates are
+    kept as two tuples instead of one dict by update.
+    """
+
+    __slots__ = (
+        'class_', 'area', 'subject', 'distribution', 'judge', 'value', 'degree',
+        'parties_involved', 'update_dates', 'update_descriptions'
+    )
+
+    @classmethod
+    def from_dict(cls, result):
+        record = cls()
+        record.class_ = intern(result['class'])
+        record.area = intern(result['area'])
+        record.subject = intern(result['subject'])
+        record.distribution = result['distribution']
+        record.judge = intern(result['judge'])
+        record.value = result['value']
+        record.degree = intern(result['degree'])
+        record.parties_involved = None
+        if 'parties_involved' in result:
+            record.parties_involved = tuple(Party.from_dict(item) for item in result['parties_involved'])
+        record.update_dates = record.update_descriptions = None
+        if 'updates' in result:
+            record.update_dates = tuple(intern(item['date']) for item in result['updates'])
+            record.update_descriptions = tuple(item['description'] for item in result['updates'])
+        return record
+
+    def to_dict(self):
+        """
+        Return the result in the crawlers output shape.
+        """
+        result = {
+            'class': self.class_,
+            'area': self.area,
+            'subject': self.subject,
+            'distribution': self.distribution,
+            'judge': self.judge,
+            'value': self.value,
+            'degree': self.degree
+        }
+        if self.parties_involved is not None:
+            result['parties_involved'] = [party.to_dict() for party in self.parties_involved]
+        if self.update_dates is not None:
+            result['updates'] = [
+                {'date': date, 'description': description}
+                for date, description in zip(self.update_dates, self.update_descriptions)
+            ]
+        return result
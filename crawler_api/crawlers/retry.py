@@ -0,0 +1,104 @@
+import asyncio
+import random
+from collections import deque
+
+from aiohttp import ClientError
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class UpstreamError(Exception):
+    """
+    The court answered with an error status after all the attempts.
+    """
+
+    def __init__(self, status):
+        super().__init__(f'Court responded with status {status}')
+        self.status = status
+
+
+class RetryPolicy:
+    """
+    Retry a court request on connection errors and retryable status, waiting
+    an exponential backoff with full jitter between the attempts.
+
+    When `hedge_percentile` is set, a second request is sent if the first one
+    takes longer than that percentile of the latest latencies, and the first
+    successful response wins.
+    """
+
+    def __init__(
+            self,
+            max_attempts=3,
+            backoff=0.2,
+            max_backoff=5,
+            statuses=RETRY_STATUSES,
+            hedge_percentile=None,
+            hedge_min_samples=20,
+            latency_window=200
+    ):
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.statuses = statuses
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.latencies = deque(maxlen=latency_window)
+        self.retries = 0
+        self.hedges = 0
+
+    async def call(self, fetch, *args):
+        """
+        `fetch` must return a tuple starting with the response status.
+        The last response is returned when all attempts got a retryable status.
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                response = await self._hedged_call(fetch, *args)
+            except (ClientError, asyncio.TimeoutError):
+                if attempt == self.max_attempts:
+                    raise
+            else:
+                if response[0] not in self.statuses or attempt == self.max_attempts:
+                    return response
+            self.retries += 1
+            await asyncio.sleep(self.get_backoff(attempt))
+
+    def get_backoff(self, attempt):
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+
+    def get_hedge_delay(self):
+        if not self.hedge_percentile or len(self.latencies) < self.hedge_min_samples:
+            return None
+        latencies = sorted(self.latencies)
+        return latencies[min(len(latencies) - 1, int(len(latencies) * self.hedge_percentile / 100))]
+
+    async def _hedged_call(self, fetch, *args):
+        loop = asyncio.get_event_loop()
+        started_at = loop.time()
+        hedge_delay = self.get_hedge_delay()
+        pending = {asyncio.ensure_future(fetch(*args))}
+        try:
+            if hedge_delay is not None:
+                done, pending = await asyncio.wait(pending, timeout=hedge_delay)
+                if not done:
+                    self.hedges += 1
+                    pending.add(asyncio.ensure_future(fetch(*args)))
+                pending |= done
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                succeeded = [task for task in done if task.exception() is None]
+                if succeeded or not pending:
+                    result = (succeeded or list(done))[0].result()
+                    self.latencies.append(loop.time() - started_at)
+                    return result
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self):
+        return {
+            'retries': self.retries,
+            'hedges': self.hedges,
+            'hedge_delay': self.get_hedge_delay()
+        }
@@ -0,0 +1,101 @@
+import asyncio
+import time
+from collections import deque
+
+INTERACTIVE = 'interactive'
+NORMAL = 'normal'
+BULK = 'bulk'
+PRIORITIES = (INTERACTIVE, NORMAL, BULK)
+DEFAULT_WEIGHTS = {INTERACTIVE: 6, NORMAL: 3, BULK: 1}
+
+
+class PriorityScheduler:
+    """
+    Share the concurrency of a court between priority classes.
+
+    At most `max_concurrency` calls run at once. A free slot goes to the
+    waiting class with the lowest running calls by `weights`, so a class
+    with weight 6 gets six slots for each slot of a class with weight 1
+    while both are waiting. The `reserved` slots of a class are not taken
+    by the other classes, even when it is idle. Calls of the same class run
+    in arrival order.
+    """
+
+    def __init__(self, max_concurrency, weights=None, reserved=None, clock=time.monotonic):
+        for priority in {**(weights or {}), **(reserved or {})}:
+            if priority not in PRIORITIES:
+                raise ValueError(f'Invalid priority: {priority}. Options: {", ".join(PRIORITIES)}')
+        if sum((reserved or {}).values()) > max_concurrency:
+            raise ValueError(f'The reserved slots are more than max_concurrency: {max_concurrency}')
+        self.max_concurrency = max_concurrency
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.reserved = {priority: 0 for priority in PRIORITIES}
+        self.reserved.update(reserved or {})
+        self.clock = clock
+        self.running = {priority: 0 for priority in PRIORITIES}
+        self.waiters = {priority: deque() for priority in PRIORITIES}
+        self.calls = {priority: 0 for priority in PRIORITIES}
+        self.wait_time = {priority: 0.0 for priority in PRIORITIES}
+        self.max_wait_time = {priority: 0.0 for priority in PRIORITIES}
+
+    async def call(self, priority, function, *args):
+        await self._acquire(priority)
+        try:
+            return await function(*args)
+        finally:
+            self._release(priority)
+
+    def _can_run(self, priority):
+        free_slots = self.max_concurrency - sum(self.running.values())
+        reserved_by_others = sum(
+            max(0, self.reserved[other] - self.running[other]) for other in PRIORITIES if other != priority
+        )
+        return free_slots > reserved_by_others
+
+    async def _acquire(self, priority):
+        started_at = self.clock()
+        if not self.waiters[priority] and self._can_run(priority):
+            self.running[priority] += 1
+        else:
+            waiter = asyncio.get_event_loop().create_future()
+            self.waiters[priority].append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self._release(priority)
+                raise
+            finally:
+                if waiter in self.waiters[priority]:
+                    self.waiters[priority].remove(waiter)
+        wait_time = self.clock() - started_at
+        self.calls[priority] += 1
+        self.wait_time[priority] += wait_time
+        self.max_wait_time[priority] = max(self.max_wait_time[priority], wait_time)
+
+    def _release(self, priority):
+        self.running[priority] -= 1
+        self._wake_up()
+
+    def _wake_up(self):
+        while True:
+            candidates = [priority for priority in PRIORITIES if self.waiters[priority] and self._can_run(priority)]
+            if not candidates:
+                return
+            priority = min(candidates, key=lambda candidate: self.running[candidate] / self.weights[candidate])
+            waiter = self.waiters[priority].popleft()
+            if not waiter.done():
+                self.running[priority] += 1
+                waiter.set_result(None)
+
+    def stats(self):
+        return {
+            priority: {
+                'running': self.running[priority],
+                'queued': len(self.waiters[priority]),
+                'calls': self.calls[priority],
+                'mean_wait_time': self.calls[priority] and self.wait_time[priority] / self.calls[priority],
+                'max_wait_time': self.max_wait_time[priority]
+            }
+            for priority in PRIORITIES
+        }
@@ -0,0 +1,127 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+
+class PageStore:
+    """
+    Keep the raw court pages on disk to parse them again without requests.
+
+    The pages are gzip compressed and saved by their sha256, so the same page
+    is stored once. Each fetch is appended to the legal process index with
+    the court, degree, number and fetch time, and the latest entry of each
+    degree is also kept on its own small file, so lookups do not read the
+    whole index.
+
+    When `max_age` is set, `get` returns the latest page of a degree fetched in
+    the last `max_age` seconds and the store works as a persistent cache.
+    """
+
+    def __init__(self, path, max_age=None, clock=time.time):
+        self.path = path
+        self.max_age = max_age
+        self.clock = clock
+
+    def put(self, court, degree, number, body, encoding):
+        digest = hashlib.sha256(body).hexdigest()
+        page_path = self._page_path(digest)
+        if not os.path.exists(page_path):
+            try:
+                self._write(page_path, gzip.compress(body))
+            except OSError:
+                # Another writer may have kept the same page in the meantime
+                if not os.path.exists(page_path):
+                    raise
+        entry = {
+            'court': court,
+            'degree': degree,
+            'number': number,
+            'fetched_at': self.clock(),
+            'digest': digest,
+            'encoding': encoding
+        }
+        index_path = self._index_path(court, number)
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        with open(index_path, 'a') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._write(self._latest_path(court, number, degree), json.dumps(entry, ensure_ascii=False).encode('utf-8'))
+        return entry
+
+    def get(self, court, degree, number):
+        """
+        Return the body and encoding of the latest page not older than
+        `max_age` or None.
+        """
+        if self.max_age is None:
+            return None
+        try:
+            entry = self._read_entry(self._latest_path(court, number, degree))
+        except FileNotFoundError:
+            return None
+        if self.clock() - entry['fetched_at'] > self.max_age:
+            return None
+        return self.read(entry['digest']), entry['encoding']
+
+    def read(self, digest):
+        with open(self._page_path(digest), 'rb') as f:
+            return gzip.decompress(f.read())
+
+    def latest(self, court, number):
+        """
+        Return the latest index entry of each degree of a legal process.
+        """
+        path = self._latest_path(court, number)
+        try:
+            names = sorted(os.listdir(path))
+        except FileNotFoundError:
+            return {}
+        entries = (self._read_entry(os.path.join(path, name)) for name in names)
+        return {entry['degree']: entry for entry in entries}
+
+    def entries(self, court=None):
+        """
+        Yield the latest index entry of each stored legal process degree.
+        """
+        latest_path = os.path.join(self.path, 'latest')
+        if not os.path.isdir(latest_path):
+            return
+        for court_name in [court] if court else sorted(os.listdir(latest_path)):
+            court_path = os.path.join(latest_path, court_name)
+            if not os.path.isdir(court_path):
+                continue
+            for number in sorted(os.listdir(court_path)):
+                yield from self.latest(court_name, number).values()
+
+    def _write(self, path, data):
+        """
+        Write a file through a unique temporary file on the same directory,
+        so concurrent writers never see or leave a partial file.
+        """
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temporary_path = tempfile.mkstemp(suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temporary_path, path)
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+
+    @staticmethod
+    def _read_entry(path):
+        with open(path, 'rb') as f:
+            return json.loads(f.read())
+
+    def _page_path(self, digest):
+        return os.path.join(self.path, 'pages', digest[:2], f'{digest}.html.gz')
+
+    def _index_path(self, court, number):
+        return os.path.join(self.path, 'index', court, f'{number}.jsonl')
+
+    def _latest_path(self, court, number, degree=None):
+        path = os.path.join(self.path, 'latest', court, number)
+        return os.path.join(path, f'{degree}.json') if degree is not None else path
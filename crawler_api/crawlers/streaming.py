@@ -0,0 +1,53 @@
+import codecs
+
+from lxml import etree
+
+
+class PageTooLargeError(Exception):
+    pass
+
+
+def match_marker(element, marker):
+    tag, attributes = marker
+    return element.tag == tag and all(element.get(name) == value for name, value in attributes.items())
+
+
+class StreamParse:
+    """
+    Build the lxml document while the court page is downloaded, without
+    decoding the whole body first.
+
+    The download is aborted when the crawler `marker` (the element that only
+    exists on found legal process pages) is not seen on the first
+    `marker_max_bytes`, or when the page is bigger than `max_body_size`.
+    """
+
+    def __init__(self, marker_max_bytes=None, max_body_size=None, chunk_size=16384):
+        self.marker_max_bytes = marker_max_bytes
+        self.max_body_size = max_body_size
+        self.chunk_size = chunk_size
+
+    async def read(self, response, marker, encoding):
+        """
+        Return the document root or None when the page is not found.
+        """
+        parser = etree.HTMLPullParser(events=('start',), encoding=codecs.lookup(encoding).name)
+        found = marker is None
+        size = 0
+        async for chunk in response.content.iter_chunked(self.chunk_size):
+            size += len(chunk)
+            if self.max_body_size is not None and size > self.max_body_size:
+                response.close()
+                raise PageTooLargeError(f'Court page bigger than {self.max_body_size} bytes')
+            parser.feed(chunk)
+            events = parser.read_events()
+            if not found:
+                found = any(match_marker(element, marker) for _, element in events)
+            for _ in events:
+                pass
+            if not found and self.marker_max_bytes is not None and size >= self.marker_max_bytes:
+                response.close()
+                return None
+        if not found:
+            return None
+        return parser.close()
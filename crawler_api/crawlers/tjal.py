@@ -1,8 +1,12 @@
 from crawler_api.crawlers.base import BaseCrawler
+from crawler_api.crawlers.extraction import Field, SoftplanLayout
+from crawler_api.crawlers.helper import clean_value
 from crawler_api.crawlers.mixins import SoftplanTJCrawlerMixin
+from crawler_api.crawlers.parsers import DEFAULT_PARSE_OPTIONS
 
 
 class TJALCrawler(SoftplanTJCrawlerMixin, BaseCrawler):
+    court = 'tjal'
     paths = {
         '1º': (
             'https://www2.tjal.jus.br/cpopg/search.do?cbPesquisa=NUMPROC&'
@@ -13,29 +17,29 @@ class TJALCrawler(SoftplanTJCrawlerMixin, BaseCrawler):
             'tipoNuProcesso=UNIFICADO&dePesquisaNuUnificado={number}'
         )
     }
+    detail_marker = ('table', {'class': 'secaoFormBody', 'id': ''})
+    layout = SoftplanLayout(
+        detail="//table[@class='secaoFormBody'][@id='']",
+        fields={
+            'class': Field(".//tr[td[label[contains(text(), 'Classe')]]]/td[2]//span//span/text()"),
+            'area': Field(".//tr/td[span[contains(text(), 'Área:')]]/text()[2]", clean=str.strip),
+            'subject': Field(".//tr[td[label[contains(text(), 'Assunto')]]]/td[2]//span/text()"),
+            'distribution': Field(".//tr[td[label[contains(text(), 'Distribuição')]]]/td[2]//span/text()"),
+            'judge': Field(".//tr[td[label[contains(text(), 'Juiz')]]]/td[2]//span/text()"),
+            'value': Field(".//tr[td[label[contains(text(), 'Valor da ação')]]]/td[2]//span/text()", clean=clean_value)
+        }
+    )
 
-    def parse(self, data, _id=None):
-        form_detail = data.xpath("//table[@class='secaoFormBody'][ @id='']")
+    def parse_selector(self, data, _id=None, options=DEFAULT_PARSE_OPTIONS):
+        form_detail = data.xpath(self.layout.detail)
         if not form_detail:
             return
         result = self.parse_legal_process_detail(form_detail[0])
         result['degree'] = _id
-        result['parties_involved'] = self.parse_parties_involved(data)
-        result['updates'] = self.parse_updates(data)
+        if 'parties_involved' in options.include:
+            result['parties_involved'] = self.parse_parties_involved(data)
+        if 'updates' in options.include:
+            result['updates'] = self.parse_updates(
+                data, limit=options.updates_limit, since=options.updates_since
+            )
         return result
-
-    def parse_legal_process_detail(self, data):
-        class_ = data.xpath(".//tr[td[label[contains(text(), 'Classe')]]]/td[2]//span//span/text()").get()
-        area = data.xpath(".//tr/td[span[contains(text(), 'Área:')]]/text()[2]").get()
-        subject = data.xpath(".//tr[td[label[contains(text(), 'Assunto')]]]/td[2]//span/text()").get()
-        distribution = data.xpath(".//tr[td[label[contains(text(), 'Distribuição')]]]/td[2]//span/text()").get()
-        judge = data.xpath(".//tr[td[label[contains(text(), 'Juiz')]]]/td[2]//span/text()").get()
-        value = data.xpath(".//tr[td[label[contains(text(), 'Valor da ação')]]]/td[2]//span/text()").get()
-        return {
-            "class": class_,
-            "area": area and area.strip(),
-            "subject": subject,
-            "distribution": distribution,
-            "judge": judge,
-            "value": value and value.replace("  ", "")
-        }
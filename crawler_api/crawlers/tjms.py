@@ -1,8 +1,12 @@
 from crawler_api.crawlers.base import BaseCrawler
+from crawler_api.crawlers.extraction import Field, SoftplanLayout
+from crawler_api.crawlers.helper import clean_value
 from crawler_api.crawlers.mixins import SoftplanTJCrawlerMixin
+from crawler_api.crawlers.parsers import DEFAULT_PARSE_OPTIONS
 
 
 class TJMSCrawler(SoftplanTJCrawlerMixin, BaseCrawler):
+    court = 'tjms'
     paths = {
         '1º': (
             'https://esaj.tjms.jus.br/cpopg5/search.do?cbPesquisa=NUMPROC&'
@@ -13,30 +17,33 @@ class TJMSCrawler(SoftplanTJCrawlerMixin, BaseCrawler):
             'tipoNuProcesso=UNIFICADO&dePesquisaNuUnificado={number}'
         )
     }
+    detail_marker = ('div', {'class': 'unj-entity-header'})
+    layout = SoftplanLayout(
+        detail="//div[@class='unj-entity-header']",
+        fields={
+            'class': Field(".//div[span[contains(text(), 'Classe')]]/div/span/text()"),
+            'area': Field(".//div[span[contains(text(), 'Área')]]/div/span/text()"),
+            'subject': Field(".//div[span[contains(text(), 'Assunto')]]/div/span/text()"),
+            'distribution': Field(".//div[span[contains(text(), 'Distribuição')]]/div/text()"),
+            'judge': Field(".//div[span[contains(text(), 'Juiz')]]/div/span/text()"),
+            'value': Field(
+                ".//div[span[contains(text(), 'Valor da ação')]]/div/text()",
+                ".//div[span[contains(text(), 'Valor da ação')]]/div/span/text()",
+                clean=clean_value
+            )
+        }
+    )
 
-    def parse(self, data, _id=None):
-        div_header = data.xpath("//div[@class='unj-entity-header']")
+    def parse_selector(self, data, _id=None, options=DEFAULT_PARSE_OPTIONS):
+        div_header = data.xpath(self.layout.detail)
         if not div_header:
             return
         result = self.parse_legal_process_detail(div_header)
         result['degree'] = _id
-        result['parties_involved'] = self.parse_parties_involved(data)
-        result['updates'] = self.parse_updates(data)
+        if 'parties_involved' in options.include:
+            result['parties_involved'] = self.parse_parties_involved(data)
+        if 'updates' in options.include:
+            result['updates'] = self.parse_updates(
+                data, limit=options.updates_limit, since=options.updates_since
+            )
         return result
-
-    def parse_legal_process_detail(self, data):
-        class_ = data.xpath(".//div[span[contains(text(), 'Classe')]]/div/span/text()").get()
-        area = data.xpath(".//div[span[contains(text(), 'Área')]]/div/span/text()").get()
-        subject = data.xpath(".//div[span[contains(text(), 'Assunto')]]/div/span/text()").get()
-        distribution = data.xpath(".//div[span[contains(text(), 'Distribuição')]]/div/text()").get()
-        judge = data.xpath(".//div[span[contains(text(), 'Juiz')]]/div/span/text()").get()
-        value_div = data.xpath(".//div[span[contains(text(), 'Valor da ação')]]")
-        value = value_div.xpath('./div/text()').get() or value_div.xpath('./div/span/text()').get()
-        return {
-            "class": class_,
-            "area": area,
-            "subject": subject,
-            "distribution": distribution,
-            "judge": judge,
-            "value": value and value.replace("  ", "")
-        }
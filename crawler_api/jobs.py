@@ -0,0 +1,273 @@
+import asyncio
+import logging
+import sqlite3
+import time
+import uuid
+from collections import OrderedDict
+from itertools import islice
+
+import orjson
+
+from crawler_api.crawlers.scheduler import BULK
+from crawler_api.serialization import get_batch_item
+
+logger = logging.getLogger(__name__)
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+FINISHED = (DONE, FAILED)
+
+
+class MemoryJobStore:
+    """
+    Keep the jobs in memory. They are lost when the API stops.
+    """
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self.jobs = {}
+        self.job_numbers = {}
+        self.job_results = {}
+        self.finished_at = {}
+
+    def create(self, job_id, numbers):
+        self.jobs[job_id] = {'id': job_id, 'status': PENDING, 'total': len(numbers), 'created_at': self.clock()}
+        self.job_numbers[job_id] = numbers
+        self.job_results[job_id] = OrderedDict()
+
+    def get(self, job_id):
+        if job_id not in self.jobs:
+            return None
+        return {**self.jobs[job_id], 'done': len(self.job_results[job_id])}
+
+    def set_status(self, job_id, status):
+        self.jobs[job_id]['status'] = status
+        if status in FINISHED:
+            self.finished_at[job_id] = self.clock()
+        else:
+            self.finished_at.pop(job_id, None)
+
+    def add_result(self, job_id, item):
+        self.job_results[job_id][item['number']] = get_batch_item(item)
+
+    def results(self, job_id, offset=0, limit=None):
+        return list(islice(self.job_results[job_id].values(), offset, None if limit is None else offset + limit))
+
+    def pending_numbers(self, job_id):
+        results = self.job_results[job_id]
+        return [number for number in self.job_numbers[job_id] if number not in results]
+
+    def unfinished(self):
+        return [job_id for job_id, job in self.jobs.items() if job['status'] not in FINISHED]
+
+    def purge(self, max_age):
+        """
+        Remove the jobs finished more than `max_age` seconds ago.
+        """
+        before = self.clock() - max_age
+        for job_id in [job_id for job_id, finished_at in self.finished_at.items() if finished_at < before]:
+            for jobs in (self.jobs, self.job_numbers, self.job_results, self.finished_at):
+                del jobs[job_id]
+
+
+class SQLiteJobStore:
+    """
+    Keep the jobs on a SQLite database, so the unfinished jobs are resumed
+    when the API starts again. Each result is committed as soon as it is done.
+    """
+
+    def __init__(self, path, clock=time.time):
+        self.clock = clock
+        self.connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY, status TEXT NOT NULL, total INTEGER NOT NULL, created_at REAL NOT NULL,
+                finished_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS job_numbers (
+                job_id TEXT NOT NULL, position INTEGER NOT NULL, number TEXT NOT NULL, result BLOB, done_order INTEGER,
+                PRIMARY KEY (job_id, position)
+            );
+            CREATE INDEX IF NOT EXISTS job_numbers_number ON job_numbers (job_id, number);
+            CREATE INDEX IF NOT EXISTS job_numbers_done_order ON job_numbers (job_id, done_order);
+            """
+        )
+        # Databases created before the job retention do not have the finish time
+        if 'finished_at' not in [column for _, column, *_ in self.connection.execute('PRAGMA table_info(jobs)')]:
+            self.connection.execute('ALTER TABLE jobs ADD COLUMN finished_at REAL')
+        self.connection.execute('CREATE INDEX IF NOT EXISTS jobs_finished_at ON jobs (finished_at)')
+
+    def create(self, job_id, numbers):
+        with self.connection:
+            self.connection.execute('BEGIN')
+            self.connection.execute(
+                'INSERT INTO jobs (id, status, total, created_at) VALUES (?, ?, ?, ?)',
+                (job_id, PENDING, len(numbers), self.clock())
+            )
+            self.connection.executemany(
+                'INSERT INTO job_numbers (job_id, position, number) VALUES (?, ?, ?)',
+                ((job_id, position, number) for position, number in enumerate(numbers))
+            )
+
+    def get(self, job_id):
+        row = self.connection.execute(
+            'SELECT id, status, total, created_at, '
+            '(SELECT COUNT(*) FROM job_numbers WHERE job_id = jobs.id AND result IS NOT NULL) '
+            'FROM jobs WHERE id = ?',
+            (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        job_id, status, total, created_at, done = row
+        return {'id': job_id, 'status': status, 'total': total, 'done': done, 'created_at': created_at}
+
+    def set_status(self, job_id, status):
+        self.connection.execute(
+            'UPDATE jobs SET status = ?, finished_at = ? WHERE id = ?',
+            (status, self.clock() if status in FINISHED else None, job_id)
+        )
+
+    def add_result(self, job_id, item):
+        self.connection.execute(
+            'UPDATE job_numbers SET result = ?, done_order = '
+            '(SELECT COALESCE(MAX(done_order), 0) + 1 FROM job_numbers WHERE job_id = ?) '
+            'WHERE job_id = ? AND number = ?',
+            (orjson.dumps(get_batch_item(item)), job_id, job_id, item['number'])
+        )
+
+    def results(self, job_id, offset=0, limit=None):
+        rows = self.connection.execute(
+            'SELECT result FROM job_numbers WHERE job_id = ? AND result IS NOT NULL ORDER BY done_order LIMIT ? OFFSET ?',
+            (job_id, -1 if limit is None else limit, offset)
+        )
+        return [orjson.loads(result) for result, in rows]
+
+    def pending_numbers(self, job_id):
+        rows = self.connection.execute(
+            'SELECT number FROM job_numbers WHERE job_id = ? AND result IS NULL ORDER BY position', (job_id,)
+        )
+        return [number for number, in rows]
+
+    def unfinished(self):
+        rows = self.connection.execute(
+            'SELECT id FROM jobs WHERE status NOT IN (?, ?) ORDER BY created_at', FINISHED
+        )
+        return [job_id for job_id, in rows]
+
+    def purge(self, max_age):
+        """
+        Remove the jobs finished more than `max_age` seconds ago.
+        """
+        before = self.clock() - max_age
+        with self.connection:
+            self.connection.execute('BEGIN')
+            self.connection.execute(
+                'DELETE FROM job_numbers WHERE job_id IN (SELECT id FROM jobs WHERE finished_at < ?)', (before,)
+            )
+            self.connection.execute('DELETE FROM jobs WHERE finished_at < ?', (before,))
+
+
+def get_job_store(path=None):
+    return SQLiteJobStore(path) if path else MemoryJobStore()
+
+
+class JobQueue:
+    """
+    Run the submitted batch lookups on `workers` background tasks.
+
+    The lookups go through `batch_lookup`, so the jobs share its concurrency
+    limits, and run as bulk requests on the court schedulers. Each result
+    is kept on the `store` as soon as it is done and the unfinished jobs of
+    the store are enqueued again on `start`.
+
+    When `retention` is set, the jobs finished more than `retention` seconds
+    ago are removed from the store on each submit and after each job.
+    """
+
+    def __init__(self, store, batch_lookup, workers=1, timeout=None, retention=None):
+        self.store = store
+        self.batch_lookup = batch_lookup
+        self.workers = workers
+        self.timeout = timeout
+        self.retention = retention
+        self.queue = None
+        self.tasks = []
+        self.changes = {}
+
+    def start(self, session):
+        self.queue = asyncio.Queue()
+        for job_id in self.store.unfinished():
+            self.queue.put_nowait(job_id)
+        self.tasks = [asyncio.ensure_future(self._work(session)) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    def submit(self, numbers):
+        self._purge()
+        job_id = uuid.uuid4().hex
+        self.store.create(job_id, list(OrderedDict.fromkeys(numbers)))
+        self.queue.put_nowait(job_id)
+        return self.store.get(job_id)
+
+    async def wait(self, job_id, done=None, timeout=None):
+        """
+        Return the job when it has more than `done` results or is finished,
+        or after `timeout` seconds. Without `done` it returns right away.
+        """
+        job = self.store.get(job_id)
+        if job is None or done is None or job['done'] > done or job['status'] in FINISHED:
+            return job
+        change = self.changes.setdefault(job_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(change.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.store.get(job_id)
+
+    def _purge(self):
+        if self.retention is not None:
+            self.store.purge(self.retention)
+
+    def _notify(self, job_id):
+        change = self.changes.pop(job_id, None)
+        if change is not None:
+            change.set()
+
+    async def _work(self, session):
+        while True:
+            job_id = await self.queue.get()
+            try:
+                await self._run(session, job_id)
+                self._purge()
+            finally:
+                self.queue.task_done()
+
+    async def _run(self, session, job_id):
+        self.store.set_status(job_id, RUNNING)
+        try:
+            async for item in self.batch_lookup.stream(
+                    session, self.store.pending_numbers(job_id), timeout=self.timeout, priority=BULK
+            ):
+                self.store.add_result(job_id, item)
+                self._notify(job_id)
+        except Exception:
+            logger.exception('Job %s failed', job_id)
+            self.store.set_status(job_id, FAILED)
+        else:
+            self.store.set_status(job_id, DONE)
+        self._notify(job_id)
+
+    def stats(self):
+        return {
+            'workers': len(self.tasks),
+            'queued': self.queue.qsize() if self.queue is not None else 0
+        }
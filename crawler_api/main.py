@@ -1,10 +1,33 @@
-from fastapi import FastAPI, HTTPException
+import asyncio
+from functools import partial
+from typing import Literal, Optional
+
+from aiohttp import ClientError
+from fastapi import FastAPI, Header, HTTPException, Path, Query, Response
 from fastapi.params import Depends
+from fastapi.responses import ORJSONResponse, StreamingResponse
 
-from crawler_api.crawlers import COURTS
-from crawler_api.models.requests import LegalProcess
-from crawler_api.models.response import LegalProcessDetailResponse, Message
+from crawler_api import settings
+from crawler_api.batch import BatchLookup
+from crawler_api.components import (circuit_breakers, crawler_options, http_async_session, parse_executor,
+                                    rate_limiters, result_cache, retry_policies, schedulers, single_flight)
+from crawler_api.crawlers import COURTS, get_court_origins
+from crawler_api.crawlers.breaker import CircuitOpenError
+from crawler_api.crawlers.retry import UpstreamError
+from crawler_api.crawlers.scheduler import INTERACTIVE, NORMAL
+from crawler_api.crawlers.streaming import PageTooLargeError
+from crawler_api.jobs import FINISHED, JobQueue, get_job_store
+from crawler_api.models.requests import (LegalProcess, LegalProcessBatch, LegalProcessJob, LegalProcessNumbers,
+                                         LegalProcessRefresh)
+from crawler_api.models.response import (LegalProcessBatchItem, LegalProcessBatchResponse, LegalProcessDetailResponse,
+                                         LegalProcessJobResponse, LegalProcessNumbersValidation,
+                                         LegalProcessRefreshResponse, LegalProcessUpdatesPage, Message,
+                                         PartiesInvolvedPage)
+from crawler_api.pagination import decode_cursor, get_page, get_snapshot, paginate
+from crawler_api.revalidation import StaleWhileRevalidate
+from crawler_api.serialization import dumps_batch_item, get_batch_item
 from crawler_api.session import HttpAsyncSession
+from crawler_api.validation import validate_numbers
 
 app = FastAPI(
     title='Legal Process Crawler',
@@ -14,8 +37,27 @@ app = FastAPI(
     )
 )
 
-
-http_async_session = HttpAsyncSession()
+stale_results = (
+    StaleWhileRevalidate(
+        settings.STALE_SOFT_TTL,
+        settings.STALE_HARD_TTL,
+        settings.STALE_MAX_ENTRIES,
+        settings.STALE_MAX_REFRESHES,
+        # A lookup with timed out or failed degrees does not replace the last complete result
+        keep=lambda value: not value[1] and not value[2]
+    )
+    if settings.SERVE_STALE else None
+)
+batch_lookup = BatchLookup(
+    settings.BATCH_MAX_CONCURRENCY, settings.BATCH_COURT_MAX_CONCURRENCY, crawler_options=crawler_options
+)
+job_queue = JobQueue(
+    get_job_store(settings.JOB_STORE_PATH),
+    batch_lookup,
+    workers=settings.JOB_WORKERS,
+    timeout=settings.REQUEST_TIMEOUT,
+    retention=settings.JOB_RETENTION
+)
 
 
 @app.on_event("startup")
@@ -23,26 +65,342 @@ def startup():
     http_async_session.start()
 
 
+@app.on_event("startup")
+async def warm_up_event():
+    if settings.SESSION_WARM_UP:
+        await http_async_session.warm_up(get_court_origins(), connections=settings.SESSION_WARM_UP_CONNECTIONS)
+
+
+@app.on_event("startup")
+def start_job_queue():
+    job_queue.start(http_async_session())
+
+
 @app.on_event("shutdown")
 async def shutdown_event():
+    await job_queue.stop()
+    if stale_results is not None:
+        stale_results.close()
     await http_async_session.stop()
+    parse_executor.shutdown()
+
+
+def get_request_timeout(
+        timeout: Optional[float] = Header(
+            None,
+            alias='X-Request-Timeout',
+            gt=0,
+            description=(
+                'Seconds to wait for each legal process lookup. '
+                'The degrees not done in time are returned on `timed_out`'
+            )
+        )
+) -> Optional[float]:
+    return timeout or settings.REQUEST_TIMEOUT
+
+
+def get_request_priority(
+        priority: Optional[Literal['interactive', 'normal', 'bulk']] = Header(
+            None,
+            alias='X-Request-Priority',
+            description=(
+                'Priority class of the court requests on the schedulers. '
+                'Default is `interactive` for a legal process and `normal` for a batch'
+            )
+        )
+) -> Optional[str]:
+    return priority
+
+
+def get_crawler(session, court):
+    try:
+        return COURTS[court](session, **crawler_options)
+    except KeyError:
+        raise HTTPException(status_code=422, detail="Crawler not implemented")
+
+
+async def execute_crawler(session, legal_process, timeout, priority=INTERACTIVE, compact=False):
+    """
+    Return the crawler result, timed out degrees and failed degrees. With
+    `compact` the result has the crawler compact representation of each degree.
+    """
+    crawler = get_crawler(session, legal_process.court)
+    result, timed_out, failed = await run_crawler(
+        crawler,
+        crawler.execute(
+            number=legal_process.number,
+            timeout=timeout,
+            degrees=legal_process.degrees,
+            include=legal_process.include,
+            updates_limit=legal_process.updates_limit,
+            priority=priority
+        )
+    )
+    if compact:
+        result = tuple(map(crawler.compact, result))
+    return result, timed_out, failed
+
+
+async def run_crawler(crawler, lookup):
+    try:
+        result = tuple(await lookup)
+    except CircuitOpenError:
+        raise HTTPException(status_code=503, detail="Court unavailable")
+    except PageTooLargeError:
+        raise HTTPException(status_code=502, detail="Court page too large")
+    except UpstreamError as error:
+        raise HTTPException(status_code=503 if error.status in (429, 503) else 502, detail=str(error))
+    except ClientError as error:
+        raise HTTPException(status_code=502, detail=f"Court request failed: {error.__class__.__name__}")
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Court request failed: TimeoutError")
+    if not result and crawler.timed_out:
+        raise HTTPException(status_code=504, detail="Legal Process request timed out")
+    if not result:
+        raise HTTPException(status_code=404, detail="Legal Process not found")
+    return result, crawler.timed_out, crawler.failed
+
+
+async def get_legal_process_page(session, cursor, section, timeout, priority):
+    try:
+        cursor = decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Invalid cursor")
+    if cursor.section != section:
+        raise HTTPException(status_code=422, detail="Invalid cursor")
+    result, _, _ = await execute_crawler(session, cursor.query, timeout, priority or INTERACTIVE)
+    items = result[0][section]
+    # The offsets of the cursor are only valid on the items of its first page
+    if get_snapshot(items) != cursor.snapshot:
+        raise HTTPException(status_code=410, detail="Legal Process changed since the first page")
+    items, next_cursor = get_page(items, cursor)
+    if settings.FAST_SERIALIZATION:
+        return ORJSONResponse({'items': items, 'next_cursor': next_cursor})
+    return {'items': items, 'next_cursor': next_cursor}
 
 
 @app.post(
     "/legal-process",
     response_model=LegalProcessDetailResponse,
+    response_model_exclude_unset=True,
     description='Get Legal Process detail',
-    responses={404: {"model": Message}}
+    responses={404: {"model": Message}, 502: {"model": Message}, 503: {"model": Message}, 504: {"model": Message}}
 )
 async def show_legal_process_detail(
         legal_process: LegalProcess,
-        session: HttpAsyncSession = Depends(http_async_session)
+        response: Response,
+        session: HttpAsyncSession = Depends(http_async_session),
+        timeout: Optional[float] = Depends(get_request_timeout),
+        priority: Optional[str] = Depends(get_request_priority)
 ) -> LegalProcessDetailResponse:
-    try:
-        crawler = COURTS[legal_process.court](session)
-    except KeyError:
-        raise HTTPException(status_code=422, detail="Crawler not implemented")
-    result = tuple(await crawler.execute(number=legal_process.number))
-    if not result:
-        raise HTTPException(status_code=404, detail="Legal Process not found")
-    return LegalProcessDetailResponse(degrees=result)
+    priority = priority or INTERACTIVE
+    headers = {}
+    if stale_results is not None:
+        crawler = get_crawler(session, legal_process.court)
+        key = (
+            legal_process.number,
+            legal_process.degrees and frozenset(legal_process.degrees),
+            frozenset(legal_process.include),
+            legal_process.updates_limit
+        )
+        # The background refreshes do not compete with the interactive lookups
+        (result, timed_out, failed), age = await stale_results.get(
+            key,
+            partial(execute_crawler, session, legal_process, timeout, priority, compact=True),
+            refresh=partial(execute_crawler, session, legal_process, timeout, NORMAL, compact=True)
+        )
+        result = tuple(map(crawler.expand, result))
+        headers['Age'] = str(int(age))
+    else:
+        result, timed_out, failed = await execute_crawler(session, legal_process, timeout, priority)
+    if legal_process.page_size:
+        result = [paginate(item, legal_process) for item in result]
+    if settings.FAST_SERIALIZATION:
+        return ORJSONResponse({'degrees': result, 'timed_out': timed_out, 'failed': failed}, headers=headers)
+    response.headers.update(headers)
+    return LegalProcessDetailResponse(degrees=result, timed_out=timed_out, failed=failed)
+
+
+@app.get(
+    "/legal-process/parties-involved",
+    response_model=PartiesInvolvedPage,
+    description='Get a page of the Legal Process parties involved',
+    responses={
+        404: {"model": Message}, 410: {"model": Message}, 502: {"model": Message}, 503: {"model": Message},
+        504: {"model": Message}
+    }
+)
+async def show_legal_process_parties_involved(
+        cursor: str = Query(..., description='Cursor returned by the previous page'),
+        session: HttpAsyncSession = Depends(http_async_session),
+        timeout: Optional[float] = Depends(get_request_timeout),
+        priority: Optional[str] = Depends(get_request_priority)
+) -> PartiesInvolvedPage:
+    return await get_legal_process_page(session, cursor, 'parties_involved', timeout, priority)
+
+
+@app.get(
+    "/legal-process/updates",
+    response_model=LegalProcessUpdatesPage,
+    description='Get a page of the Legal Process updates',
+    responses={
+        404: {"model": Message}, 410: {"model": Message}, 502: {"model": Message}, 503: {"model": Message},
+        504: {"model": Message}
+    }
+)
+async def show_legal_process_updates(
+        cursor: str = Query(..., description='Cursor returned by the previous page'),
+        session: HttpAsyncSession = Depends(http_async_session),
+        timeout: Optional[float] = Depends(get_request_timeout),
+        priority: Optional[str] = Depends(get_request_priority)
+) -> LegalProcessUpdatesPage:
+    return await get_legal_process_page(session, cursor, 'updates', timeout, priority)
+
+
+@app.post(
+    "/legal-process/refresh",
+    response_model=LegalProcessRefreshResponse,
+    description=(
+        'Get only the updates newer than the known ones of each degree. '
+        'The court page is not parsed when it did not change since the known state'
+    ),
+    responses={404: {"model": Message}, 502: {"model": Message}, 503: {"model": Message}, 504: {"model": Message}}
+)
+async def refresh_legal_process(
+        legal_process_refresh: LegalProcessRefresh,
+        session: HttpAsyncSession = Depends(http_async_session),
+        timeout: Optional[float] = Depends(get_request_timeout),
+        priority: Optional[str] = Depends(get_request_priority)
+) -> LegalProcessRefreshResponse:
+    crawler = get_crawler(session, legal_process_refresh.court)
+    result, timed_out, failed = await run_crawler(
+        crawler,
+        crawler.refresh(
+            legal_process_refresh.refresh_states,
+            timeout=timeout,
+            priority=priority or INTERACTIVE,
+            number=legal_process_refresh.number
+        )
+    )
+    if settings.FAST_SERIALIZATION:
+        return ORJSONResponse({'degrees': result, 'timed_out': timed_out, 'failed': failed})
+    return LegalProcessRefreshResponse(degrees=result, timed_out=timed_out, failed=failed)
+
+
+@app.post(
+    "/legal-process/batch",
+    response_model=LegalProcessBatchResponse,
+    description='Get the detail of many Legal Processes. Each number has its own result or error'
+)
+async def show_legal_process_batch(
+        legal_process_batch: LegalProcessBatch,
+        session: HttpAsyncSession = Depends(http_async_session),
+        timeout: Optional[float] = Depends(get_request_timeout),
+        priority: Optional[str] = Depends(get_request_priority)
+) -> LegalProcessBatchResponse:
+    results = await batch_lookup.run(session, legal_process_batch.numbers, timeout=timeout, priority=priority or NORMAL)
+    if settings.FAST_SERIALIZATION:
+        return ORJSONResponse({'results': [get_batch_item(item) for item in results]})
+    return LegalProcessBatchResponse(results=results)
+
+
+@app.post(
+    "/legal-process/batch/stream",
+    response_class=StreamingResponse,
+    description=(
+        'Get the detail of many Legal Processes as NDJSON. '
+        'Each line is a batch result, sent as soon as its lookup is done'
+    ),
+    responses={200: {"content": {"application/x-ndjson": {}}}}
+)
+async def stream_legal_process_batch(
+        legal_process_batch: LegalProcessBatch,
+        session: HttpAsyncSession = Depends(http_async_session),
+        timeout: Optional[float] = Depends(get_request_timeout),
+        priority: Optional[str] = Depends(get_request_priority)
+) -> StreamingResponse:
+    async def lines():
+        async for item in batch_lookup.stream(
+                session, legal_process_batch.numbers, timeout=timeout, priority=priority or NORMAL
+        ):
+            if settings.FAST_SERIALIZATION:
+                yield dumps_batch_item(item)
+            else:
+                yield LegalProcessBatchItem(**item).json(by_alias=True) + '\n'
+    return StreamingResponse(lines(), media_type='application/x-ndjson')
+
+
+@app.post(
+    "/legal-process/jobs",
+    status_code=202,
+    response_model=LegalProcessJobResponse,
+    response_model_exclude_none=True,
+    description=(
+        'Submit a job to look up many Legal Processes in background. '
+        'Its progress and results are read on `GET /legal-process/jobs/{id}`'
+    )
+)
+async def submit_legal_process_job(legal_process_job: LegalProcessJob) -> LegalProcessJobResponse:
+    return job_queue.submit(legal_process_job.numbers)
+
+
+@app.get(
+    "/legal-process/jobs/{job_id}",
+    response_model=LegalProcessJobResponse,
+    description='Get the progress and a page of the results of a job',
+    responses={404: {"model": Message}}
+)
+async def show_legal_process_job(
+        job_id: str = Path(...),
+        offset: int = Query(0, ge=0, description='Results skipped'),
+        limit: int = Query(settings.JOB_PAGE_SIZE, gt=0, le=settings.JOB_PAGE_SIZE, description='Max results returned'),
+        done: Optional[int] = Query(
+            None, ge=0, description='Wait until the job has more than `done` results or is finished (long polling)'
+        ),
+        wait: float = Query(settings.JOB_MAX_WAIT, gt=0, le=settings.JOB_MAX_WAIT, description='Max seconds to wait')
+) -> LegalProcessJobResponse:
+    job = await job_queue.wait(job_id, done=done, timeout=wait)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    results = job_queue.store.results(job_id, offset=offset, limit=limit)
+    next_offset = offset + len(results)
+    if next_offset >= job['total'] or (job['status'] in FINISHED and next_offset >= job['done']):
+        next_offset = None
+    content = {**job, 'results': results, 'next_offset': next_offset}
+    if settings.FAST_SERIALIZATION:
+        return ORJSONResponse(content)
+    return content
+
+
+@app.post(
+    "/legal-process/validate",
+    response_model=LegalProcessNumbersValidation,
+    description=(
+        'Validate many legal process numbers at once, without requests to the courts. '
+        'Each list has an item by number, in the request order'
+    )
+)
+def validate_legal_process_numbers(legal_process_numbers: LegalProcessNumbers) -> LegalProcessNumbersValidation:
+    validation = validate_numbers(legal_process_numbers.numbers)
+    content = {
+        'valid': validation.valid.tolist(),
+        'courts': validation.courts.tolist(),
+        'errors': validation.errors.tolist()
+    }
+    if settings.FAST_SERIALIZATION:
+        return ORJSONResponse(content)
+    return LegalProcessNumbersValidation(**content)
+
+
+@app.get("/metrics", description='Get the API internal counters')
+async def show_metrics() -> dict:
+    return {
+        'cache': result_cache and result_cache.stats(),
+        'single_flight': single_flight.stats(),
+        'retry': retry_policies.stats(),
+        'circuit_breakers': circuit_breakers and circuit_breakers.stats(),
+        'rate_limiters': rate_limiters and rate_limiters.stats(),
+        'stale_results': stale_results and stale_results.stats(),
+        'jobs': job_queue.stats(),
+        'schedulers': schedulers and schedulers.stats()
+    }
@@ -1,22 +1,46 @@
 import re
+from typing import Dict, List, Literal, Optional, Set
 
 from pydantic import BaseModel, Field, validator
 
+from crawler_api.crawlers import COURTS
+from crawler_api.crawlers.base import RefreshState
+from crawler_api.settings import BATCH_MAX_SIZE, JOB_MAX_SIZE, VALIDATE_MAX_SIZE
+
 LEGAL_PROCESS_NUMBER_PATTERN = re.compile(r'^\d{7}-\d{2}\.\d{4}\.\d{1}\.\d{2}\.\d{4}$')
+INVALID_NUMBER_FORMAT = 'Invalid number format. Example: 1234567-12.1234.1.12.1234'
+INVALID_CHECK_DIGIT = 'Invalid Number. The check digit (DV) is not correct'
+
+
+def get_court(number):
+    return number[18:20]
 
 
 class LegalProcess(BaseModel):
     number: str = Field(description='Valid format: XXXXXXXX-XX-XXXX.XX.XXXX', example='1234567-12.1234.1.12.1234')
+    degrees: Optional[Set[str]] = Field(
+        None, min_items=1, description='Degrees fetched. Omitted fetches all the court degrees', example=['1º']
+    )
+    include: Set[Literal['parties_involved', 'updates']] = Field(
+        default={'parties_involved', 'updates'},
+        description='Sections returned besides the legal process header fields'
+    )
+    updates_limit: Optional[int] = Field(None, gt=0, description='Max updates returned, from the newest')
+    page_size: Optional[int] = Field(
+        None,
+        gt=0,
+        description='Max updates and parties involved returned on the response. The next pages are read by cursor'
+    )
 
     @property
     def court(self):
-        return self.number[18:20]
+        return get_court(self.number)
 
     @validator('number')
     def check_number(cls, value):
         is_full_match = LEGAL_PROCESS_NUMBER_PATTERN.fullmatch(value.upper())
         if not is_full_match:
-            raise ValueError('Invalid number format. Example: 1234567-12.1234.1.12.1234')
+            raise ValueError(INVALID_NUMBER_FORMAT)
         return value
 
     @validator('number')
@@ -38,5 +62,105 @@ class LegalProcess(BaseModel):
         r2 = round(int(f'{r1}{year}{segment}{unit}') % 97)
         r3 = round(int(f'{r2}{court}00') % 97)
         check_digit_calculated = 98 - (r3 % 97)
-        assert int(check_digit) == check_digit_calculated, 'Invalid Number. The check digit (DV) is not correct'
+        assert int(check_digit) == check_digit_calculated, INVALID_CHECK_DIGIT
+        return value
+
+    @validator('degrees')
+    def check_degrees(cls, value, values):
+        if value is None:
+            return value
+        crawler = 'number' in values and COURTS.get(get_court(values['number']))
+        if crawler and not value <= set(crawler.paths):
+            raise ValueError(f'Invalid degrees. Options: {", ".join(crawler.paths)}')
+        return value
+
+
+class KnownUpdate(BaseModel):
+    date: str
+    description: str
+
+
+class KnownDegree(BaseModel):
+    latest_update: Optional[KnownUpdate] = Field(description='Newest update already known')
+    content_hash: Optional[str] = Field(description='`content_hash` returned by the previous refresh')
+    etag: Optional[str] = Field(description='`etag` returned by the previous refresh')
+    last_modified: Optional[str] = Field(description='`last_modified` returned by the previous refresh')
+
+    def refresh_state(self):
+        return RefreshState(
+            latest_update=self.latest_update and (self.latest_update.date, self.latest_update.description),
+            content_hash=self.content_hash,
+            etag=self.etag,
+            last_modified=self.last_modified
+        )
+
+
+class LegalProcessRefresh(BaseModel):
+    number: str = Field(description='Valid format: XXXXXXXX-XX-XXXX.XX.XXXX', example='1234567-12.1234.1.12.1234')
+    known: Dict[str, KnownDegree] = Field(description='What is already known of each refreshed degree')
+
+    @property
+    def court(self):
+        return get_court(self.number)
+
+    @property
+    def refresh_states(self):
+        return {degree: known_degree.refresh_state() for degree, known_degree in self.known.items()}
+
+    @validator('number')
+    def check_number(cls, value):
+        LegalProcess.check_number(value)
+        return LegalProcess.check_digit_validation(value)
+
+    @validator('known')
+    def check_known(cls, value, values):
+        if not value:
+            raise ValueError('At least one known degree is required')
+        LegalProcess.check_degrees(set(value), values)
         return value
+
+
+class LegalProcessCursor(BaseModel):
+    query: LegalProcess
+    section: Literal['parties_involved', 'updates']
+    offset: int = Field(ge=0)
+    limit: int = Field(gt=0)
+    snapshot: str
+
+    @validator('section')
+    def check_section(cls, value, values):
+        if 'query' in values and value not in values['query'].include:
+            raise ValueError('The cursor section is not included on its query')
+        return value
+
+
+class LegalProcessBatch(BaseModel):
+    numbers: List[str] = Field(
+        min_items=1,
+        max_items=BATCH_MAX_SIZE,
+        description='List of legal process numbers. Valid format: XXXXXXXX-XX-XXXX.XX.XXXX',
+        example=['1234567-69.1234.1.12.1234']
+    )
+
+    @validator('numbers', each_item=True)
+    def check_numbers(cls, value):
+        LegalProcess.check_number(value)
+        return LegalProcess.check_digit_validation(value)
+
+
+class LegalProcessJob(LegalProcessBatch):
+    numbers: List[str] = Field(
+        min_items=1,
+        max_items=JOB_MAX_SIZE,
+        description='List of legal process numbers. Valid format: XXXXXXXX-XX-XXXX.XX.XXXX',
+        example=['1234567-69.1234.1.12.1234']
+    )
+
+
+class LegalProcessNumbers(BaseModel):
+    numbers: List[str] = Field(
+        min_items=1,
+        max_items=VALIDATE_MAX_SIZE,
+        description='List of legal process numbers to validate',
+        example=['1234567-69.1234.1.12.1234']
+    )
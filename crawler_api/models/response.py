@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -35,5 +35,65 @@ class LegalProcessDetail(BaseModel):
     updates: Optional[List[LegalProcessUpdate]]
 
 
+class LegalProcessPagedDetail(LegalProcessDetail):
+    next_parties_involved_cursor: Optional[str] = Field(description='Cursor of the next parties involved page')
+    next_updates_cursor: Optional[str] = Field(description='Cursor of the next updates page')
+
+
 class LegalProcessDetailResponse(BaseModel):
-    degrees: List[LegalProcessDetail]
+    degrees: List[LegalProcessPagedDetail]
+    timed_out: List[str] = Field(default=[], description='Degrees not done before the request timeout')
+    failed: Dict[str, str] = Field(default={}, description='Error of each degree whose court request failed')
+
+
+class PartiesInvolvedPage(BaseModel):
+    items: List[PartiesInvolved]
+    next_cursor: Optional[str]
+
+
+class LegalProcessUpdatesPage(BaseModel):
+    items: List[LegalProcessUpdate]
+    next_cursor: Optional[str]
+
+
+class LegalProcessDegreeRefresh(BaseModel):
+    degree: str
+    modified: bool = Field(description='Whether the court page changed since the known state')
+    content_hash: Optional[str]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    updates: List[LegalProcessUpdate] = Field(description='Updates newer than the known latest update')
+
+
+class LegalProcessRefreshResponse(BaseModel):
+    degrees: List[LegalProcessDegreeRefresh]
+    timed_out: List[str] = Field(default=[], description='Degrees not done before the request timeout')
+    failed: Dict[str, str] = Field(default={}, description='Error of each degree whose court request failed')
+
+
+class LegalProcessBatchItem(BaseModel):
+    number: str
+    degrees: Optional[List[LegalProcessDetail]]
+    timed_out: List[str] = []
+    failed: Dict[str, str] = {}
+    error: Optional[str]
+
+
+class LegalProcessBatchResponse(BaseModel):
+    results: List[LegalProcessBatchItem]
+
+
+class LegalProcessJobResponse(BaseModel):
+    id: str
+    status: Literal['pending', 'running', 'done', 'failed']
+    total: int = Field(description='Numbers of the job')
+    done: int = Field(description='Numbers already looked up')
+    created_at: float
+    results: Optional[List[LegalProcessBatchItem]] = Field(description='Results in completion order')
+    next_offset: Optional[int] = Field(description='Offset of the next results. Empty when all were returned')
+
+
+class LegalProcessNumbersValidation(BaseModel):
+    valid: List[bool] = Field(description='Whether each number is valid')
+    courts: List[Optional[str]] = Field(description='Court code of each valid number')
+    errors: List[Optional[str]] = Field(description='Validation error of each invalid number')
@@ -0,0 +1,59 @@
+import base64
+import hashlib
+
+import orjson
+
+from crawler_api.models.requests import LegalProcessCursor
+
+PAGINATED_SECTIONS = ('parties_involved', 'updates')
+
+
+def encode_cursor(cursor):
+    return base64.urlsafe_b64encode(cursor.json(exclude_none=True).encode()).decode()
+
+
+def decode_cursor(value):
+    """
+    Raise ValueError for an invalid cursor.
+    """
+    return LegalProcessCursor.parse_raw(base64.urlsafe_b64decode(value.encode()))
+
+
+def get_snapshot(items):
+    """
+    Return the hash of the section items a cursor pages through, to tell
+    when they changed since the first page.
+    """
+    return hashlib.sha256(orjson.dumps(items, option=orjson.OPT_SORT_KEYS)).hexdigest()[:16]
+
+
+def get_page(items, cursor):
+    """
+    Return the `cursor` page of `items` and the cursor of the next page or
+    None on the last page.
+    """
+    end = cursor.offset + cursor.limit
+    next_cursor = encode_cursor(cursor.copy(update={'offset': end})) if end < len(items) else None
+    return items[cursor.offset:end], next_cursor
+
+
+def paginate(result, legal_process):
+    """
+    Keep only the first page of the `result` sections, with the cursor of the
+    next page of each one. The next pages are read from the cached result of
+    the same degree and parse options, and the cursor keeps the snapshot of
+    the section it pages through.
+    """
+    result = dict(result)
+    query = legal_process.copy(update={'degrees': {result['degree']}, 'page_size': None})
+    for section in PAGINATED_SECTIONS:
+        if section in result:
+            cursor = LegalProcessCursor(
+                query=query,
+                section=section,
+                offset=0,
+                limit=legal_process.page_size,
+                snapshot=get_snapshot(result[section])
+            )
+            result[section], result[f'next_{section}_cursor'] = get_page(result[section], cursor)
+    return result
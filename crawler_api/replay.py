@@ -0,0 +1,63 @@
+"""
+Parse again the pages kept on a page store, without requests to the courts.
+
+    python -m crawler_api.replay PAGE_STORE_PATH [--court tjal] [--workers 4] [--output results.jsonl]
+"""
+import argparse
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from functools import partial
+
+import orjson
+
+from crawler_api import settings
+from crawler_api.crawlers import COURTS
+from crawler_api.crawlers.parsers import PARSER_BACKENDS, get_parser_backend
+from crawler_api.crawlers.store import PageStore
+
+CRAWLERS = {crawler.court: crawler for crawler in COURTS.values()}
+
+
+def replay_page(path, parser_backend, entry):
+    crawler = CRAWLERS[entry['court']](None, parser_backend=get_parser_backend(parser_backend))
+    return crawler.parse_body(PageStore(path).read(entry['digest']), entry['encoding'], entry['degree'])
+
+
+def replay(page_store, court=None, workers=None, parser_backend='lxml', chunksize=16):
+    """
+    Yield the latest stored page of each legal process degree parsed again,
+    on a pool of `workers` processes.
+    """
+    entries = [entry for entry in page_store.entries(court) if entry['court'] in CRAWLERS]
+    with ProcessPoolExecutor(workers) as executor:
+        results = executor.map(partial(replay_page, page_store.path, parser_backend), entries, chunksize=chunksize)
+        for entry, result in zip(entries, results):
+            yield {
+                'court': entry['court'],
+                'degree': entry['degree'],
+                'number': entry['number'],
+                'fetched_at': entry['fetched_at'],
+                'result': result
+            }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Parse again the pages kept on a page store')
+    parser.add_argument('path', help='Page store directory')
+    parser.add_argument('--court', choices=sorted(CRAWLERS), help='Parse only the pages of this court')
+    parser.add_argument('--workers', type=int, help='Parse processes. Default is the CPU count')
+    parser.add_argument('--parser-backend', choices=list(PARSER_BACKENDS), default=settings.PARSER_BACKEND)
+    parser.add_argument('--output', default='-', help='JSON lines output file. Default is the stdout')
+    args = parser.parse_args(argv)
+    page_store = PageStore(args.path)
+    count = 0
+    with open(args.output, 'wb') if args.output != '-' else nullcontext(sys.stdout.buffer) as output:
+        for item in replay(page_store, court=args.court, workers=args.workers, parser_backend=args.parser_backend):
+            output.write(orjson.dumps(item) + b'\n')
+            count += 1
+    print(f'{count} pages parsed', file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
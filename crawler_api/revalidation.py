@@ -0,0 +1,107 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+
+class StaleWhileRevalidate:
+    """
+    Serve the last known lookup result right away, with its age.
+
+    Results older than `soft_ttl` are still served, but a refresh is started
+    in background. Only one refresh runs for each key and at most
+    `max_refreshes` run at once; when all of them are busy the refresh is
+    skipped and the next request tries again. Results older than `hard_ttl`
+    are not served and the lookup runs before the response.
+
+    Only the values accepted by `keep` are kept, so a partial value does
+    not replace the last complete one.
+    """
+
+    def __init__(self, soft_ttl, hard_ttl, max_entries, max_refreshes, keep=None, clock=time.monotonic):
+        self.soft_ttl = soft_ttl
+        self.hard_ttl = hard_ttl
+        self.max_entries = max_entries
+        self.max_refreshes = max_refreshes
+        self.keep = keep
+        self.clock = clock
+        self.entries = OrderedDict()
+        self.lookups = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.skipped_refreshes = 0
+        self.failed_refreshes = 0
+
+    async def get(self, key, lookup, refresh=None):
+        """
+        `lookup` is a coroutine function returning the value kept for `key`.
+        The background refresh runs `refresh`, or `lookup` when it is None.
+        Return the value and its age in seconds.
+        """
+        stored_at, value = self.entries.get(key, (None, None))
+        age = None if stored_at is None else self.clock() - stored_at
+        if age is None or age >= self.hard_ttl:
+            self.misses += 1
+            lookup_task = self.lookups.get(key) or self._start_lookup(key, lookup)
+            return await asyncio.shield(lookup_task), 0
+        self.entries.move_to_end(key)
+        if age < self.soft_ttl:
+            self.hits += 1
+        else:
+            self.stale_hits += 1
+            self._revalidate(key, refresh or lookup)
+        return value, age
+
+    def set(self, key, value):
+        self.entries[key] = (self.clock(), value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def close(self):
+        for lookup_task in self.lookups.values():
+            lookup_task.cancel()
+
+    def _revalidate(self, key, lookup):
+        if key in self.lookups:
+            return
+        if len(self.lookups) >= self.max_refreshes:
+            self.skipped_refreshes += 1
+            return
+        self.refreshes += 1
+        self._start_lookup(key, lookup).add_done_callback(self._refresh_done)
+
+    def _start_lookup(self, key, lookup):
+        lookup_task = self.lookups[key] = asyncio.ensure_future(self._lookup(key, lookup))
+        lookup_task.add_done_callback(lambda _: self._lookup_done(key, lookup_task))
+        return lookup_task
+
+    async def _lookup(self, key, lookup):
+        value = await lookup()
+        if self.keep is None or self.keep(value):
+            self.set(key, value)
+        return value
+
+    def _lookup_done(self, key, lookup_task):
+        if self.lookups.get(key) is lookup_task:
+            del self.lookups[key]
+        if not lookup_task.cancelled():
+            lookup_task.exception()
+
+    def _refresh_done(self, lookup_task):
+        if not lookup_task.cancelled() and lookup_task.exception() is not None:
+            self.failed_refreshes += 1
+
+    def stats(self):
+        return {
+            'size': len(self.entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'refreshing': len(self.lookups),
+            'refreshes': self.refreshes,
+            'skipped_refreshes': self.skipped_refreshes,
+            'failed_refreshes': self.failed_refreshes
+        }
@@ -0,0 +1,19 @@
+import orjson
+
+
+def get_batch_item(item):
+    """
+    Fill the missing fields of a batch lookup result with the
+    LegalProcessBatchItem defaults.
+    """
+    return {
+        'number': item['number'],
+        'degrees': item.get('degrees'),
+        'timed_out': item.get('timed_out', []),
+        'failed': item.get('failed', {}),
+        'error': item.get('error')
+    }
+
+
+def dumps_batch_item(item):
+    return orjson.dumps(get_batch_item(item)) + b'\n'
@@ -1,18 +1,58 @@
+import asyncio
+import logging
 from typing import Optional
 
-from aiohttp import ClientSession
+from aiohttp import ClientError, ClientSession, ClientTimeout, TCPConnector
+
+logger = logging.getLogger(__name__)
 
 
 class HttpAsyncSession:
     session: Optional[ClientSession] = None
 
+    def __init__(
+            self,
+            limit=100,
+            limit_per_host=0,
+            keepalive_timeout=15,
+            dns_cache_ttl=10,
+            timeout=300,
+            connect_timeout=None,
+            read_timeout=None
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.timeout = ClientTimeout(total=timeout, connect=connect_timeout, sock_read=read_timeout)
+
     def start(self):
-        self.session = ClientSession()
+        connector = TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=self.dns_cache_ttl
+        )
+        self.session = ClientSession(connector=connector, timeout=self.timeout)
 
     async def stop(self):
         await self.session.close()
         self.session = None
 
+    async def warm_up(self, urls, connections=1):
+        """
+        Resolve the DNS and open the connections (TLS handshake included)
+        for each url, so they are in the pool before the first request.
+        """
+        await asyncio.gather(*(self._warm_up(url) for url in urls for _ in range(connections)))
+
+    async def _warm_up(self, url):
+        try:
+            async with self.session.head(url) as response:
+                await response.release()
+        except (ClientError, asyncio.TimeoutError) as error:
+            logger.warning('Warm up request to %s failed: %r', url, error)
+
     def __call__(self) -> ClientSession:
         assert self.session is not None
         return self.session
@@ -0,0 +1,80 @@
+import os
+
+
+def get_bool(name, default='false'):
+    return os.getenv(name, default).lower() in ('1', 'true', 'yes')
+
+
+def get_shares(name, default=''):
+    shares = (item.partition(':') for item in os.getenv(name, default).split(',') if item)
+    return {key: int(value) for key, _, value in shares}
+
+
+BATCH_MAX_SIZE = int(os.getenv('BATCH_MAX_SIZE', '500'))
+BATCH_MAX_CONCURRENCY = int(os.getenv('BATCH_MAX_CONCURRENCY', '50'))
+BATCH_COURT_MAX_CONCURRENCY = int(os.getenv('BATCH_COURT_MAX_CONCURRENCY', '10'))
+JOB_MAX_SIZE = int(os.getenv('JOB_MAX_SIZE', '100000'))
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', '2'))
+JOB_STORE_PATH = os.getenv('JOB_STORE_PATH') or None
+JOB_PAGE_SIZE = int(os.getenv('JOB_PAGE_SIZE', '500'))
+JOB_MAX_WAIT = float(os.getenv('JOB_MAX_WAIT', '30'))
+JOB_RETENTION = float(os.getenv('JOB_RETENTION', '86400')) or None
+VALIDATE_MAX_SIZE = int(os.getenv('VALIDATE_MAX_SIZE', '100000'))
+
+CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', '1000'))
+CACHE_TTL = float(os.getenv('CACHE_TTL', '300'))
+CACHE_NEGATIVE_TTL = float(os.getenv('CACHE_NEGATIVE_TTL', '60'))
+
+PARSE_EXECUTOR = os.getenv('PARSE_EXECUTOR', 'inline')
+PARSE_WORKERS = int(os.getenv('PARSE_WORKERS', '0')) or None
+PARSER_BACKEND = os.getenv('PARSER_BACKEND', 'lxml')
+FAST_SERIALIZATION = get_bool('FAST_SERIALIZATION')
+
+SERVE_STALE = get_bool('SERVE_STALE')
+STALE_SOFT_TTL = float(os.getenv('STALE_SOFT_TTL', '3600'))
+STALE_HARD_TTL = float(os.getenv('STALE_HARD_TTL', '86400'))
+STALE_MAX_ENTRIES = int(os.getenv('STALE_MAX_ENTRIES', '10000'))
+STALE_MAX_REFRESHES = int(os.getenv('STALE_MAX_REFRESHES', '10'))
+
+PAGE_STORE_PATH = os.getenv('PAGE_STORE_PATH') or None
+PAGE_STORE_MAX_AGE = float(os.getenv('PAGE_STORE_MAX_AGE', '0')) or None
+
+SESSION_LIMIT = int(os.getenv('SESSION_LIMIT', '100'))
+SESSION_LIMIT_PER_HOST = int(os.getenv('SESSION_LIMIT_PER_HOST', '0'))
+SESSION_KEEPALIVE_TIMEOUT = float(os.getenv('SESSION_KEEPALIVE_TIMEOUT', '15'))
+SESSION_DNS_CACHE_TTL = int(os.getenv('SESSION_DNS_CACHE_TTL', '10'))
+SESSION_TIMEOUT = float(os.getenv('SESSION_TIMEOUT', '300'))
+SESSION_CONNECT_TIMEOUT = float(os.getenv('SESSION_CONNECT_TIMEOUT', '0')) or None
+SESSION_READ_TIMEOUT = float(os.getenv('SESSION_READ_TIMEOUT', '0')) or None
+SESSION_WARM_UP = get_bool('SESSION_WARM_UP')
+SESSION_WARM_UP_CONNECTIONS = int(os.getenv('SESSION_WARM_UP_CONNECTIONS', '1'))
+
+REQUEST_TIMEOUT = float(os.getenv('REQUEST_TIMEOUT', '0')) or None
+
+RETRY_MAX_ATTEMPTS = int(os.getenv('RETRY_MAX_ATTEMPTS', '3'))
+RETRY_BACKOFF = float(os.getenv('RETRY_BACKOFF', '0.2'))
+RETRY_MAX_BACKOFF = float(os.getenv('RETRY_MAX_BACKOFF', '5'))
+RETRY_STATUSES = tuple(int(status) for status in os.getenv('RETRY_STATUSES', '429,500,502,503,504').split(',') if status)
+HEDGE_PERCENTILE = float(os.getenv('HEDGE_PERCENTILE', '0')) or None
+
+BREAKER_WINDOW = int(os.getenv('BREAKER_WINDOW', '20'))
+BREAKER_MIN_CALLS = int(os.getenv('BREAKER_MIN_CALLS', '10'))
+BREAKER_FAILURE_RATIO = float(os.getenv('BREAKER_FAILURE_RATIO', '0.5'))
+BREAKER_SLOW_CALL_DURATION = float(os.getenv('BREAKER_SLOW_CALL_DURATION', '0')) or None
+BREAKER_OPEN_DURATION = float(os.getenv('BREAKER_OPEN_DURATION', '30'))
+BREAKER_HALF_OPEN_CALLS = int(os.getenv('BREAKER_HALF_OPEN_CALLS', '1'))
+
+RATE_LIMIT = float(os.getenv('RATE_LIMIT', '0')) or None
+RATE_LIMIT_BURST = int(os.getenv('RATE_LIMIT_BURST', '1'))
+RATE_LIMIT_MAX_CONCURRENCY = int(os.getenv('RATE_LIMIT_MAX_CONCURRENCY', '0')) or None
+RATE_LIMIT_ADAPTIVE = get_bool('RATE_LIMIT_ADAPTIVE')
+RATE_LIMIT_MIN_CONCURRENCY = int(os.getenv('RATE_LIMIT_MIN_CONCURRENCY', '1'))
+RATE_LIMIT_LATENCY_TARGET = float(os.getenv('RATE_LIMIT_LATENCY_TARGET', '0')) or None
+
+SCHEDULER_MAX_CONCURRENCY = int(os.getenv('SCHEDULER_MAX_CONCURRENCY', '0')) or None
+SCHEDULER_WEIGHTS = get_shares('SCHEDULER_WEIGHTS', 'interactive:6,normal:3,bulk:1')
+SCHEDULER_RESERVED = get_shares('SCHEDULER_RESERVED')
+
+STREAM_PARSE = get_bool('STREAM_PARSE')
+STREAM_PARSE_MARKER_BYTES = int(os.getenv('STREAM_PARSE_MARKER_BYTES', '131072')) or None
+STREAM_PARSE_MAX_BODY_SIZE = int(os.getenv('STREAM_PARSE_MAX_BODY_SIZE', '0')) or None
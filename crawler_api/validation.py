@@ -0,0 +1,83 @@
+from typing import NamedTuple
+
+import numpy as np
+
+from crawler_api.models.requests import INVALID_CHECK_DIGIT, INVALID_NUMBER_FORMAT, LEGAL_PROCESS_NUMBER_PATTERN
+
+NUMBER_SIZE = 25
+SEPARATORS = {7: '-', 10: '.', 15: '.', 17: '.', 20: '.'}
+DIGIT_POSITIONS = [position for position in range(NUMBER_SIZE) if position not in SEPARATORS]
+CHECK_DIGIT_POSITIONS = [8, 9]
+# NNNNNNNAAAAJTROOOO, the digits of the check digit calculation
+MOD_POSITIONS = [position for position in DIGIT_POSITIONS if position not in CHECK_DIGIT_POSITIONS]
+COURT_SLICE = slice(18, 20)
+
+VALID = 0
+INVALID_FORMAT = 1
+INVALID_DIGIT = 2
+ERRORS = np.array([None, INVALID_NUMBER_FORMAT, INVALID_CHECK_DIGIT], dtype=object)
+
+
+class NumbersValidation(NamedTuple):
+    """
+    Arrays with the validity, court code (None when invalid) and
+    LegalProcess validation error of each number.
+    """
+
+    valid: np.ndarray
+    courts: np.ndarray
+    errors: np.ndarray
+
+
+def validate_number(number):
+    """
+    Return the validation code of a single number, the same as
+    LegalProcess.check_number and LegalProcess.check_digit_validation.
+    """
+    if not LEGAL_PROCESS_NUMBER_PATTERN.fullmatch(number.upper()):
+        return INVALID_FORMAT
+    remainder = 0
+    for position in MOD_POSITIONS:
+        remainder = (remainder * 10 + int(number[position])) % 97
+    return VALID if int(number[8:10]) == 98 - remainder * 100 % 97 else INVALID_DIGIT
+
+
+def validate_numbers(numbers):
+    """
+    Validate many legal process numbers at once.
+
+    The ASCII numbers with the expected size are checked as a matrix of
+    bytes: the separators and digits by column and the check digit (mod 97
+    of NNNNNNNAAAAJTROOOO00) one column at a time for all the rows. The
+    few other numbers that may still match the pattern (non ASCII digits)
+    are checked by `validate_number`.
+    """
+    numbers = np.array(numbers, dtype=object).reshape(-1)
+    size = len(numbers)
+    sizes = np.fromiter(map(len, numbers), dtype=np.int64, count=size)
+    is_ascii = np.fromiter(map(str.isascii, numbers), dtype=bool, count=size)
+    codes = np.full(size, INVALID_FORMAT, dtype=np.int8)
+
+    rows = np.flatnonzero((sizes == NUMBER_SIZE) & is_ascii)
+    chars = numbers[rows].astype(f'S{NUMBER_SIZE}').view(np.uint8).reshape(-1, NUMBER_SIZE)
+    # The bytes below '0' wrap around, so any non digit byte is above 9
+    digits = chars - np.uint8(ord('0'))
+    formatted = np.all(digits[:, DIGIT_POSITIONS] <= 9, axis=1)
+    for position, separator in SEPARATORS.items():
+        formatted &= chars[:, position] == ord(separator)
+    remainder = np.zeros(len(rows), dtype=np.int32)
+    for position in MOD_POSITIONS:
+        remainder = (remainder * 10 + digits[:, position]) % 97
+    remainder = remainder * 100 % 97
+    check_digit = digits[:, 8].astype(np.int32) * 10 + digits[:, 9]
+    codes[rows] = np.where(formatted, np.where(check_digit == 98 - remainder, VALID, INVALID_DIGIT), INVALID_FORMAT)
+    courts = np.full(size, None, dtype=object)
+    courts[rows] = chars[:, COURT_SLICE].copy().view('S2').reshape(-1).astype('U2')
+
+    for row in np.flatnonzero((sizes == NUMBER_SIZE) & ~is_ascii):
+        codes[row] = validate_number(numbers[row])
+        courts[row] = numbers[row][COURT_SLICE]
+
+    valid = codes == VALID
+    courts[~valid] = None
+    return NumbersValidation(valid, courts, ERRORS[codes])
@@ -0,0 +1,8 @@
+import pytest
+
+from crawler_api.crawlers.parsers import PARSER_BACKENDS
+
+
+@pytest.fixture(params=list(PARSER_BACKENDS))
+def parser_backend(request):
+    return PARSER_BACKENDS[request.param]
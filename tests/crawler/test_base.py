@@ -1,10 +1,21 @@
-from unittest.mock import Mock
+import asyncio
+import hashlib
+from unittest.mock import Mock, PropertyMock
 
 import pytest
 from asynctest import CoroutineMock, call
 from parsel import Selector
 
-from crawler_api.crawlers.base import BaseCrawler
+from crawler_api.crawlers.base import BaseCrawler, RefreshState
+from crawler_api.crawlers.breaker import CircuitBreaker, CircuitOpenError
+from crawler_api.crawlers.cache import ResultCache
+from crawler_api.crawlers.coalescing import SingleFlight
+from crawler_api.crawlers.helper import HostRegistry
+from crawler_api.crawlers.limiter import RateLimiter
+from crawler_api.crawlers.parsers import DEFAULT_PARSE_OPTIONS, ParseOptions
+from crawler_api.crawlers.retry import RetryPolicy, UpstreamError
+from crawler_api.crawlers.scheduler import PriorityScheduler
+from crawler_api.crawlers.store import PageStore
 
 
 @pytest.fixture
@@ -13,7 +24,10 @@ def fake_crawler():
         paths = {'one': 'localhost/{id}', 'two': '127.0.0.1/{id}'}
         parse = Mock()
     session = CoroutineMock()
-    session.get.return_value.__aenter__.return_value.text = CoroutineMock(return_value='<html><h1>Test</h1></html>')
+    response = session.get.return_value.__aenter__.return_value
+    response.status = 200
+    response.read = CoroutineMock(return_value='<html><h1>Test</h1></html>'.encode('utf-8'))
+    response.get_encoding = Mock(return_value='utf-8')
     return FakeCrawler(session)
 
 
@@ -38,10 +52,10 @@ async def test_parser_call_for_each_request_on_execute(fake_crawler):
     args1, args2 = fake_crawler.parse.call_args_list
     assert isinstance(args1[0][0], Selector)
     assert args1[0][0].get(), '<html><h1>Test</h1></html>'
-    assert args1[1] == {'_id': 'one'}
+    assert args1[1] == {'_id': 'one', 'options': DEFAULT_PARSE_OPTIONS}
     assert isinstance(args2[0][0], Selector)
     assert args2[0][0].get(), '<html><h1>Test</h1></html>'
-    assert args2[1] == {'_id': 'two'}
+    assert args2[1] == {'_id': 'two', 'options': DEFAULT_PARSE_OPTIONS}
 
 
 def test_type_error_when_create_a_instance_without_implement_abstract_method():
@@ -69,3 +83,488 @@ async def test_execute_ignore_empty_results(fake_crawler):
     fake_crawler.parse = Mock(side_effect=['One', '', None, []])
     result = await fake_crawler.execute(id=123, name='987')
     assert list(result) == ['One']
+
+
+@pytest.mark.asyncio
+async def test_execute_return_cached_result_without_request(fake_crawler):
+    fake_crawler.cache = ResultCache(ttl=10, negative_ttl=10, max_entries=10)
+    fake_crawler.parse = Mock(side_effect=['One', None])
+    await fake_crawler.execute(id=123)
+    result = await fake_crawler.execute(id=123)
+    assert list(result) == ['One']
+    assert fake_crawler.session.get.call_count == 2
+    assert fake_crawler.parse.call_count == 2
+    assert fake_crawler.cache.stats()['hits'] == 2
+
+
+@pytest.mark.asyncio
+async def test_execute_cache_by_url(fake_crawler):
+    fake_crawler.cache = ResultCache(ttl=10, negative_ttl=10, max_entries=10)
+    fake_crawler.parse = Mock(side_effect=['One', 'Two', 'Three', 'Four'])
+    await fake_crawler.execute(id=123)
+    result = await fake_crawler.execute(id=321)
+    assert list(result) == ['Three', 'Four']
+    assert fake_crawler.session.get.call_count == 4
+
+
+@pytest.mark.asyncio
+async def test_execute_only_selected_degrees(fake_crawler):
+    fake_crawler.parse = Mock(return_value='Two')
+    result = await fake_crawler.execute(degrees={'two'}, id=123)
+    assert list(result) == ['Two']
+    fake_crawler.session.get.assert_called_once_with('127.0.0.1/123')
+
+
+@pytest.mark.asyncio
+async def test_execute_parse_with_include_and_updates_limit(fake_crawler):
+    await fake_crawler.execute(include=['updates'], updates_limit=5, id=123)
+    options = ParseOptions(frozenset(['updates']), 5)
+    assert [args[1]['options'] for args in fake_crawler.parse.call_args_list] == [options, options]
+
+
+@pytest.mark.asyncio
+async def test_execute_cache_by_url_and_parse_options(fake_crawler):
+    fake_crawler.cache = ResultCache(ttl=10, negative_ttl=10, max_entries=10)
+    fake_crawler.parse = Mock(side_effect=['One', 'Two', 'Three', 'Four'])
+    await fake_crawler.execute(id=123)
+    result = await fake_crawler.execute(include=[], id=123)
+    assert list(result) == ['Three', 'Four']
+    result = await fake_crawler.execute(id=123)
+    assert list(result) == ['One', 'Two']
+    assert fake_crawler.session.get.call_count == 4
+
+
+@pytest.mark.asyncio
+async def test_execute_cache_compact_result(fake_crawler):
+    fake_crawler.paths = {'one': 'localhost/{id}'}
+    fake_crawler.cache = ResultCache(ttl=10, negative_ttl=10, max_entries=10)
+    fake_crawler.parse = Mock(return_value='One')
+    fake_crawler.compact = str.upper
+    fake_crawler.expand = str.lower
+    assert list(await fake_crawler.execute(id=123)) == ['One']
+    assert fake_crawler.cache.get(('localhost/123', DEFAULT_PARSE_OPTIONS)) == 'ONE'
+    assert list(await fake_crawler.execute(id=123)) == ['one']
+
+
+@pytest.mark.asyncio
+async def test_concurrent_execute_share_requests_with_single_flight(fake_crawler):
+    fake_crawler.single_flight = SingleFlight()
+    fake_crawler.parse = Mock(side_effect=['One', 'Two'])
+    first, second = await asyncio.gather(fake_crawler.execute(id=123), fake_crawler.execute(id=123))
+    assert list(first) == list(second) == ['One', 'Two']
+    assert fake_crawler.session.get.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_coalesced_execute_do_not_take_scheduler_slots(fake_crawler):
+    fake_crawler.paths = {'one': 'https://one/{id}'}
+    fake_crawler.single_flight = SingleFlight()
+    fake_crawler.schedulers = HostRegistry(lambda: PriorityScheduler(max_concurrency=4))
+    fake_crawler.parse = Mock(return_value='One')
+    results = await asyncio.gather(*(fake_crawler.execute(id=123) for _ in range(6)))
+    assert [list(result) for result in results] == [['One']] * 6
+    assert fake_crawler.session.get.call_count == 1
+    assert fake_crawler.single_flight.coalesced == 5
+    assert fake_crawler.schedulers['https://one'].stats()['normal']['calls'] == 1
+
+
+@pytest.mark.asyncio
+async def test_execute_decode_body_with_response_encoding(fake_crawler):
+    response = fake_crawler.session.get.return_value.__aenter__.return_value
+    response.read.return_value = '<html><h1>Olá</h1></html>'.encode('latin-1')
+    response.get_encoding.return_value = 'latin-1'
+    await fake_crawler.execute(id=123)
+    selector = fake_crawler.parse.call_args[0][0]
+    assert selector.xpath('//h1/text()').get() == 'Olá'
+
+
+@pytest.mark.asyncio
+async def test_execute_parse_with_parse_executor(fake_crawler):
+    fake_crawler.parse_executor = Mock()
+    fake_crawler.parse_executor.parse = CoroutineMock(side_effect=['One', 'Two'])
+    result = await fake_crawler.execute(id=123)
+    assert list(result) == ['One', 'Two']
+    fake_crawler.parse_executor.parse.assert_has_calls(
+        [
+            call(fake_crawler, b'<html><h1>Test</h1></html>', 'utf-8', 'one', DEFAULT_PARSE_OPTIONS),
+            call(fake_crawler, b'<html><h1>Test</h1></html>', 'utf-8', 'two', DEFAULT_PARSE_OPTIONS)
+        ],
+        any_order=True
+    )
+    fake_crawler.parse.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_execute_return_done_results_and_timed_out_ids(fake_crawler):
+    async def start_request(_id, url, **kwargs):
+        await asyncio.sleep(0 if _id == 'one' else 1)
+        return _id
+
+    fake_crawler._start_request = start_request
+    result = await fake_crawler.execute(timeout=0.01, id=123)
+    assert list(result) == ['one']
+    assert fake_crawler.timed_out == ['two']
+
+
+@pytest.mark.asyncio
+async def test_execute_cancel_timed_out_requests(fake_crawler):
+    cancelled = []
+
+    async def start_request(_id, url, **kwargs):
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(_id)
+            raise
+
+    fake_crawler._start_request = start_request
+    result = await fake_crawler.execute(timeout=0.01, id=123)
+    await asyncio.sleep(0)
+    assert list(result) == []
+    assert sorted(cancelled) == ['one', 'two']
+
+
+@pytest.mark.asyncio
+async def test_execute_without_timeout_wait_all_requests(fake_crawler):
+    result = await fake_crawler.execute(id=123)
+    assert len(list(result)) == 2
+    assert fake_crawler.timed_out == []
+
+
+@pytest.mark.asyncio
+async def test_execute_raise_request_error(fake_crawler):
+    fake_crawler.session.get.side_effect = ValueError('error')
+    with pytest.raises(ValueError):
+        await fake_crawler.execute(id=123)
+
+
+@pytest.mark.asyncio
+async def test_execute_return_done_results_and_failed_ids(fake_crawler):
+    async def start_request(_id, url, **kwargs):
+        if _id == 'two':
+            raise UpstreamError(503)
+        return _id
+
+    fake_crawler._start_request = start_request
+    result = await fake_crawler.execute(id=123)
+    assert list(result) == ['one']
+    assert fake_crawler.failed == {'two': 'Court responded with status 503'}
+
+
+@pytest.mark.asyncio
+async def test_execute_raise_court_error_when_all_requests_failed(fake_crawler):
+    async def start_request(_id, url, **kwargs):
+        raise CircuitOpenError() if _id == 'one' else UpstreamError(503)
+
+    fake_crawler._start_request = start_request
+    with pytest.raises(CircuitOpenError):
+        await fake_crawler.execute(id=123)
+    assert fake_crawler.failed == {'one': 'Court unavailable', 'two': 'Court responded with status 503'}
+
+
+@pytest.mark.asyncio
+async def test_execute_without_paths(fake_crawler):
+    fake_crawler.paths = {}
+    result = await fake_crawler.execute(id=123)
+    assert list(result) == []
+
+
+@pytest.mark.asyncio
+async def test_execute_request_with_retry_policy_by_host(fake_crawler):
+    fake_crawler.paths = {'one': 'https://one/{id}', 'two': 'https://two/{id}'}
+    fake_crawler.retry_policies = HostRegistry(lambda: RetryPolicy(backoff=0))
+    response = fake_crawler.session.get.return_value.__aenter__.return_value
+    response.status = 200
+    fake_crawler.parse = Mock(side_effect=['One', 'Two'])
+    result = await fake_crawler.execute(id=123)
+    assert list(result) == ['One', 'Two']
+    assert set(fake_crawler.retry_policies) == {'https://one', 'https://two'}
+
+
+@pytest.mark.asyncio
+async def test_execute_retry_request_with_retryable_status(fake_crawler):
+    fake_crawler.paths = {'one': 'https://one/{id}'}
+    fake_crawler.retry_policies = HostRegistry(lambda: RetryPolicy(backoff=0))
+    response = fake_crawler.session.get.return_value.__aenter__.return_value
+    type(response).status = PropertyMock(side_effect=[503, 200])
+    await fake_crawler.execute(id=123)
+    assert fake_crawler.session.get.call_count == 2
+    assert fake_crawler.parse.call_count == 1
+    assert fake_crawler.retry_policies['https://one'].retries == 1
+
+
+@pytest.mark.asyncio
+async def test_execute_raise_upstream_error_when_retries_run_out(fake_crawler):
+    fake_crawler.paths = {'one': 'https://one/{id}'}
+    fake_crawler.retry_policies = HostRegistry(lambda: RetryPolicy(backoff=0))
+    fake_crawler.cache = ResultCache(ttl=60, negative_ttl=60, max_entries=10)
+    response = fake_crawler.session.get.return_value.__aenter__.return_value
+    response.status = 503
+    with pytest.raises(UpstreamError) as error:
+        await fake_crawler.execute(id=123)
+    assert error.value.status == 503
+    assert fake_crawler.session.get.call_count == 3
+    fake_crawler.parse.assert_not_called()
+    assert fake_crawler.cache.stats()['size'] == 0
+
+
+@pytest.mark.asyncio
+async def test_execute_raise_upstream_error_on_server_error_without_retry_policy(fake_crawler):
+    fake_crawler.paths = {'one': 'https://one/{id}'}
+    response = fake_crawler.session.get.return_value.__aenter__.return_value
+    response.status = 501
+    with pytest.raises(UpstreamError):
+        await fake_crawler.execute(id=123)
+    fake_crawler.parse.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_execute_do_not_retry_request_with_circuit_open(fake_crawler):
+    fake_crawler.paths = {'one': 'https://one/{id}'}
+    fake_crawler.circuit_breakers = HostRegistry(lambda: CircuitBreaker(window=1, min_calls=1))
+    fake_crawler.retry_policies = HostRegistry(lambda: RetryPolicy(max_attempts=2, backoff=0))
+    response = fake_crawler.session.get.return_value.__aenter__.return_value
+    response.status = 500
+    with pytest.raises(CircuitOpenError):
+        await fake_crawler.execute(id=123)
+    assert fake_crawler.session.get.call_count == 1
+    assert fake_crawler.circuit_breakers['https://one'].state == 'open'
+
+
+@pytest.mark.asyncio
+async def test_execute_with_circuit_open_do_not_wait_on_rate_limiter(fake_crawler):
+    fake_crawler.paths = {'one': 'https://one/{id}'}
+    fake_crawler.circuit_breakers = HostRegistry(lambda: CircuitBreaker(window=1, min_calls=1))
+    fake_crawler.circuit_breakers['https://one']._open()
+    fake_crawler.rate_limiters = HostRegistry(lambda: RateLimiter(rate=2))
+    fake_crawler.retry_policies = HostRegistry(lambda: RetryPolicy(backoff=0))
+    for _ in range(6):
+        with pytest.raises(CircuitOpenError):
+            await asyncio.wait_for(fake_crawler.execute(id=123), 0.1)
+    assert fake_crawler.rate_limiters['https://one'].tokens == 1
+    assert fake_crawler.circuit_breakers['https://one'].stats()['rejected'] == 6
+    fake_crawler.session.get.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_execute_request_with_rate_limiter_by_host(fake_crawler):
+    fake_crawler.paths = {'one': 'https://one/{id}', 'two': 'https://one/{id}/two'}
+    fake_crawler.rate_limiters = HostRegistry(lambda: RateLimiter(max_concurrency=1))
+    response = fake_crawler.session.get.return_value.__aenter__.return_value
+    response.status = 200
+    await fake_crawler.execute(id=123)
+    assert fake_crawler.session.get.call_count == 2
+    assert list(fake_crawler.rate_limiters) == ['https://one']
+
+
+@pytest.mark.asyncio
+async def test_execute_request_with_scheduler_by_host(fake_crawler):
+    fake_crawler.paths = {'one': 'https://one/{id}', 'two': 'https://one/{id}/two'}
+    fake_crawler.schedulers = HostRegistry(lambda: PriorityScheduler(max_concurrency=1))
+    response = fake_crawler.session.get.return_value.__aenter__.return_value
+    response.status = 200
+    await fake_crawler.execute(id=123, priority='bulk')
+    assert fake_crawler.session.get.call_count == 2
+    assert list(fake_crawler.schedulers) == ['https://one']
+    assert fake_crawler.schedulers['https://one'].stats()['bulk']['calls'] == 2
+
+
+@pytest.mark.asyncio
+async def test_execute_with_stream_parse(fake_crawler):
+    fake_crawler.stream_parse = Mock()
+    fake_crawler.stream_parse.read = CoroutineMock(side_effect=[Selector(text='<h1>Test</h1>').root, None])
+    response = fake_crawler.session.get.return_value.__aenter__.return_value
+    response.charset = None
+    fake_crawler.parse = Mock(return_value='One')
+    result = await fake_crawler.execute(id=123)
+    assert list(result) == ['One']
+    fake_crawler.stream_parse.read.assert_called_with(response, None, 'utf-8')
+    selector = fake_crawler.parse.call_args[0][0]
+    assert selector.xpath('//h1/text()').get() == 'Test'
+    fake_crawler.parse.assert_called_once()
+    response.read.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_execute_with_stream_parse_use_response_charset(fake_crawler):
+    fake_crawler.stream_parse = Mock()
+    fake_crawler.stream_parse.read = CoroutineMock(return_value=None)
+    fake_crawler.detail_marker = ('div', {})
+    response = fake_crawler.session.get.return_value.__aenter__.return_value
+    response.charset = 'latin-1'
+    await fake_crawler.execute(id=123)
+    fake_crawler.stream_parse.read.assert_called_with(response, ('div', {}), 'latin-1')
+
+
+@pytest.mark.asyncio
+async def test_execute_keep_pages_on_page_store(fake_crawler, tmp_path):
+    fake_crawler.court = 'fake'
+    fake_crawler.page_store = PageStore(str(tmp_path))
+    fake_crawler.paths = {'one': 'localhost/{number}', 'two': '127.0.0.1/{number}'}
+    await fake_crawler.execute(number='1234567-69.1234.1.12.1234')
+    entries = fake_crawler.page_store.latest('fake', '1234567-69.1234.1.12.1234')
+    assert sorted(entries) == ['one', 'two']
+    assert fake_crawler.page_store.read(entries['one']['digest']) == b'<html><h1>Test</h1></html>'
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('status', (404, 503))
+async def test_execute_do_not_keep_error_pages_on_page_store(fake_crawler, tmp_path, status):
+    fake_crawler.court = 'fake'
+    fake_crawler.page_store = PageStore(str(tmp_path))
+    fake_crawler.paths = {'one': 'localhost/{number}'}
+    response = fake_crawler.session.get.return_value.__aenter__.return_value
+    response.status = status
+    await asyncio.gather(fake_crawler.execute(number='1234567-69.1234.1.12.1234'), return_exceptions=True)
+    assert fake_crawler.page_store.latest('fake', '1234567-69.1234.1.12.1234') == {}
+
+
+@pytest.mark.asyncio
+async def test_execute_parse_fresh_pages_of_page_store(fake_crawler, tmp_path):
+    fake_crawler.court = 'fake'
+    fake_crawler.page_store = PageStore(str(tmp_path), max_age=60)
+    fake_crawler.page_store.put('fake', 'one', '1234567-69.1234.1.12.1234', '<h1>Olá</h1>'.encode('latin-1'), 'latin-1')
+    fake_crawler.paths = {'one': 'localhost/{number}'}
+    await fake_crawler.execute(number='1234567-69.1234.1.12.1234')
+    fake_crawler.session.get.assert_not_called()
+    assert fake_crawler.parse.call_args[0][0].xpath('//h1/text()').get() == 'Olá'
+
+
+@pytest.mark.asyncio
+async def test_execute_without_number_does_not_use_page_store(fake_crawler):
+    fake_crawler.page_store = Mock()
+    await fake_crawler.execute(id=123)
+    fake_crawler.page_store.get.assert_not_called()
+    fake_crawler.page_store.put.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_execute_with_stream_parse_does_not_use_page_store(fake_crawler):
+    fake_crawler.page_store = Mock()
+    fake_crawler.stream_parse = Mock()
+    fake_crawler.stream_parse.read = CoroutineMock(return_value=None)
+    fake_crawler.paths = {'one': 'localhost/{number}'}
+    await fake_crawler.execute(number='1234567-69.1234.1.12.1234')
+    fake_crawler.page_store.get.assert_not_called()
+    fake_crawler.page_store.put.assert_not_called()
+
+
+@pytest.fixture
+def refresh_crawler(fake_crawler):
+    response = fake_crawler.session.get.return_value.__aenter__.return_value
+    response.status = 200
+    response.headers = {'ETag': '"abc"'}
+    fake_crawler.parse = Mock(return_value={'degree': 'one', 'updates': [{'date': '08/10/2020', 'description': 'New'}]})
+    return fake_crawler
+
+
+@pytest.mark.asyncio
+async def test_refresh_parse_only_updates_since_the_latest_known(refresh_crawler):
+    state = RefreshState(latest_update=('07/10/2020', 'Old'), last_modified='Wed, 07 Oct 2020 10:00:00 GMT')
+    result = list(await refresh_crawler.refresh({'one': state}, id=123))
+    assert result == [
+        {
+            'degree': 'one',
+            'modified': True,
+            'content_hash': hashlib.sha256(b'<html><h1>Test</h1></html>').hexdigest(),
+            'etag': '"abc"',
+            'last_modified': 'Wed, 07 Oct 2020 10:00:00 GMT',
+            'updates': [{'date': '08/10/2020', 'description': 'New'}]
+        }
+    ]
+    refresh_crawler.session.get.assert_called_once_with(
+        'localhost/123', headers={'If-Modified-Since': 'Wed, 07 Oct 2020 10:00:00 GMT'}
+    )
+    assert refresh_crawler.parse.call_args[1] == {
+        '_id': 'one',
+        'options': ParseOptions(include=frozenset(['updates']), updates_since=('07/10/2020', 'Old'))
+    }
+
+
+@pytest.mark.asyncio
+async def test_refresh_parse_with_parse_executor(refresh_crawler):
+    refresh_crawler.parse_executor = Mock()
+    refresh_crawler.parse_executor.parse = CoroutineMock(
+        return_value={'degree': 'one', 'updates': [{'date': '08/10/2020', 'description': 'New'}]}
+    )
+    state = RefreshState(latest_update=('07/10/2020', 'Old'))
+    result = list(await refresh_crawler.refresh({'one': state}, id=123))
+    assert result[0]['updates'] == [{'date': '08/10/2020', 'description': 'New'}]
+    refresh_crawler.parse_executor.parse.assert_called_once_with(
+        refresh_crawler, b'<html><h1>Test</h1></html>', 'utf-8', 'one',
+        ParseOptions(include=frozenset(['updates']), updates_since=('07/10/2020', 'Old'))
+    )
+    refresh_crawler.parse.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_refresh_do_not_parse_not_modified_page(refresh_crawler):
+    response = refresh_crawler.session.get.return_value.__aenter__.return_value
+    response.status = 304
+    response.headers = {}
+    state = RefreshState(content_hash='hash', etag='"abc"')
+    result = list(await refresh_crawler.refresh({'one': state}, id=123))
+    assert result == [
+        {'degree': 'one', 'modified': False, 'content_hash': 'hash', 'etag': '"abc"', 'last_modified': None, 'updates': []}
+    ]
+    refresh_crawler.session.get.assert_called_once_with('localhost/123', headers={'If-None-Match': '"abc"'})
+    response.read.assert_not_called()
+    refresh_crawler.parse.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_refresh_do_not_parse_page_with_known_content_hash(refresh_crawler):
+    content_hash = hashlib.sha256(b'<html><h1>Test</h1></html>').hexdigest()
+    result = list(await refresh_crawler.refresh({'one': RefreshState(content_hash=content_hash)}, id=123))
+    assert result[0]['modified'] is False
+    assert result[0]['content_hash'] == content_hash
+    refresh_crawler.session.get.assert_called_once_with('localhost/123', headers={})
+    refresh_crawler.parse.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_refresh_only_known_degrees_of_the_crawler(refresh_crawler):
+    refresh_crawler.parse.return_value = None
+    result = list(await refresh_crawler.refresh({'two': RefreshState(), 'three': RefreshState()}, id=123))
+    assert result == []
+    refresh_crawler.session.get.assert_called_once_with('127.0.0.1/123', headers={})
+
+
+@pytest.mark.asyncio
+async def test_refresh_request_with_scheduler_by_host(refresh_crawler):
+    refresh_crawler.schedulers = HostRegistry(lambda: PriorityScheduler(max_concurrency=1))
+    await refresh_crawler.refresh({'one': RefreshState()}, priority='interactive', id=123)
+    assert refresh_crawler.schedulers['://'].stats()['interactive']['calls'] == 1
+
+
+@pytest.mark.asyncio
+async def test_refresh_raise_upstream_error_on_error_status(refresh_crawler):
+    response = refresh_crawler.session.get.return_value.__aenter__.return_value
+    response.status = 429
+    with pytest.raises(UpstreamError):
+        await refresh_crawler.refresh({'one': RefreshState()}, id=123)
+    refresh_crawler.parse.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_refresh_with_stream_parse(refresh_crawler):
+    refresh_crawler.stream_parse = Mock()
+    refresh_crawler.stream_parse.read = CoroutineMock(side_effect=[Selector(text='<h1>Test</h1>').root, None])
+    response = refresh_crawler.session.get.return_value.__aenter__.return_value
+    response.charset = None
+    result = list(await refresh_crawler.refresh({'one': RefreshState(), 'two': RefreshState()}, id=123))
+    assert [item['content_hash'] for item in result] == [None]
+    assert result[0]['modified'] is True
+    assert refresh_crawler.parse.call_args[0][0].xpath('//h1/text()').get() == 'Test'
+
+
+@pytest.mark.asyncio
+async def test_refresh_return_done_results_and_timed_out_ids(refresh_crawler):
+    async def _refresh(_id, url, state):
+        if _id == 'two':
+            await asyncio.sleep(1)
+        return _id
+    refresh_crawler._refresh = _refresh
+    result = await refresh_crawler.refresh({'one': RefreshState(), 'two': RefreshState()}, timeout=0.01, id=123)
+    assert list(result) == ['one']
+    assert refresh_crawler.timed_out == ['two']
@@ -0,0 +1,158 @@
+import asyncio
+
+import pytest
+from aiohttp import ClientError
+from asynctest import CoroutineMock
+
+from crawler_api.crawlers.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def circuit_breaker(clock):
+    return CircuitBreaker(failure_ratio=0.5, window=4, min_calls=2, open_duration=10, clock=clock)
+
+
+async def fail(circuit_breaker, times=1):
+    for _ in range(times):
+        with pytest.raises(ClientError):
+            await circuit_breaker.call(CoroutineMock(side_effect=ClientError()))
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_return_result(circuit_breaker):
+    function = CoroutineMock(return_value=(200, b'', 'utf-8'))
+    assert await circuit_breaker.call(function, 'url') == (200, b'', 'utf-8')
+    function.assert_called_once_with('url')
+    assert circuit_breaker.state == CLOSED
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_open_on_failure_ratio(circuit_breaker):
+    await circuit_breaker.call(CoroutineMock(return_value=(200, b'', 'utf-8')))
+    await fail(circuit_breaker)
+    assert circuit_breaker.state == OPEN
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_wait_min_calls(circuit_breaker):
+    await fail(circuit_breaker)
+    assert circuit_breaker.state == CLOSED
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_count_server_errors_as_failure(circuit_breaker):
+    function = CoroutineMock(return_value=(503, b'', 'utf-8'))
+    await circuit_breaker.call(function)
+    await circuit_breaker.call(function)
+    assert circuit_breaker.state == OPEN
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_count_slow_calls_as_failure(clock):
+    circuit_breaker = CircuitBreaker(window=2, min_calls=2, slow_call_duration=1, clock=clock)
+
+    async def slow_call():
+        clock.now += 2
+        return 200, b'', 'utf-8'
+
+    await circuit_breaker.call(slow_call)
+    await circuit_breaker.call(slow_call)
+    assert circuit_breaker.state == OPEN
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_fail_fast_while_open(circuit_breaker):
+    await fail(circuit_breaker, times=2)
+    function = CoroutineMock()
+    with pytest.raises(CircuitOpenError):
+        await circuit_breaker.call(function)
+    function.assert_not_called()
+    assert circuit_breaker.stats()['rejected'] == 1
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_close_after_successful_probe(circuit_breaker, clock):
+    await fail(circuit_breaker, times=2)
+    clock.now = 10
+    await circuit_breaker.call(CoroutineMock(return_value=(200, b'', 'utf-8')))
+    assert circuit_breaker.state == CLOSED
+    assert circuit_breaker.stats()['calls'] == 0
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_open_again_after_failed_probe(circuit_breaker, clock):
+    await fail(circuit_breaker, times=2)
+    clock.now = 10
+    await fail(circuit_breaker)
+    assert circuit_breaker.state == OPEN
+    clock.now = 19
+    with pytest.raises(CircuitOpenError):
+        await circuit_breaker.call(CoroutineMock())
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_limit_half_open_probes(circuit_breaker, clock):
+    await fail(circuit_breaker, times=2)
+    clock.now = 10
+    probe = asyncio.ensure_future(circuit_breaker.call(asyncio.sleep, 1))
+    await asyncio.sleep(0)
+    assert circuit_breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        await circuit_breaker.call(CoroutineMock())
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+    assert circuit_breaker.probes == 0
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_guard_reject_before_call_while_open(circuit_breaker, clock):
+    await fail(circuit_breaker, times=2)
+    function = CoroutineMock()
+    with pytest.raises(CircuitOpenError):
+        await circuit_breaker.guard(function)
+    function.assert_not_called()
+    assert circuit_breaker.stats()['rejected'] == 1
+    clock.now = 10
+    await circuit_breaker.guard(function, 'url')
+    function.assert_called_once_with('url')
+    assert circuit_breaker.state == OPEN
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_guard_reject_without_free_probes(circuit_breaker, clock):
+    await fail(circuit_breaker, times=2)
+    clock.now = 10
+    probe = asyncio.ensure_future(circuit_breaker.call(asyncio.sleep, 1))
+    await asyncio.sleep(0)
+    with pytest.raises(CircuitOpenError):
+        await circuit_breaker.guard(CoroutineMock())
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_ignore_other_errors(circuit_breaker):
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            await circuit_breaker.call(CoroutineMock(side_effect=ValueError()))
+    assert circuit_breaker.state == CLOSED
+    assert circuit_breaker.stats()['calls'] == 0
+
+
+def test_circuit_breaker_stats(circuit_breaker):
+    assert circuit_breaker.stats() == {'state': 'closed', 'calls': 0, 'failures': 0, 'rejected': 0}
@@ -0,0 +1,73 @@
+import pytest
+
+from crawler_api.crawlers.cache import MISSING, ResultCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def result_cache(clock):
+    return ResultCache(ttl=10, negative_ttl=2, max_entries=2, clock=clock)
+
+
+def test_result_cache_miss(result_cache):
+    assert result_cache.get('key') is MISSING
+    assert result_cache.stats()['misses'] == 1
+
+
+def test_result_cache_hit(result_cache):
+    result_cache.set('key', {'degree': '1º'})
+    assert result_cache.get('key') == {'degree': '1º'}
+    assert result_cache.stats()['hits'] == 1
+
+
+def test_result_cache_expire_entry_after_ttl(result_cache, clock):
+    result_cache.set('key', {'degree': '1º'})
+    clock.now = 9
+    assert result_cache.get('key') == {'degree': '1º'}
+    clock.now = 10
+    assert result_cache.get('key') is MISSING
+    assert result_cache.stats()['size'] == 0
+
+
+def test_result_cache_use_negative_ttl_for_empty_result(result_cache, clock):
+    result_cache.set('key', None)
+    clock.now = 1
+    assert result_cache.get('key') is None
+    clock.now = 2
+    assert result_cache.get('key') is MISSING
+
+
+def test_result_cache_evict_least_recently_used_entry(result_cache):
+    result_cache.set('one', 1)
+    result_cache.set('two', 2)
+    result_cache.get('one')
+    result_cache.set('three', 3)
+    assert result_cache.get('two') is MISSING
+    assert result_cache.get('one') == 1
+    assert result_cache.get('three') == 3
+    assert result_cache.stats()['evictions'] == 1
+
+
+def test_result_cache_clear(result_cache):
+    result_cache.set('key', 1)
+    result_cache.clear()
+    assert result_cache.get('key') is MISSING
+
+
+def test_result_cache_stats(result_cache):
+    result_cache.set('one', 1)
+    result_cache.get('one')
+    result_cache.get('two')
+    assert result_cache.stats() == {'size': 1, 'max_entries': 2, 'hits': 1, 'misses': 1, 'evictions': 0}
@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+from asynctest import CoroutineMock
+
+from crawler_api.crawlers.coalescing import SingleFlight
+
+
+@pytest.fixture
+def single_flight():
+    return SingleFlight()
+
+
+@pytest.mark.asyncio
+async def test_single_flight_share_concurrent_calls(single_flight):
+    async def function(value):
+        await asyncio.sleep(0.01)
+        return value
+
+    function_mock = CoroutineMock(side_effect=function)
+    result = await asyncio.gather(*(single_flight.do('key', function_mock, 'value') for _ in range(3)))
+    assert result == ['value', 'value', 'value']
+    function_mock.assert_called_once_with('value')
+    assert single_flight.stats() == {'in_flight': 0, 'coalesced': 2}
+
+
+@pytest.mark.asyncio
+async def test_single_flight_do_not_share_different_keys(single_flight):
+    function_mock = CoroutineMock(side_effect=lambda value: value)
+    result = await asyncio.gather(single_flight.do('one', function_mock, 1), single_flight.do('two', function_mock, 2))
+    assert result == [1, 2]
+    assert function_mock.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_single_flight_call_again_after_done(single_flight):
+    function_mock = CoroutineMock(return_value='value')
+    await single_flight.do('key', function_mock)
+    await single_flight.do('key', function_mock)
+    assert function_mock.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_single_flight_cancel_caller_does_not_cancel_shared_call(single_flight):
+    async def function():
+        await asyncio.sleep(0.01)
+        return 'value'
+
+    first = asyncio.ensure_future(single_flight.do('key', function))
+    second = asyncio.ensure_future(single_flight.do('key', function))
+    await asyncio.sleep(0)
+    first.cancel()
+    assert await second == 'value'
+    assert first.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_single_flight_share_exception(single_flight):
+    async def function():
+        await asyncio.sleep(0)
+        raise ValueError('error')
+
+    result = await asyncio.gather(
+        single_flight.do('key', function), single_flight.do('key', function), return_exceptions=True
+    )
+    assert [str(error) for error in result] == ['error', 'error']
+    assert single_flight.stats()['in_flight'] == 0
@@ -1,4 +1,4 @@
-from crawler_api.crawlers import COURTS, TJALCrawler, TJMSCrawler
+from crawler_api.crawlers import COURTS, TJALCrawler, TJMSCrawler, get_court_origins
 
 
 def test_crawlers_map():
@@ -7,3 +7,12 @@ def test_crawlers_map():
         '12': TJMSCrawler
     }
     assert COURTS == expected
+
+
+def test_get_court_origins():
+    assert get_court_origins() == ['https://esaj.tjms.jus.br', 'https://www2.tjal.jus.br']
+
+
+def test_crawlers_detail_marker():
+    assert TJALCrawler.detail_marker == ('table', {'class': 'secaoFormBody', 'id': ''})
+    assert TJMSCrawler.detail_marker == ('div', {'class': 'unj-entity-header'})
@@ -0,0 +1,55 @@
+import os
+
+import pytest
+from asynctest import Mock
+
+from crawler_api.crawlers import TJMSCrawler
+from crawler_api.crawlers.executor import ParseExecutor, parse_page
+from crawler_api.crawlers.parsers import DEFAULT_PARSE_OPTIONS
+
+from tests.fixtures import CRAWLER_RESPONSE
+
+
+@pytest.fixture
+def tjms_second_degree_body():
+    path = os.path.dirname(__file__)
+    with open(f'{path}/fixtures/tjms_second_degree.html', 'rb') as f:
+        return f.read()
+
+
+def test_parse_page(tjms_second_degree_body, parser_backend):
+    assert parse_page(TJMSCrawler, parser_backend, tjms_second_degree_body, 'utf-8', 'Test') == CRAWLER_RESPONSE
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('mode', ('inline', 'thread', 'process'))
+async def test_parse_executor_modes(mode, tjms_second_degree_body, parser_backend):
+    parse_executor = ParseExecutor(mode, max_workers=1)
+    crawler = TJMSCrawler(Mock(), parser_backend=parser_backend)
+    try:
+        result = await parse_executor.parse(crawler, tjms_second_degree_body, 'utf-8', 'Test')
+    finally:
+        parse_executor.shutdown()
+    assert result == CRAWLER_RESPONSE
+
+
+@pytest.mark.asyncio
+async def test_parse_executor_inline_mode_call_crawler_parse_body():
+    crawler = Mock()
+    crawler.parse_body.return_value = 'result'
+    result = await ParseExecutor('inline').parse(crawler, b'<html></html>', 'utf-8', '1º')
+    assert result == 'result'
+    crawler.parse_body.assert_called_once_with(b'<html></html>', 'utf-8', '1º', DEFAULT_PARSE_OPTIONS)
+
+
+def test_parse_executor_invalid_mode():
+    with pytest.raises(ValueError) as error:
+        ParseExecutor('invalid')
+    assert str(error.value) == 'Invalid parse executor mode: invalid. Options: inline, thread, process'
+
+
+def test_parse_executor_shutdown():
+    parse_executor = ParseExecutor('thread')
+    parse_executor.executor = Mock()
+    parse_executor.shutdown()
+    parse_executor.executor.shutdown.assert_called_once()
@@ -0,0 +1,68 @@
+import os
+
+import pytest
+from asynctest import Mock
+from parsel import Selector
+
+from crawler_api.crawlers import TJALCrawler, TJMSCrawler
+from crawler_api.crawlers.extraction import Field, SoftplanLayout
+
+
+def read_fixture(name):
+    path = os.path.dirname(__file__)
+    with open(f'{path}/fixtures/{name}') as f:
+        return Selector(text=f.read())
+
+
+@pytest.mark.parametrize('crawler_class, fixture', [
+    (TJALCrawler, 'tjal.html'),
+    (TJMSCrawler, 'tjms_first_degree.html'),
+    (TJMSCrawler, 'tjms_second_degree.html'),
+])
+def test_layout_extract_equals_selector_parse(crawler_class, fixture):
+    crawler = crawler_class(Mock())
+    assert crawler.layout.extract(read_fixture(fixture).root, '1º') == crawler.parse_selector(read_fixture(fixture), '1º')
+
+
+@pytest.mark.parametrize('crawler_class', [TJALCrawler, TJMSCrawler])
+def test_layout_extract_not_found(crawler_class):
+    crawler = crawler_class(Mock())
+    assert crawler.layout.extract(Selector(text='<html><body></body></html>').root) is None
+    assert crawler.parse_selector(Selector(text='<html><body></body></html>')) is None
+
+
+def test_layout_extract_parties_involved_equals_mixin():
+    crawler = TJALCrawler(Mock())
+    data = read_fixture('softplan_parties_involved.html')
+    expected_result = crawler.parse_parties_involved(read_fixture('softplan_parties_involved.html'))
+    assert crawler.layout.extract_parties_involved(data.css('table')[0].root) == expected_result
+
+
+def test_layout_extract_updates_equals_mixin():
+    crawler = TJALCrawler(Mock())
+    data = read_fixture('softplan_updates.html')
+    expected_result = crawler.parse_updates(read_fixture('softplan_updates.html'))
+    assert crawler.layout.extract_updates(data.css('tbody')[0].root) == expected_result
+
+
+def test_layout_extract_without_sections():
+    layout = SoftplanLayout(detail="//div[@id='detail']", fields={'class': Field('./span/text()')})
+    data = Selector(text="<div id='detail'><span>Classe</span></div>")
+    assert layout.extract(data.root, _id='2º') == {
+        'class': 'Classe',
+        'degree': '2º',
+        'parties_involved': [],
+        'updates': []
+    }
+
+
+def test_field_extract_alternatives():
+    field = Field('./b/text()', './i/text()', clean=str.upper)
+    assert field.extract(Selector(text='<p><i>value</i></p>').css('p')[0].root) == 'VALUE'
+    assert field.extract(Selector(text='<p></p>').css('p')[0].root) is None
+
+
+def test_field_select_alternatives():
+    field = Field('./b/text()', './i/text()', clean=str.upper)
+    assert field.select(Selector(text='<p><i>value</i></p>').css('p')[0]) == 'VALUE'
+    assert field.select(Selector(text='<p></p>').css('p')) is None
@@ -1,6 +1,8 @@
+from unittest.mock import Mock
+
 import pytest
 
-from crawler_api.crawlers.helper import sanitize_string
+from crawler_api.crawlers.helper import HostRegistry, get_origin, sanitize_string
 
 
 @pytest.mark.parametrize(
@@ -15,3 +17,20 @@ from crawler_api.crawlers.helper import sanitize_string
 )
 def test_sanitize_string(string):
     assert sanitize_string(string) == 'Test'
+
+
+def test_get_origin():
+    assert get_origin('https://www2.tjal.jus.br/cpopg/search.do?number={number}') == 'https://www2.tjal.jus.br'
+
+
+def test_host_registry():
+    registry = HostRegistry(list)
+    registry['https://one'].append(1)
+    registry['https://one'].append(2)
+    assert registry == {'https://one': [1, 2]}
+
+
+def test_host_registry_stats():
+    registry = HostRegistry(lambda: Mock(stats=Mock(return_value={'count': 1})))
+    registry['https://one']
+    assert registry.stats() == {'https://one': {'count': 1}}
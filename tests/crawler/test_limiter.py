@@ -0,0 +1,159 @@
+import asyncio
+
+import pytest
+from asynctest import CoroutineMock, patch
+
+from crawler_api.crawlers.limiter import RateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_without_limits_return_result():
+    rate_limiter = RateLimiter()
+    function = CoroutineMock(return_value=(200, b'', 'utf-8'))
+    assert await rate_limiter.call(function, 'url') == (200, b'', 'utf-8')
+    function.assert_called_once_with('url')
+    assert rate_limiter.stats() == {'concurrency': None, 'in_flight': 0, 'waiting': 0, 'overloads': 0}
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_limit_concurrency():
+    rate_limiter = RateLimiter(max_concurrency=2)
+    state = {'running': 0, 'max_running': 0}
+
+    async def function():
+        state['running'] += 1
+        state['max_running'] = max(state['max_running'], state['running'])
+        await asyncio.sleep(0.01)
+        state['running'] -= 1
+        return 200, b'', 'utf-8'
+
+    await asyncio.gather(*(rate_limiter.call(function) for _ in range(6)))
+    assert state['max_running'] == 2
+    assert rate_limiter.stats() == {'concurrency': 2, 'in_flight': 0, 'waiting': 0, 'overloads': 0}
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_release_slot_on_error():
+    rate_limiter = RateLimiter(max_concurrency=1)
+    with pytest.raises(ValueError):
+        await rate_limiter.call(CoroutineMock(side_effect=ValueError()))
+    assert rate_limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_cancel_waiting_call():
+    rate_limiter = RateLimiter(max_concurrency=1)
+    running = asyncio.ensure_future(rate_limiter.call(asyncio.sleep, 0.01, (200,)))
+    waiting = asyncio.ensure_future(rate_limiter.call(CoroutineMock()))
+    await asyncio.sleep(0)
+    assert rate_limiter.stats()['waiting'] == 1
+    waiting.cancel()
+    await asyncio.sleep(0)
+    assert rate_limiter.stats()['waiting'] == 0
+    assert await running == (200,)
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_wake_up_next_call_when_woken_call_is_cancelled():
+    rate_limiter = RateLimiter(max_concurrency=1)
+    rate_limiter.in_flight = 1
+    first = asyncio.ensure_future(rate_limiter.call(CoroutineMock(return_value=(200,))))
+    second = asyncio.ensure_future(rate_limiter.call(CoroutineMock(return_value=(200,))))
+    await asyncio.sleep(0)
+    rate_limiter._release_slot()
+    first.cancel()
+    assert await second == (200,)
+    assert first.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_token_bucket(clock):
+    rate_limiter = RateLimiter(rate=2, burst=2, clock=clock)
+    function = CoroutineMock(return_value=(200,))
+
+    async def sleep(delay):
+        clock.now += delay
+
+    with patch('crawler_api.crawlers.limiter.asyncio.sleep', side_effect=sleep) as sleep_mock:
+        for _ in range(4):
+            await rate_limiter.call(function)
+    assert [args[0][0] for args in sleep_mock.call_args_list] == [0.5, 0.5]
+    assert clock.now == 1
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_token_bucket_refill(clock):
+    rate_limiter = RateLimiter(rate=1, burst=1, clock=clock)
+    function = CoroutineMock(return_value=(200,))
+    with patch('crawler_api.crawlers.limiter.asyncio.sleep', CoroutineMock()) as sleep_mock:
+        await rate_limiter.call(function)
+        clock.now = 1
+        await rate_limiter.call(function)
+    sleep_mock.assert_not_called()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('status', (429, 503))
+async def test_rate_limiter_adaptive_decrease_concurrency_on_overload(status):
+    rate_limiter = RateLimiter(max_concurrency=8, adaptive=True, min_concurrency=2)
+    function = CoroutineMock(return_value=(status,))
+    await rate_limiter.call(function)
+    assert rate_limiter.limit == 4
+    await rate_limiter.call(function)
+    await rate_limiter.call(function)
+    assert rate_limiter.limit == 2
+    assert rate_limiter.stats()['overloads'] == 3
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_adaptive_decrease_concurrency_on_timeout():
+    rate_limiter = RateLimiter(max_concurrency=8, adaptive=True)
+    with pytest.raises(asyncio.TimeoutError):
+        await rate_limiter.call(CoroutineMock(side_effect=asyncio.TimeoutError()))
+    assert rate_limiter.limit == 4
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_adaptive_decrease_concurrency_on_slow_call(clock):
+    rate_limiter = RateLimiter(max_concurrency=8, adaptive=True, latency_target=1, clock=clock)
+
+    async def slow_call():
+        clock.now += 2
+        return 200,
+
+    await rate_limiter.call(slow_call)
+    assert rate_limiter.limit == 4
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_adaptive_increase_concurrency_on_success():
+    rate_limiter = RateLimiter(max_concurrency=4, adaptive=True)
+    rate_limiter.concurrency = 2
+    function = CoroutineMock(return_value=(200,))
+    for _ in range(3):
+        await rate_limiter.call(function)
+    assert rate_limiter.limit == 3
+    for _ in range(10):
+        await rate_limiter.call(function)
+    assert rate_limiter.limit == 4
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_not_adaptive_keep_concurrency():
+    rate_limiter = RateLimiter(max_concurrency=4)
+    await rate_limiter.call(CoroutineMock(return_value=(503,)))
+    assert rate_limiter.limit == 4
+    assert rate_limiter.stats()['overloads'] == 1
@@ -4,6 +4,9 @@ import pytest
 from parsel import Selector
 
 from crawler_api.crawlers.mixins import SoftplanTJCrawlerMixin
+from crawler_api.crawlers.records import LegalProcessRecord
+
+from tests.fixtures import CRAWLER_RESPONSE
 
 
 @pytest.fixture
@@ -86,6 +89,12 @@ def test_softplan_crawler_parse_updates(softplan_crawler, softplan_updates):
     assert expected_result == result
 
 
+def test_softplan_crawler_parse_updates_since_known_update(softplan_crawler, softplan_updates):
+    since = ('11/05/2020', 'Documento  Nº Protocolo: WMAC.20.70092549-0 Data: 11/05/2020 13:28')
+    result = softplan_crawler.parse_updates(softplan_updates, since=since)
+    assert [update['date'] for update in result] == ['23/09/2020', '16/08/2020']
+
+
 def test_softplan_crawler_parse_updates_return_empty_value(softplan_crawler):
     selector = Selector(text='<table><tbody><tr><td></td><td></td></tr></tbody></table>')
     result = softplan_crawler.parse_updates(selector)
@@ -97,3 +106,14 @@ def test_softplan_crawler_parse_updates_xpath_not_found(softplan_crawler):
     result = softplan_crawler.parse_updates(selector)
     expected_result = [{'date': None, 'description': ''}]
     assert expected_result == result
+
+
+def test_softplan_crawler_compact_and_expand_result(softplan_crawler):
+    record = softplan_crawler.compact(CRAWLER_RESPONSE)
+    assert isinstance(record, LegalProcessRecord)
+    assert softplan_crawler.expand(record) == CRAWLER_RESPONSE
+
+
+def test_softplan_crawler_compact_and_expand_not_found_result(softplan_crawler):
+    assert softplan_crawler.compact(None) is None
+    assert softplan_crawler.expand(None) is None
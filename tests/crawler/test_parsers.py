@@ -0,0 +1,38 @@
+import pytest
+from lxml import etree
+from parsel import Selector
+
+from crawler_api.crawlers.parsers import LxmlBackend, ParselBackend, get_parser_backend
+
+
+@pytest.mark.parametrize('name, backend_class', (('parsel', ParselBackend), ('lxml', LxmlBackend)))
+def test_get_parser_backend(name, backend_class):
+    assert isinstance(get_parser_backend(name), backend_class)
+
+
+def test_get_parser_backend_invalid_name():
+    with pytest.raises(ValueError) as error:
+        get_parser_backend('invalid')
+    assert str(error.value) == 'Invalid parser backend: invalid. Options: parsel, lxml'
+
+
+def test_parsel_backend_document():
+    document = ParselBackend().document('<div>Olá</div>'.encode('latin-1'), 'latin-1')
+    assert isinstance(document, Selector)
+    assert document.xpath('//div/text()').get() == 'Olá'
+
+
+def test_lxml_backend_document():
+    document = LxmlBackend().document('<div>Olá</div>'.encode('latin-1'), 'latin-1')
+    assert document.xpath('//div/text()') == ['Olá']
+
+
+def test_backend_from_root():
+    root = etree.fromstring('<html><body><div>Olá</div></body></html>', parser=etree.HTMLParser())
+    assert ParselBackend().from_root(root).root is root
+    assert LxmlBackend().from_root(root) is root
+
+
+def test_lxml_backend_parse_empty_document():
+    backend = LxmlBackend()
+    assert backend.parse(None, backend.document(b'', 'utf-8'), '1º') is None
@@ -0,0 +1,70 @@
+import json
+import os
+
+import pytest
+
+from crawler_api.crawlers import TJALCrawler, TJMSCrawler
+from crawler_api.crawlers.parsers import ParseOptions
+from crawler_api.crawlers.records import LegalProcessRecord, Party, Representative, intern
+
+from tests.fixtures import CRAWLER_RESPONSE
+
+
+def parse_fixture(crawler_class, fixture, parser_backend, options=ParseOptions()):
+    path = os.path.dirname(__file__)
+    with open(f'{path}/fixtures/{fixture}', 'rb') as f:
+        return crawler_class(None, parser_backend=parser_backend).parse_body(f.read(), 'utf-8', '1º', options)
+
+
+@pytest.mark.parametrize(
+    'crawler_class, fixture',
+    (
+        (TJALCrawler, 'tjal.html'),
+        (TJMSCrawler, 'tjms_first_degree.html'),
+        (TJMSCrawler, 'tjms_second_degree.html'),
+    )
+)
+@pytest.mark.parametrize(
+    'options',
+    (
+        ParseOptions(),
+        ParseOptions(include=frozenset()),
+        ParseOptions(include=frozenset(['updates'])),
+        ParseOptions(include=frozenset(['parties_involved'])),
+    )
+)
+def test_legal_process_record_keep_result(crawler_class, fixture, options, parser_backend):
+    result = parse_fixture(crawler_class, fixture, parser_backend, options)
+    expanded = LegalProcessRecord.from_dict(result).to_dict()
+    assert expanded == result
+    assert list(expanded) == list(result)
+
+
+def test_legal_process_record_intern_categorical_strings():
+    first = LegalProcessRecord.from_dict(json.loads(json.dumps(CRAWLER_RESPONSE)))
+    second = LegalProcessRecord.from_dict(json.loads(json.dumps(CRAWLER_RESPONSE)))
+    assert first.degree is second.degree
+    assert first.parties_involved[0].type is second.parties_involved[0].type
+    assert first.parties_involved[0].representatives[0].type is second.parties_involved[0].representatives[1].type
+    assert first.update_dates[0] is second.update_dates[0]
+    assert first.update_descriptions[0] is not second.update_descriptions[0]
+
+
+def test_legal_process_record_has_no_instance_dict():
+    record = LegalProcessRecord.from_dict(CRAWLER_RESPONSE)
+    for item in (record, record.parties_involved[0], record.parties_involved[0].representatives[0]):
+        assert not hasattr(item, '__dict__')
+
+
+def test_intern_empty_values():
+    assert intern(None) is None
+    assert intern('') == ''
+
+
+def test_party_to_dict():
+    party = Party('Autor', 'José', (Representative('Advogado', 'Maria'),))
+    assert party.to_dict() == {
+        'type': 'Autor',
+        'name': 'José',
+        'representatives': [{'type': 'Advogado', 'name': 'Maria'}]
+    }
@@ -0,0 +1,145 @@
+import asyncio
+
+import pytest
+from aiohttp import ClientError
+from asynctest import CoroutineMock, patch
+
+from crawler_api.crawlers.retry import RetryPolicy
+
+
+@pytest.fixture
+def retry_policy():
+    return RetryPolicy(max_attempts=3, backoff=0)
+
+
+@pytest.mark.asyncio
+async def test_retry_policy_return_first_response(retry_policy):
+    fetch = CoroutineMock(return_value=(200, b'body', 'utf-8'))
+    assert await retry_policy.call(fetch, 'url') == (200, b'body', 'utf-8')
+    fetch.assert_called_once_with('url')
+    assert retry_policy.stats()['retries'] == 0
+
+
+@pytest.mark.asyncio
+async def test_retry_policy_retry_retryable_status(retry_policy):
+    fetch = CoroutineMock(side_effect=[(503, b'', 'utf-8'), (200, b'body', 'utf-8')])
+    assert await retry_policy.call(fetch, 'url') == (200, b'body', 'utf-8')
+    assert fetch.call_count == 2
+    assert retry_policy.stats()['retries'] == 1
+
+
+@pytest.mark.asyncio
+async def test_retry_policy_do_not_retry_other_status(retry_policy):
+    fetch = CoroutineMock(return_value=(404, b'', 'utf-8'))
+    assert await retry_policy.call(fetch, 'url') == (404, b'', 'utf-8')
+    fetch.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_retry_policy_return_last_response_after_max_attempts(retry_policy):
+    fetch = CoroutineMock(side_effect=[(500, b'1', 'utf-8'), (502, b'2', 'utf-8'), (503, b'3', 'utf-8')])
+    assert await retry_policy.call(fetch, 'url') == (503, b'3', 'utf-8')
+    assert retry_policy.stats()['retries'] == 2
+
+
+@pytest.mark.asyncio
+async def test_retry_policy_retry_connection_errors(retry_policy):
+    fetch = CoroutineMock(side_effect=[ClientError(), asyncio.TimeoutError(), (200, b'body', 'utf-8')])
+    assert await retry_policy.call(fetch, 'url') == (200, b'body', 'utf-8')
+    assert fetch.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_retry_policy_raise_error_after_max_attempts(retry_policy):
+    fetch = CoroutineMock(side_effect=ClientError())
+    with pytest.raises(ClientError):
+        await retry_policy.call(fetch, 'url')
+    assert fetch.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_retry_policy_do_not_retry_other_errors(retry_policy):
+    fetch = CoroutineMock(side_effect=ValueError())
+    with pytest.raises(ValueError):
+        await retry_policy.call(fetch, 'url')
+    fetch.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_retry_policy_sleep_backoff_between_attempts():
+    retry_policy = RetryPolicy(max_attempts=3, backoff=1, max_backoff=10)
+    fetch = CoroutineMock(side_effect=[(500, b'', 'utf-8'), (500, b'', 'utf-8'), (200, b'', 'utf-8')])
+    with patch('crawler_api.crawlers.retry.asyncio.sleep', CoroutineMock()) as sleep, \
+            patch('crawler_api.crawlers.retry.random.uniform', side_effect=lambda a, b: b):
+        await retry_policy.call(fetch, 'url')
+    assert [args[0][0] for args in sleep.call_args_list] == [1, 2]
+
+
+@pytest.mark.parametrize('attempt, expected', ((1, 0.5), (2, 1), (3, 2), (4, 3), (10, 3)))
+def test_retry_policy_backoff_limit(attempt, expected):
+    retry_policy = RetryPolicy(backoff=0.5, max_backoff=3)
+    with patch('crawler_api.crawlers.retry.random.uniform', side_effect=lambda a, b: b):
+        assert retry_policy.get_backoff(attempt) == expected
+
+
+def test_retry_policy_hedge_delay():
+    retry_policy = RetryPolicy(hedge_percentile=90, hedge_min_samples=10)
+    retry_policy.latencies.extend(range(9))
+    assert retry_policy.get_hedge_delay() is None
+    retry_policy.latencies.append(9)
+    assert retry_policy.get_hedge_delay() == 9
+    retry_policy.hedge_percentile = 50
+    assert retry_policy.get_hedge_delay() == 5
+
+
+def test_retry_policy_without_hedge():
+    retry_policy = RetryPolicy()
+    retry_policy.latencies.extend(range(100))
+    assert retry_policy.get_hedge_delay() is None
+
+
+@pytest.mark.asyncio
+async def test_retry_policy_hedge_slow_request():
+    retry_policy = RetryPolicy(hedge_percentile=50, hedge_min_samples=1)
+    retry_policy.latencies.append(0.01)
+    responses = iter([(1, 'slow'), (0, 'fast')])
+
+    async def fetch(url):
+        delay, response = next(responses)
+        await asyncio.sleep(delay)
+        return 200, response, 'utf-8'
+
+    assert await retry_policy.call(fetch, 'url') == (200, 'fast', 'utf-8')
+    assert retry_policy.stats()['hedges'] == 1
+
+
+@pytest.mark.asyncio
+async def test_retry_policy_hedge_ignore_failed_request():
+    retry_policy = RetryPolicy(hedge_percentile=50, hedge_min_samples=1)
+    retry_policy.latencies.append(0.01)
+    responses = iter([(0.02, None), (0.03, 'hedge')])
+
+    async def fetch(url):
+        delay, response = next(responses)
+        await asyncio.sleep(delay)
+        if response is None:
+            raise ClientError()
+        return 200, response, 'utf-8'
+
+    assert await retry_policy.call(fetch, 'url') == (200, 'hedge', 'utf-8')
+    assert retry_policy.stats()['retries'] == 0
+
+
+@pytest.mark.asyncio
+async def test_retry_policy_do_not_hedge_fast_request():
+    retry_policy = RetryPolicy(hedge_percentile=50, hedge_min_samples=1)
+    retry_policy.latencies.append(1)
+    fetch = CoroutineMock(return_value=(200, b'', 'utf-8'))
+    await retry_policy.call(fetch, 'url')
+    fetch.assert_called_once()
+    assert retry_policy.stats()['hedges'] == 0
+    assert len(retry_policy.latencies) == 2
+
+
+def test_retry_policy_stats(retry_policy):
+    assert retry_policy.stats() == {'retries': 0, 'hedges': 0, 'hedge_delay': None}
@@ -0,0 +1,158 @@
+import asyncio
+
+import pytest
+from asynctest import CoroutineMock
+
+from crawler_api.crawlers.scheduler import BULK, INTERACTIVE, NORMAL, PriorityScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+async def start_calls(scheduler, priorities, release):
+    """
+    Start a call by priority, in order, that holds its slot until `release` is set.
+    Return the list of priorities in the order the calls started to run.
+    """
+    started = []
+
+    async def function(priority):
+        started.append(priority)
+        await release.wait()
+
+    tasks = [asyncio.ensure_future(scheduler.call(priority, function, priority)) for priority in priorities]
+    await asyncio.sleep(0)
+    return started, tasks
+
+
+@pytest.mark.asyncio
+async def test_priority_scheduler_return_result():
+    scheduler = PriorityScheduler(max_concurrency=1, clock=FakeClock())
+    function = CoroutineMock(return_value=(200, b'', 'utf-8'))
+    assert await scheduler.call(INTERACTIVE, function, 'url') == (200, b'', 'utf-8')
+    function.assert_called_once_with('url')
+    assert scheduler.stats()[INTERACTIVE] == {
+        'running': 0, 'queued': 0, 'calls': 1, 'mean_wait_time': 0, 'max_wait_time': 0
+    }
+
+
+@pytest.mark.asyncio
+async def test_priority_scheduler_limit_concurrency():
+    scheduler = PriorityScheduler(max_concurrency=2)
+    release = asyncio.Event()
+    started, tasks = await start_calls(scheduler, [BULK] * 5, release)
+    assert started == [BULK, BULK]
+    assert scheduler.stats()[BULK]['running'] == 2
+    assert scheduler.stats()[BULK]['queued'] == 3
+    release.set()
+    await asyncio.gather(*tasks)
+    assert len(started) == 5
+    assert scheduler.stats()[BULK]['running'] == 0
+
+
+@pytest.mark.asyncio
+async def test_priority_scheduler_share_free_slots_by_weight():
+    scheduler = PriorityScheduler(max_concurrency=1, weights={INTERACTIVE: 3, BULK: 1})
+    release = asyncio.Event()
+    started, tasks = await start_calls(scheduler, [BULK] * 4 + [INTERACTIVE] * 4, release)
+    assert started == [BULK]
+    release.set()
+    await asyncio.gather(*tasks)
+    # A single slot goes to the class with the lowest running calls by weight, the first class on a tie
+    assert started == [BULK, INTERACTIVE, INTERACTIVE, INTERACTIVE, INTERACTIVE, BULK, BULK, BULK]
+
+
+@pytest.mark.asyncio
+async def test_priority_scheduler_split_slots_by_weight():
+    scheduler = PriorityScheduler(max_concurrency=4, weights={INTERACTIVE: 3, NORMAL: 1, BULK: 1})
+    release = asyncio.Event()
+    started, tasks = await start_calls(scheduler, [BULK] * 4, release)
+    assert started == [BULK] * 4
+    more_started, more_tasks = await start_calls(scheduler, [INTERACTIVE] * 4 + [NORMAL] * 4, asyncio.Event())
+    assert more_started == []
+    for _ in range(4):
+        scheduler._release(BULK)
+    await asyncio.sleep(0)
+    assert sorted(more_started) == [INTERACTIVE, INTERACTIVE, INTERACTIVE, NORMAL]
+    for task in tasks + more_tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, *more_tasks, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_priority_scheduler_keep_reserved_slots():
+    scheduler = PriorityScheduler(max_concurrency=3, reserved={INTERACTIVE: 1})
+    release = asyncio.Event()
+    started, tasks = await start_calls(scheduler, [BULK] * 3, release)
+    assert started == [BULK, BULK]
+    interactive_started, interactive_tasks = await start_calls(scheduler, [INTERACTIVE], release)
+    assert interactive_started == [INTERACTIVE]
+    release.set()
+    await asyncio.gather(*tasks, *interactive_tasks)
+    assert started == [BULK] * 3
+
+
+@pytest.mark.asyncio
+async def test_priority_scheduler_release_slot_on_error():
+    scheduler = PriorityScheduler(max_concurrency=1)
+    with pytest.raises(ValueError):
+        await scheduler.call(NORMAL, CoroutineMock(side_effect=ValueError()))
+    assert scheduler.stats()[NORMAL]['running'] == 0
+
+
+@pytest.mark.asyncio
+async def test_priority_scheduler_cancel_waiting_call():
+    scheduler = PriorityScheduler(max_concurrency=1, clock=FakeClock())
+    running = asyncio.ensure_future(scheduler.call(NORMAL, asyncio.sleep, 0.01))
+    waiting = asyncio.ensure_future(scheduler.call(NORMAL, CoroutineMock()))
+    await asyncio.sleep(0)
+    waiting.cancel()
+    await asyncio.gather(running, waiting, return_exceptions=True)
+    assert waiting.cancelled()
+    assert scheduler.stats()[NORMAL] == {
+        'running': 0, 'queued': 0, 'calls': 1, 'mean_wait_time': 0, 'max_wait_time': 0
+    }
+
+
+@pytest.mark.asyncio
+async def test_priority_scheduler_release_slot_of_call_cancelled_after_wake_up():
+    scheduler = PriorityScheduler(max_concurrency=1)
+    started, tasks = await start_calls(scheduler, [NORMAL, NORMAL], asyncio.Event())
+    scheduler._release(NORMAL)
+    assert scheduler.stats()[NORMAL]['running'] == 1
+    tasks[1].cancel()
+    await asyncio.gather(tasks[1], return_exceptions=True)
+    assert tasks[1].cancelled()
+    assert started == [NORMAL]
+    assert scheduler.stats()[NORMAL]['running'] == 0
+    tasks[0].cancel()
+    await asyncio.gather(tasks[0], return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_priority_scheduler_wait_time_stats_by_class():
+    clock = FakeClock()
+    scheduler = PriorityScheduler(max_concurrency=1, clock=clock)
+    release = asyncio.Event()
+    started, tasks = await start_calls(scheduler, [INTERACTIVE, BULK, BULK], release)
+    clock.now = 4
+    release.set()
+    await asyncio.gather(*tasks)
+    stats = scheduler.stats()
+    assert stats[INTERACTIVE]['mean_wait_time'] == 0
+    assert stats[BULK] == {'running': 0, 'queued': 0, 'calls': 2, 'mean_wait_time': 4, 'max_wait_time': 4}
+
+
+def test_priority_scheduler_reject_invalid_priority():
+    with pytest.raises(ValueError, match='Invalid priority: urgent'):
+        PriorityScheduler(max_concurrency=1, weights={'urgent': 1})
+
+
+def test_priority_scheduler_reject_reserved_slots_above_max_concurrency():
+    with pytest.raises(ValueError, match='max_concurrency'):
+        PriorityScheduler(max_concurrency=2, reserved={INTERACTIVE: 2, BULK: 1})
@@ -0,0 +1,140 @@
+import gzip
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+
+from crawler_api.crawlers.store import PageStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def page_store(tmp_path, clock):
+    return PageStore(str(tmp_path), max_age=60, clock=clock)
+
+
+def test_page_store_put_compressed_page(page_store, tmp_path):
+    entry = page_store.put('tjms', '1º', '1234567-69.1234.1.12.1234', b'<html>1</html>', 'utf-8')
+    assert entry == {
+        'court': 'tjms',
+        'degree': '1º',
+        'number': '1234567-69.1234.1.12.1234',
+        'fetched_at': 1000.0,
+        'digest': entry['digest'],
+        'encoding': 'utf-8'
+    }
+    page_path = tmp_path / 'pages' / entry['digest'][:2] / f'{entry["digest"]}.html.gz'
+    assert gzip.decompress(page_path.read_bytes()) == b'<html>1</html>'
+    assert page_store.read(entry['digest']) == b'<html>1</html>'
+
+
+def test_page_store_keep_same_page_once(page_store, tmp_path):
+    first = page_store.put('tjms', '1º', '1234567-69.1234.1.12.1234', b'<html>1</html>', 'utf-8')
+    second = page_store.put('tjal', '2º', '1234567-48.1234.1.02.1234', b'<html>1</html>', 'utf-8')
+    assert first['digest'] == second['digest']
+    assert os.listdir(tmp_path / 'pages' / first['digest'][:2]) == [f'{first["digest"]}.html.gz']
+
+
+def test_page_store_keep_same_page_from_concurrent_writers(page_store, tmp_path):
+    with ThreadPoolExecutor(8) as executor:
+        entries = list(executor.map(
+            lambda degree: page_store.put('tjms', degree, '1234567-69.1234.1.12.1234', b'<html>1</html>', 'utf-8'),
+            [f'{degree}º' for degree in range(16)]
+        ))
+    digest = entries[0]['digest']
+    assert os.listdir(tmp_path / 'pages' / digest[:2]) == [f'{digest}.html.gz']
+    assert page_store.read(digest) == b'<html>1</html>'
+    assert len(page_store.latest('tjms', '1234567-69.1234.1.12.1234')) == 16
+
+
+def test_page_store_page_kept_by_another_writer_is_success(page_store, tmp_path):
+    replace = os.replace
+
+    def replace_kept_page(source, destination):
+        if not destination.endswith('.html.gz'):
+            return replace(source, destination)
+        shutil.copyfile(source, destination)
+        raise PermissionError()
+
+    with patch('os.replace', side_effect=replace_kept_page):
+        entry = page_store.put('tjms', '1º', '1234567-69.1234.1.12.1234', b'<html>1</html>', 'utf-8')
+    assert os.listdir(tmp_path / 'pages' / entry['digest'][:2]) == [f'{entry["digest"]}.html.gz']
+    assert page_store.get('tjms', '1º', '1234567-69.1234.1.12.1234') == (b'<html>1</html>', 'utf-8')
+
+
+def test_page_store_raise_write_error_without_page(page_store, tmp_path):
+    with patch('os.replace', side_effect=PermissionError()):
+        with pytest.raises(PermissionError):
+            page_store.put('tjms', '1º', '1234567-69.1234.1.12.1234', b'<html>1</html>', 'utf-8')
+    digest = os.listdir(tmp_path / 'pages')[0]
+    assert os.listdir(tmp_path / 'pages' / digest) == []
+
+
+def test_page_store_latest_entry_by_degree(page_store, clock):
+    page_store.put('tjms', '1º', '1234567-69.1234.1.12.1234', b'<html>1</html>', 'utf-8')
+    clock.now += 10
+    page_store.put('tjms', '2º', '1234567-69.1234.1.12.1234', b'<html>2</html>', 'utf-8')
+    clock.now += 10
+    latest = page_store.put('tjms', '1º', '1234567-69.1234.1.12.1234', b'<html>3</html>', 'utf-8')
+    entries = page_store.latest('tjms', '1234567-69.1234.1.12.1234')
+    assert list(entries) == ['1º', '2º']
+    assert entries['1º'] == latest
+
+
+def test_page_store_latest_does_not_read_the_index(page_store, tmp_path):
+    entry = page_store.put('tjms', '1º', '1234567-69.1234.1.12.1234', b'<html>1</html>', 'utf-8')
+    shutil.rmtree(tmp_path / 'index')
+    assert page_store.latest('tjms', '1234567-69.1234.1.12.1234') == {'1º': entry}
+    assert page_store.get('tjms', '1º', '1234567-69.1234.1.12.1234') == (b'<html>1</html>', 'utf-8')
+
+
+def test_page_store_latest_without_entries(page_store):
+    assert page_store.latest('tjms', '1234567-69.1234.1.12.1234') == {}
+
+
+def test_page_store_get_fresh_page(page_store, clock):
+    page_store.put('tjms', '1º', '1234567-69.1234.1.12.1234', 'Olá'.encode('latin-1'), 'latin-1')
+    clock.now += 60
+    assert page_store.get('tjms', '1º', '1234567-69.1234.1.12.1234') == ('Olá'.encode('latin-1'), 'latin-1')
+    assert page_store.get('tjms', '2º', '1234567-69.1234.1.12.1234') is None
+
+
+def test_page_store_get_stale_page(page_store, clock):
+    page_store.put('tjms', '1º', '1234567-69.1234.1.12.1234', b'<html>1</html>', 'utf-8')
+    clock.now += 61
+    assert page_store.get('tjms', '1º', '1234567-69.1234.1.12.1234') is None
+
+
+def test_page_store_without_max_age_does_not_get_pages(tmp_path):
+    page_store = PageStore(str(tmp_path))
+    page_store.put('tjms', '1º', '1234567-69.1234.1.12.1234', b'<html>1</html>', 'utf-8')
+    assert page_store.get('tjms', '1º', '1234567-69.1234.1.12.1234') is None
+
+
+def test_page_store_entries(page_store, tmp_path):
+    page_store.put('tjms', '1º', '1234567-69.1234.1.12.1234', b'<html>1</html>', 'utf-8')
+    page_store.put('tjms', '2º', '1234567-69.1234.1.12.1234', b'<html>2</html>', 'utf-8')
+    page_store.put('tjal', '1º', '1234567-48.1234.1.02.1234', b'<html>3</html>', 'utf-8')
+    (tmp_path / 'latest' / 'README').write_text('')
+    assert [(entry['court'], entry['degree']) for entry in page_store.entries()] == [
+        ('tjal', '1º'), ('tjms', '1º'), ('tjms', '2º')
+    ]
+    assert [entry['number'] for entry in page_store.entries('tjal')] == ['1234567-48.1234.1.02.1234']
+
+
+def test_page_store_entries_on_empty_store(page_store):
+    assert list(page_store.entries()) == []
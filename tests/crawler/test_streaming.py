@@ -0,0 +1,103 @@
+import os
+from unittest.mock import Mock
+
+import pytest
+from parsel import Selector
+
+from crawler_api.crawlers import TJALCrawler, TJMSCrawler
+from crawler_api.crawlers.streaming import PageTooLargeError, StreamParse, match_marker
+
+from tests.fixtures import CRAWLER_RESPONSE
+
+
+class FakeContent:
+    def __init__(self, body):
+        self.body = body
+        self.read_size = 0
+
+    async def iter_chunked(self, size):
+        for index in range(0, len(self.body), size):
+            chunk = self.body[index:index + size]
+            self.read_size += len(chunk)
+            yield chunk
+
+
+def fake_response(body):
+    return Mock(content=FakeContent(body))
+
+
+@pytest.fixture
+def tjms_second_degree_body():
+    path = os.path.dirname(__file__)
+    with open(f'{path}/fixtures/tjms_second_degree.html', 'rb') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize(
+    'attributes, expected',
+    (
+        ({'class': 'header'}, True),
+        ({'class': 'header', 'id': ''}, True),
+        ({'class': 'other'}, False),
+        ({'class': 'header', 'id': 'other'}, False),
+    )
+)
+def test_match_marker(attributes, expected):
+    element = Mock(tag='div', get={'class': 'header', 'id': ''}.get)
+    assert match_marker(element, ('div', attributes)) is expected
+
+
+def test_match_marker_tag():
+    element = Mock(tag='span', get={'class': 'header'}.get)
+    assert match_marker(element, ('div', {'class': 'header'})) is False
+
+
+@pytest.mark.asyncio
+async def test_stream_parse_build_document(tjms_second_degree_body, parser_backend):
+    stream_parse = StreamParse(chunk_size=1024)
+    response = fake_response(tjms_second_degree_body)
+    root = await stream_parse.read(response, TJMSCrawler.detail_marker, 'utf-8')
+    crawler = TJMSCrawler(None, parser_backend=parser_backend)
+    assert crawler.parse(parser_backend.from_root(root), 'Test') == CRAWLER_RESPONSE
+    assert response.content.read_size == len(tjms_second_degree_body)
+
+
+@pytest.mark.asyncio
+async def test_stream_parse_return_none_for_page_without_marker(tjms_second_degree_body):
+    response = fake_response(tjms_second_degree_body)
+    assert await StreamParse().read(response, TJALCrawler.detail_marker, 'utf-8') is None
+    response.close.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_stream_parse_abort_download_without_marker_on_first_bytes(tjms_second_degree_body):
+    stream_parse = StreamParse(marker_max_bytes=4096, chunk_size=1024)
+    response = fake_response(tjms_second_degree_body)
+    assert await stream_parse.read(response, TJALCrawler.detail_marker, 'utf-8') is None
+    assert response.content.read_size == 4096
+    response.close.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_stream_parse_without_marker(tjms_second_degree_body):
+    stream_parse = StreamParse(marker_max_bytes=1024, chunk_size=1024)
+    document = await stream_parse.read(fake_response(tjms_second_degree_body), None, 'utf-8')
+    assert document.tag == 'html'
+
+
+@pytest.mark.asyncio
+async def test_stream_parse_raise_error_for_large_page(tjms_second_degree_body):
+    stream_parse = StreamParse(max_body_size=4000, chunk_size=1024)
+    response = fake_response(tjms_second_degree_body)
+    with pytest.raises(PageTooLargeError) as error:
+        await stream_parse.read(response, TJMSCrawler.detail_marker, 'utf-8')
+    assert str(error.value) == 'Court page bigger than 4000 bytes'
+    assert response.content.read_size == 4096
+    response.close.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_stream_parse_decode_with_encoding():
+    body = '<html><body><div class="unj-entity-header">Olá</div></body></html>'.encode('latin-1')
+    document = await StreamParse().read(fake_response(body), TJMSCrawler.detail_marker, 'latin-1')
+    assert Selector(root=document).xpath('//div/text()').get() == 'Olá'
@@ -6,13 +6,14 @@ from parsel import Selector
 
 from crawler_api.crawlers import TJALCrawler
 from crawler_api.crawlers.base import BaseCrawler
+from crawler_api.crawlers.parsers import ParseOptions
 
 
 @pytest.fixture
-def tjal_result_html():
+def tjal_result_html(parser_backend):
     path = os.path.dirname(__file__)
-    with open(f'{path}/fixtures/tjal.html') as f:
-        return Selector(text=f.read())
+    with open(f'{path}/fixtures/tjal.html', 'rb') as f:
+        return parser_backend.document(f.read(), 'utf-8')
 
 
 @pytest.fixture
@@ -23,8 +24,8 @@ def tjal_detail_html():
 
 
 @pytest.fixture
-def tjal_crawler():
-    return TJALCrawler(Mock())
+def tjal_crawler(parser_backend):
+    return TJALCrawler(Mock(), parser_backend=parser_backend)
 
 
 def test_tjalcrawler_subclass():
@@ -103,6 +104,25 @@ def test_tjalcrawler_parse(tjal_crawler, tjal_result_html):
     assert expected_result == result
 
 
-def test_tjal_crawler_parse_not_found_data(tjal_crawler):
-    result = tjal_crawler.parse(Selector(text='<table><tbody><tr></tr></tbody></table>'), None)
+def test_tjal_crawler_parse_without_sections(tjal_crawler, tjal_result_html):
+    result = tjal_crawler.parse(tjal_result_html, 'Test', ParseOptions(include=frozenset()))
+    assert 'parties_involved' not in result
+    assert 'updates' not in result
+    assert result['judge'] == 'José Cícero Alves da Silva'
+
+
+def test_tjal_crawler_parse_with_updates_limit(tjal_crawler, tjal_result_html):
+    result = tjal_crawler.parse(tjal_result_html, 'Test', ParseOptions(updates_limit=1))
+    assert result['updates'] == [{'date': '23/09/2020', 'description': 'Conclusos'}]
+
+
+def test_tjal_crawler_parse_updates_since_unknown_update(tjal_crawler, tjal_result_html):
+    updates = tjal_crawler.parse(tjal_result_html, 'Test')['updates']
+    result = tjal_crawler.parse(tjal_result_html, 'Test', ParseOptions(updates_since=('01/01/2000', 'Unknown')))
+    assert result['updates'] == updates
+
+
+def test_tjal_crawler_parse_not_found_data(tjal_crawler, parser_backend):
+    document = parser_backend.document(b'<table><tbody><tr></tr></tbody></table>', 'utf-8')
+    result = tjal_crawler.parse(document, None)
     assert result is None
@@ -5,6 +5,7 @@ from asynctest import Mock
 from parsel import Selector
 
 from crawler_api.crawlers import TJMSCrawler
+from crawler_api.crawlers.parsers import ParseOptions
 
 
 @pytest.fixture
@@ -22,8 +23,15 @@ def tjms_second_degree_html():
 
 
 @pytest.fixture
-def tjms_crawler():
-    return TJMSCrawler(Mock())
+def tjms_second_degree_document(parser_backend):
+    path = os.path.dirname(__file__)
+    with open(f'{path}/fixtures/tjms_second_degree.html', 'rb') as f:
+        return parser_backend.document(f.read(), 'utf-8')
+
+
+@pytest.fixture
+def tjms_crawler(parser_backend):
+    return TJMSCrawler(Mock(), parser_backend=parser_backend)
 
 
 def test_tjms_parse_first_degree_legal_process_detail(tjms_crawler, tjms_first_degree):
@@ -65,8 +73,8 @@ def test_tjms_crawler_parse_legal_process_detail_return_empty_value(tjms_crawler
     assert expected_result == result
 
 
-def test_tjms_crawler_parse(tjms_crawler, tjms_second_degree_html):
-    result = tjms_crawler.parse(tjms_second_degree_html, 'Test')
+def test_tjms_crawler_parse(tjms_crawler, tjms_second_degree_document):
+    result = tjms_crawler.parse(tjms_second_degree_document, 'Test')
     expected_result = {
         'class': 'Apelação Cível',
         'degree': 'Test',
@@ -118,6 +126,31 @@ def test_tjms_crawler_parse(tjms_crawler, tjms_second_degree_html):
     assert expected_result == result
 
 
-def test_tjms_crawler_parse_not_found_data(tjms_crawler):
-    result = tjms_crawler.parse(Selector(text='<table><tbody><tr></tr></tbody></table>'))
+@pytest.mark.parametrize(
+    'options, expected_keys',
+    (
+        (ParseOptions(include=frozenset()), set()),
+        (ParseOptions(include=frozenset(['updates'])), {'updates'}),
+        (ParseOptions(include=frozenset(['parties_involved'])), {'parties_involved'}),
+    )
+)
+def test_tjms_crawler_parse_only_included_sections(tjms_crawler, tjms_second_degree_document, options, expected_keys):
+    result = tjms_crawler.parse(tjms_second_degree_document, 'Test', options)
+    assert set(result) - {'class', 'degree', 'area', 'subject', 'distribution', 'judge', 'value'} == expected_keys
+
+
+def test_tjms_crawler_parse_with_updates_limit(tjms_crawler, tjms_second_degree_document):
+    result = tjms_crawler.parse(tjms_second_degree_document, 'Test', ParseOptions(updates_limit=2))
+    assert [update['date'] for update in result['updates']] == ['08/10/2020', '07/10/2020']
+
+
+def test_tjms_crawler_parse_updates_since_known_update(tjms_crawler, tjms_second_degree_document):
+    updates = tjms_crawler.parse(tjms_second_degree_document, 'Test')['updates']
+    since = (updates[2]['date'], updates[2]['description'])
+    result = tjms_crawler.parse(tjms_second_degree_document, 'Test', ParseOptions(updates_since=since))
+    assert result['updates'] == updates[:2]
+
+
+def test_tjms_crawler_parse_not_found_data(tjms_crawler, parser_backend):
+    result = tjms_crawler.parse(parser_backend.document(b'<table><tbody><tr></tr></tbody></table>', 'utf-8'))
     assert result is None
@@ -1,6 +1,7 @@
 import pytest
 
-from crawler_api.models.requests import LegalProcess
+from crawler_api.crawlers.base import RefreshState
+from crawler_api.models.requests import LegalProcess, LegalProcessBatch, LegalProcessRefresh, get_court
 
 
 @pytest.mark.parametrize(
@@ -29,6 +30,55 @@ def test_legal_process_creation():
     assert legal_process.number == '1234567-69.1234.1.12.1234'
 
 
+def test_legal_process_default_parse_options():
+    legal_process = LegalProcess(number='1234567-69.1234.1.12.1234')
+    assert legal_process.include == {'parties_involved', 'updates'}
+    assert legal_process.updates_limit is None
+
+
+@pytest.mark.parametrize(
+    'data, loc',
+    (
+        ({'include': ['judge']}, ('include', 0)),
+        ({'updates_limit': 0}, ('updates_limit',)),
+    )
+)
+def test_legal_process_parse_options_validation(data, loc):
+    with pytest.raises(ValueError) as error:
+        LegalProcess(number='1234567-69.1234.1.12.1234', **data)
+    assert error.value.errors()[0]['loc'] == loc
+
+
+@pytest.mark.parametrize(
+    'number, degrees',
+    (
+        ('1234567-48.1234.1.02.1234', {'1º'}),
+        ('1234567-48.1234.1.02.1234', {'1º', '2º'}),
+        ('1234567-69.1234.1.12.1234', {'2º'}),
+        ('1234567-63.1234.1.23.1234', {'3º'}),
+    )
+)
+def test_legal_process_degrees(number, degrees):
+    assert LegalProcess(number=number, degrees=degrees).degrees == degrees
+
+
+def test_legal_process_null_degrees_fetch_all_degrees():
+    assert LegalProcess.parse_raw('{"number": "1234567-69.1234.1.12.1234", "degrees": null}').degrees is None
+
+
+@pytest.mark.parametrize('degrees', ([], ['3º'], ['1º', '3º']))
+def test_legal_process_invalid_degrees(degrees):
+    with pytest.raises(ValueError) as error:
+        LegalProcess(number='1234567-69.1234.1.12.1234', degrees=degrees)
+    assert error.value.errors()[0]['loc'] == ('degrees',)
+
+
+def test_legal_process_degrees_with_invalid_number():
+    with pytest.raises(ValueError) as error:
+        LegalProcess(number='1234', degrees=['3º'])
+    assert [item['loc'] for item in error.value.errors()] == [('number',)]
+
+
 def test_legal_process_number_field_description():
     assert LegalProcess.__fields__['number'].field_info.description == 'Valid format: XXXXXXXX-XX-XXXX.XX.XXXX'
 
@@ -50,3 +100,67 @@ def test_assert_error_for_invalid_check_digit_on_legal_process_number():
 def test_property_unit_value():
     legal_process = LegalProcess(number='1234567-69.1234.1.12.1234')
     assert legal_process.court == '12'
+
+
+def test_legal_process_batch_creation():
+    numbers = ['1234567-69.1234.1.12.1234', '1234567-48.1234.1.02.1234']
+    legal_process_batch = LegalProcessBatch(numbers=numbers)
+    assert legal_process_batch.numbers == numbers
+
+
+def test_legal_process_batch_validate_each_number():
+    with pytest.raises(ValueError) as error:
+        LegalProcessBatch(numbers=['1234567-69.1234.1.12.1234', '1234', '1234567-12.1234.1.12.1234'])
+    assert error.value.errors() == [
+        {
+            'loc': ('numbers', 1),
+            'msg': 'Invalid number format. Example: 1234567-12.1234.1.12.1234',
+            'type': 'value_error'
+        },
+        {
+            'loc': ('numbers', 2),
+            'msg': 'Invalid Number. The check digit (DV) is not correct',
+            'type': 'assertion_error'
+        }
+    ]
+
+
+def test_legal_process_batch_empty_numbers():
+    with pytest.raises(ValueError):
+        LegalProcessBatch(numbers=[])
+
+
+def test_get_court():
+    assert get_court('1234567-48.1234.1.02.1234') == '02'
+
+
+def test_legal_process_refresh_states():
+    legal_process_refresh = LegalProcessRefresh(
+        number='1234567-69.1234.1.12.1234',
+        known={
+            '1º': {'latest_update': {'date': '08/10/2020', 'description': 'Conclusos'}, 'etag': '"abc"'},
+            '2º': {'content_hash': 'hash'}
+        }
+    )
+    assert legal_process_refresh.court == '12'
+    assert legal_process_refresh.refresh_states == {
+        '1º': RefreshState(latest_update=('08/10/2020', 'Conclusos'), etag='"abc"'),
+        '2º': RefreshState(content_hash='hash')
+    }
+
+
+@pytest.mark.parametrize(
+    'data, msg',
+    (
+        ({'number': '1234567-69.1234.1.12.1234', 'known': {}}, 'At least one known degree is required'),
+        ({'number': '1234567-69.1234.1.12.1234', 'known': {'3º': {}}}, 'Invalid degrees. Options: 1º, 2º'),
+        (
+            {'number': '1234567-00.1234.1.12.1234', 'known': {'1º': {}}},
+            'Invalid Number. The check digit (DV) is not correct'
+        ),
+    )
+)
+def test_legal_process_refresh_validation(data, msg):
+    with pytest.raises(ValueError) as error:
+        LegalProcessRefresh(**data)
+    assert error.value.errors()[0]['msg'] == msg
@@ -0,0 +1,30 @@
+import os
+
+import pytest
+
+from crawler_api.crawlers import TJALCrawler, TJMSCrawler
+from crawler_api.crawlers.parsers import PARSER_BACKENDS, ParseOptions
+from crawler_api.models.response import LegalProcessDetail
+
+FIXTURES = os.path.join(os.path.dirname(__file__), '..', 'crawler', 'fixtures')
+
+
+@pytest.mark.parametrize('parser_backend', list(PARSER_BACKENDS))
+@pytest.mark.parametrize(
+    'crawler_class, fixture',
+    (
+        (TJALCrawler, 'tjal.html'),
+        (TJMSCrawler, 'tjms_first_degree.html'),
+        (TJMSCrawler, 'tjms_second_degree.html'),
+    )
+)
+@pytest.mark.parametrize('options', (ParseOptions(), ParseOptions(include=frozenset())))
+def test_crawlers_result_match_legal_process_detail(parser_backend, crawler_class, fixture, options):
+    """
+    The fast serialization trusts the crawlers results to have the response model shape.
+    """
+    with open(os.path.join(FIXTURES, fixture), 'rb') as f:
+        body = f.read()
+    crawler = crawler_class(None, parser_backend=PARSER_BACKENDS[parser_backend])
+    result = crawler.parse_body(body, 'utf-8', '1º', options)
+    assert LegalProcessDetail(**result).dict(by_alias=True, exclude_unset=True) == result
@@ -0,0 +1,250 @@
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+from aiohttp import ClientError
+from asynctest import CoroutineMock, patch
+
+from crawler_api.batch import BatchLookup
+from crawler_api.crawlers.breaker import CircuitOpenError
+from crawler_api.crawlers.retry import UpstreamError
+from crawler_api.crawlers.streaming import PageTooLargeError
+
+from tests.fixtures import CRAWLER_RESPONSE
+
+
+@pytest.fixture
+def batch_lookup():
+    return BatchLookup(max_concurrency=2, court_max_concurrency=1)
+
+
+@pytest.mark.asyncio
+async def test_batch_lookup_return_result_for_each_number(batch_lookup):
+    crawler_mock = Mock()
+    crawler_mock().execute = CoroutineMock(side_effect=[[CRAWLER_RESPONSE], []])
+    crawler_mock().timed_out = []
+    crawler_mock().failed = {}
+    with patch('crawler_api.batch.COURTS', {"12": crawler_mock}):
+        result = await batch_lookup.run(Mock(), ['1234567-69.1234.1.12.1234', '7654321-03.2020.8.12.0001'])
+    assert result == [
+        {'number': '1234567-69.1234.1.12.1234', 'degrees': (CRAWLER_RESPONSE,), 'timed_out': [], 'failed': {}},
+        {'number': '7654321-03.2020.8.12.0001', 'error': 'Legal Process not found'},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_batch_lookup_crawler_not_implemented(batch_lookup):
+    with patch('crawler_api.batch.COURTS', {}):
+        result = await batch_lookup.lookup(Mock(), '1234567-69.1234.1.12.1234')
+    assert result == {'number': '1234567-69.1234.1.12.1234', 'error': 'Crawler not implemented'}
+
+
+@pytest.mark.asyncio
+async def test_batch_lookup_court_request_failed(batch_lookup):
+    crawler_mock = Mock()
+    crawler_mock().execute = CoroutineMock(side_effect=ClientError())
+    with patch('crawler_api.batch.COURTS', {"12": crawler_mock}):
+        result = await batch_lookup.lookup(Mock(), '1234567-69.1234.1.12.1234')
+    assert result == {'number': '1234567-69.1234.1.12.1234', 'error': 'Court request failed: ClientError'}
+
+
+@pytest.mark.asyncio
+async def test_batch_lookup_limit_concurrency_by_court():
+    batch_lookup = BatchLookup(max_concurrency=10, court_max_concurrency=2)
+    running = {'02': 0, '12': 0}
+    max_running = {'02': 0, '12': 0}
+
+    def crawler_factory(court):
+        async def execute(number, timeout=None, priority=None):
+            running[court] += 1
+            max_running[court] = max(max_running[court], running[court])
+            await asyncio.sleep(0.01)
+            running[court] -= 1
+            return [CRAWLER_RESPONSE]
+        return Mock(return_value=Mock(execute=execute, timed_out=[], failed={}))
+
+    numbers = ['1234567-48.1234.1.02.1234'] * 5 + ['1234567-69.1234.1.12.1234'] * 5
+    with patch('crawler_api.batch.COURTS', {'02': crawler_factory('02'), '12': crawler_factory('12')}):
+        await batch_lookup.run(Mock(), numbers)
+    assert max_running == {'02': 2, '12': 2}
+
+
+@pytest.mark.asyncio
+async def test_batch_lookup_limit_global_concurrency():
+    batch_lookup = BatchLookup(max_concurrency=3, court_max_concurrency=10)
+    state = {'running': 0, 'max_running': 0}
+
+    async def execute(number, timeout=None, priority=None):
+        state['running'] += 1
+        state['max_running'] = max(state['max_running'], state['running'])
+        await asyncio.sleep(0.01)
+        state['running'] -= 1
+        return [CRAWLER_RESPONSE]
+
+    with patch('crawler_api.batch.COURTS', {'12': Mock(return_value=Mock(execute=execute, timed_out=[], failed={}))}):
+        await batch_lookup.run(Mock(), ['1234567-69.1234.1.12.1234'] * 10)
+    assert state['max_running'] == 3
+
+
+@pytest.mark.asyncio
+async def test_batch_lookup_stream_yield_results_in_completion_order():
+    async def execute(number, timeout=None, priority=None):
+        await asyncio.sleep(0.02 if number.startswith('1234567') else 0)
+        return [CRAWLER_RESPONSE]
+
+    numbers = ['1234567-69.1234.1.12.1234', '7654321-03.2020.8.12.0001']
+    with patch('crawler_api.batch.COURTS', {'12': Mock(return_value=Mock(execute=execute, timed_out=[], failed={}))}):
+        result = [item['number'] async for item in BatchLookup(2, 2).stream(Mock(), numbers)]
+    assert result == ['7654321-03.2020.8.12.0001', '1234567-69.1234.1.12.1234']
+
+
+@pytest.mark.asyncio
+async def test_batch_lookup_stream_schedule_only_max_concurrency_lookups():
+    batch_lookup = BatchLookup(max_concurrency=2, court_max_concurrency=2)
+    batch_lookup.lookup = CoroutineMock(side_effect=lambda session, number, timeout, priority: {'number': number})
+    stream = batch_lookup.stream(Mock(), (str(number) for number in range(5)))
+    await stream.__anext__()
+    assert batch_lookup.lookup.call_count == 2
+    result = [item['number'] async for item in stream]
+    assert len(result) == 4
+    assert batch_lookup.lookup.call_count == 5
+
+
+@pytest.mark.asyncio
+async def test_batch_lookup_stream_cancel_pending_lookups_on_close():
+    batch_lookup = BatchLookup(max_concurrency=2, court_max_concurrency=2)
+    cancelled = []
+
+    async def lookup(session, number, timeout, priority):
+        try:
+            await asyncio.sleep(0 if number == 'fast' else 1)
+        except asyncio.CancelledError:
+            cancelled.append(number)
+            raise
+        return {'number': number}
+
+    batch_lookup.lookup = lookup
+    stream = batch_lookup.stream(Mock(), ['fast', 'slow'])
+    assert await stream.__anext__() == {'number': 'fast'}
+    await stream.aclose()
+    await asyncio.sleep(0)
+    assert cancelled == ['slow']
+
+
+@pytest.mark.asyncio
+async def test_batch_lookup_create_crawler_with_crawler_options():
+    cache = Mock()
+    crawler_mock = Mock()
+    crawler_mock.return_value.execute = CoroutineMock(return_value=[CRAWLER_RESPONSE])
+    crawler_mock.return_value.timed_out = []
+    crawler_mock.return_value.failed = {}
+    session = Mock()
+    batch_lookup = BatchLookup(max_concurrency=1, court_max_concurrency=1, crawler_options={'cache': cache})
+    with patch('crawler_api.batch.COURTS', {"12": crawler_mock}):
+        await batch_lookup.lookup(session, '1234567-69.1234.1.12.1234')
+    crawler_mock.assert_called_once_with(session, cache=cache)
+
+
+@pytest.mark.asyncio
+async def test_batch_lookup_pass_timeout_to_crawler(batch_lookup):
+    crawler_mock = Mock()
+    crawler_mock().execute = CoroutineMock(return_value=[CRAWLER_RESPONSE])
+    crawler_mock().timed_out = ['2º']
+    crawler_mock().failed = {}
+    with patch('crawler_api.batch.COURTS', {"12": crawler_mock}):
+        result = await batch_lookup.run(Mock(), ['1234567-69.1234.1.12.1234'], timeout=2)
+    assert result == [{'number': '1234567-69.1234.1.12.1234', 'degrees': (CRAWLER_RESPONSE,), 'timed_out': ['2º'],
+                       'failed': {}}]
+    crawler_mock().execute.assert_called_once_with(number='1234567-69.1234.1.12.1234', timeout=2, priority='normal')
+
+
+@pytest.mark.asyncio
+async def test_batch_lookup_keep_failed_degrees(batch_lookup):
+    crawler_mock = Mock()
+    crawler_mock().execute = CoroutineMock(return_value=[CRAWLER_RESPONSE])
+    crawler_mock().timed_out = []
+    crawler_mock().failed = {'2º': 'Court unavailable'}
+    with patch('crawler_api.batch.COURTS', {"12": crawler_mock}):
+        result = await batch_lookup.lookup(Mock(), '1234567-69.1234.1.12.1234')
+    assert result == {
+        'number': '1234567-69.1234.1.12.1234', 'degrees': (CRAWLER_RESPONSE,), 'timed_out': [],
+        'failed': {'2º': 'Court unavailable'}
+    }
+
+
+@pytest.mark.asyncio
+async def test_batch_lookup_pass_priority_to_crawler(batch_lookup):
+    crawler_mock = Mock()
+    crawler_mock().execute = CoroutineMock(return_value=[CRAWLER_RESPONSE])
+    crawler_mock().timed_out = []
+    crawler_mock().failed = {}
+    with patch('crawler_api.batch.COURTS', {"12": crawler_mock}):
+        await batch_lookup.run(Mock(), ['1234567-69.1234.1.12.1234'], priority='bulk')
+    crawler_mock().execute.assert_called_once_with(number='1234567-69.1234.1.12.1234', timeout=None, priority='bulk')
+
+
+@pytest.mark.asyncio
+async def test_batch_lookup_all_degrees_timed_out(batch_lookup):
+    crawler_mock = Mock()
+    crawler_mock().execute = CoroutineMock(return_value=[])
+    crawler_mock().timed_out = ['1º', '2º']
+    crawler_mock().failed = {}
+    with patch('crawler_api.batch.COURTS', {"12": crawler_mock}):
+        result = await batch_lookup.lookup(Mock(), '1234567-69.1234.1.12.1234', timeout=2)
+    assert result == {
+        'number': '1234567-69.1234.1.12.1234', 'timed_out': ['1º', '2º'], 'error': 'Legal Process request timed out'
+    }
+
+
+@pytest.mark.asyncio
+async def test_batch_lookup_court_unavailable(batch_lookup):
+    crawler_mock = Mock()
+    crawler_mock().execute = CoroutineMock(side_effect=CircuitOpenError())
+    with patch('crawler_api.batch.COURTS', {"12": crawler_mock}):
+        result = await batch_lookup.lookup(Mock(), '1234567-69.1234.1.12.1234')
+    assert result == {'number': '1234567-69.1234.1.12.1234', 'error': 'Court unavailable'}
+
+
+@pytest.mark.asyncio
+async def test_batch_lookup_court_page_too_large(batch_lookup):
+    crawler_mock = Mock()
+    crawler_mock().execute = CoroutineMock(side_effect=PageTooLargeError())
+    with patch('crawler_api.batch.COURTS', {"12": crawler_mock}):
+        result = await batch_lookup.lookup(Mock(), '1234567-69.1234.1.12.1234')
+    assert result == {'number': '1234567-69.1234.1.12.1234', 'error': 'Court page too large'}
+
+
+@pytest.mark.asyncio
+async def test_batch_lookup_court_upstream_error(batch_lookup):
+    crawler_mock = Mock()
+    crawler_mock().execute = CoroutineMock(side_effect=UpstreamError(503))
+    with patch('crawler_api.batch.COURTS', {"12": crawler_mock}):
+        result = await batch_lookup.lookup(Mock(), '1234567-69.1234.1.12.1234')
+    assert result == {'number': '1234567-69.1234.1.12.1234', 'error': 'Court responded with status 503'}
+
+
+@pytest.mark.asyncio
+async def test_batch_lookup_unexpected_error(batch_lookup, caplog):
+    crawler_mock = Mock()
+    crawler_mock().execute = CoroutineMock(side_effect=ValueError('error'))
+    with patch('crawler_api.batch.COURTS', {"12": crawler_mock}):
+        result = await batch_lookup.run(Mock(), ['1234567-69.1234.1.12.1234', '1234567-48.1234.1.02.1234'])
+    assert result == [
+        {'number': '1234567-69.1234.1.12.1234', 'error': 'Legal Process lookup failed'},
+        {'number': '1234567-48.1234.1.02.1234', 'error': 'Crawler not implemented'}
+    ]
+    assert 'Lookup of 1234567-69.1234.1.12.1234 failed' in caplog.text
+
+
+def test_batch_lookup_semaphore_bound_to_the_running_loop():
+    batch_lookup = BatchLookup(max_concurrency=1, court_max_concurrency=2)
+
+    async def execute(number, timeout=None, priority=None):
+        await asyncio.sleep(0.01)
+        return [CRAWLER_RESPONSE]
+
+    crawler_mock = Mock(return_value=Mock(execute=execute, timed_out=[], failed={}))
+    with patch('crawler_api.batch.COURTS', {'12': crawler_mock}):
+        for _ in range(2):
+            result = asyncio.run(batch_lookup.run(Mock(), ['1234567-69.1234.1.12.1234'] * 2))
+            assert [item['degrees'] for item in result] == [(CRAWLER_RESPONSE,), (CRAWLER_RESPONSE,)]
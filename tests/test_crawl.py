@@ -0,0 +1,151 @@
+import asyncio
+import gzip
+import io
+import json
+import runpy
+import subprocess
+import sys
+from unittest.mock import Mock
+
+import orjson
+import pytest
+from asynctest import CoroutineMock, patch
+
+from crawler_api.crawl import Checkpoint, Progress, ResultWriter, crawl, main
+
+from tests.fixtures import CRAWLER_RESPONSE
+
+NUMBERS = ['1234567-69.1234.1.12.1234', '1234567-00.1234.1.12.1234', '7654321-03.2020.8.12.0001']
+
+
+@pytest.fixture(autouse=True)
+def event_loop_after_run():
+    yield
+    asyncio.set_event_loop(asyncio.new_event_loop())
+
+
+@pytest.fixture
+def crawler_mock():
+    crawler_mock = Mock()
+    crawler_mock().execute = CoroutineMock(
+        side_effect=lambda number, timeout, priority: [CRAWLER_RESPONSE] if number == NUMBERS[0] else []
+    )
+    crawler_mock().timed_out = []
+    crawler_mock().failed = {}
+    with patch('crawler_api.batch.COURTS', {"12": crawler_mock}):
+        yield crawler_mock
+
+
+@pytest.fixture
+def numbers_file(tmp_path):
+    path = tmp_path / 'numbers.txt'
+    path.write_text('\n'.join(NUMBERS + [NUMBERS[0], '']) + '\n')
+    return str(path)
+
+
+def read_output(path):
+    with gzip.open(path) if path.endswith('.gz') else open(path, 'rb') as f:
+        return {item['number']: item for item in map(json.loads, f.read().splitlines())}
+
+
+@pytest.mark.asyncio
+async def test_crawl_yield_result_of_each_number_not_done(crawler_mock):
+    numbers = NUMBERS + [NUMBERS[0], '1234567-48.1234.1.02.1234']
+    result = [item async for item in crawl(Mock(), iter(numbers), done={'1234567-48.1234.1.02.1234'})]
+    assert sorted(result, key=lambda item: item['number']) == [
+        {'number': '1234567-00.1234.1.12.1234', 'error': 'Invalid Number. The check digit (DV) is not correct'},
+        {'number': '1234567-69.1234.1.12.1234', 'degrees': (CRAWLER_RESPONSE,), 'timed_out': [], 'failed': {}},
+        {'number': '7654321-03.2020.8.12.0001', 'error': 'Legal Process not found'},
+    ]
+    assert crawler_mock().execute.call_count == 2
+    assert crawler_mock().execute.call_args[1]['priority'] == 'bulk'
+
+
+@pytest.mark.asyncio
+async def test_crawl_validate_numbers_by_chunks(crawler_mock):
+    numbers = [NUMBERS[0], NUMBERS[0], '1234', NUMBERS[2]]
+    with patch('crawler_api.crawl.VALIDATE_CHUNK_SIZE', 1):
+        result = [item async for item in crawl(Mock(), numbers)]
+    assert sorted(item['number'] for item in result) == sorted([NUMBERS[0], '1234', NUMBERS[2]])
+    assert crawler_mock().execute.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_crawl_yield_invalid_numbers_without_valid_numbers():
+    result = [item async for item in crawl(Mock(), iter(['1234']))]
+    assert result == [{'number': '1234', 'error': 'Invalid number format. Example: 1234567-12.1234.1.12.1234'}]
+
+
+def test_checkpoint_drop_partial_commit(tmp_path):
+    path = tmp_path / 'checkpoint'
+    path.write_bytes(orjson.dumps({'offset': 10, 'numbers': ['one', 'two']}) + b'\n{"offset": 20, "num')
+    checkpoint = Checkpoint(str(path))
+    assert checkpoint.done == {'one', 'two'}
+    assert checkpoint.offset == 10
+    checkpoint.commit(['three'], 30)
+    checkpoint.close()
+    assert Checkpoint(str(path)).done == {'one', 'two', 'three'}
+
+
+def test_result_writer_keep_valid_gzip_after_truncate_on_commit_offset(tmp_path):
+    path = str(tmp_path / 'results.jsonl.gz')
+    writer = ResultWriter(path)
+    writer.write(b'one\n')
+    offset = writer.commit()
+    writer.write(b'two\n')
+    writer.close()
+    writer = ResultWriter(path, offset=offset)
+    writer.write(b'three\n')
+    writer.close()
+    with gzip.open(path) as f:
+        assert f.read() == b'one\nthree\n'
+
+
+def test_progress_report_throughput(capsys):
+    clock = Mock(side_effect=[0, 5, 10, 10, 20])
+    progress = Progress(report_every=10, clock=clock)
+    progress.update({'number': 'one'})
+    progress.update({'number': 'two', 'error': 'Legal Process not found'})
+    assert capsys.readouterr().err == '2 numbers crawled (1 errors) in 10.0s, 0.2 numbers/s\n'
+    progress.report()
+    assert capsys.readouterr().err == '2 numbers crawled (1 errors) in 20.0s, 0.1 numbers/s\n'
+
+
+def test_crawl_main_write_compressed_output_and_checkpoint(crawler_mock, numbers_file, tmp_path, capsys):
+    output = str(tmp_path / 'results.jsonl.gz')
+    checkpoint = str(tmp_path / 'checkpoint')
+    main([numbers_file, '--output', output, '--checkpoint', checkpoint, '--commit-every', '2', '--report-every', '0'])
+    results = read_output(output)
+    assert sorted(results) == sorted(NUMBERS)
+    assert results[NUMBERS[0]]['degrees'] == [CRAWLER_RESPONSE]
+    assert Checkpoint(checkpoint).done == set(NUMBERS)
+    assert capsys.readouterr().err.startswith('3 numbers crawled (2 errors) in ')
+
+
+def test_crawl_main_resume_after_the_last_commit(crawler_mock, numbers_file, tmp_path):
+    output = tmp_path / 'results.jsonl'
+    output.write_bytes(b'{"number": "done"}\n{"number": "not committed"')
+    checkpoint = tmp_path / 'checkpoint'
+    checkpoint.write_bytes(orjson.dumps({'offset': 19, 'numbers': [NUMBERS[1]]}) + b'\n')
+    main([numbers_file, '--output', str(output), '--checkpoint', str(checkpoint)])
+    assert sorted(read_output(str(output))) == sorted(['done', NUMBERS[0], NUMBERS[2]])
+    assert crawler_mock().execute.call_count == 2
+
+
+def test_crawl_main_read_stdin_and_write_stdout(crawler_mock, capsysbinary):
+    with patch.object(sys, 'stdin', io.StringIO(NUMBERS[0])):
+        main(['-'])
+    output = capsysbinary.readouterr()
+    assert orjson.loads(output.out)['degrees'] == [CRAWLER_RESPONSE]
+
+
+def test_crawl_module_require_output_with_checkpoint(capsys):
+    with patch.object(sys, 'argv', ['crawl', '-', '--checkpoint', 'checkpoint']):
+        with pytest.raises(SystemExit):
+            runpy.run_module('crawler_api.crawl', run_name='__main__')
+    assert '--checkpoint requires --output' in capsys.readouterr().err
+
+
+def test_crawl_module_does_not_build_the_api():
+    code = 'import sys, crawler_api.crawl; print("crawler_api.main" in sys.modules)'
+    assert subprocess.check_output([sys.executable, '-c', code]).strip() == b'False'
@@ -0,0 +1,195 @@
+import asyncio
+import sqlite3
+from unittest.mock import Mock
+
+import pytest
+from asynctest import CoroutineMock, patch
+
+from crawler_api.batch import BatchLookup
+from crawler_api.jobs import DONE, FAILED, PENDING, RUNNING, JobQueue, MemoryJobStore, SQLiteJobStore, get_job_store
+
+from tests.fixtures import CRAWLER_RESPONSE
+
+NUMBERS = ['1234567-69.1234.1.12.1234', '7654321-03.2020.8.12.0001']
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def job_store(request, tmp_path):
+    if request.param == 'memory':
+        return MemoryJobStore(clock=lambda: 1000.0)
+    return SQLiteJobStore(str(tmp_path / 'jobs.db'), clock=lambda: 1000.0)
+
+
+@pytest.fixture
+def crawler_mock():
+    crawler_mock = Mock()
+    crawler_mock().execute = CoroutineMock(
+        side_effect=lambda number, timeout, priority: [CRAWLER_RESPONSE] if number == NUMBERS[0] else []
+    )
+    crawler_mock().timed_out = []
+    crawler_mock().failed = {}
+    with patch('crawler_api.batch.COURTS', {"12": crawler_mock}):
+        yield crawler_mock
+
+
+@pytest.fixture
+def job_queue(job_store):
+    return JobQueue(job_store, BatchLookup(max_concurrency=2, court_max_concurrency=1), workers=1)
+
+
+async def wait_job(job_queue, job_id):
+    job = job_queue.store.get(job_id)
+    while job['status'] not in (DONE, FAILED):
+        job = await job_queue.wait(job_id, done=job['done'], timeout=1)
+    return job
+
+
+def test_get_job_store(tmp_path):
+    assert isinstance(get_job_store(), MemoryJobStore)
+    assert isinstance(get_job_store(str(tmp_path / 'jobs.db')), SQLiteJobStore)
+
+
+def test_job_store_create_and_get(job_store):
+    job_store.create('job', NUMBERS)
+    assert job_store.get('job') == {'id': 'job', 'status': PENDING, 'total': 2, 'done': 0, 'created_at': 1000.0}
+    assert job_store.get('unknown') is None
+    assert job_store.pending_numbers('job') == NUMBERS
+    assert job_store.unfinished() == ['job']
+
+
+def test_job_store_results_in_completion_order(job_store):
+    job_store.create('job', NUMBERS)
+    job_store.add_result('job', {'number': NUMBERS[1], 'error': 'Legal Process not found'})
+    assert job_store.get('job')['done'] == 1
+    assert job_store.pending_numbers('job') == NUMBERS[:1]
+    job_store.add_result('job', {'number': NUMBERS[0], 'degrees': [{'degree': '1º'}], 'timed_out': []})
+    assert job_store.results('job') == [
+        {'number': NUMBERS[1], 'degrees': None, 'timed_out': [], 'failed': {}, 'error': 'Legal Process not found'},
+        {'number': NUMBERS[0], 'degrees': [{'degree': '1º'}], 'timed_out': [], 'failed': {}, 'error': None}
+    ]
+    assert [item['number'] for item in job_store.results('job', offset=1, limit=1)] == NUMBERS[:1]
+
+
+def test_job_store_status(job_store):
+    job_store.create('one', NUMBERS)
+    job_store.create('two', NUMBERS)
+    job_store.set_status('one', RUNNING)
+    job_store.set_status('two', DONE)
+    assert job_store.get('one')['status'] == RUNNING
+    assert job_store.unfinished() == ['one']
+
+
+def test_job_store_purge_finished_jobs(job_store):
+    for job_id in ('done', 'running', 'failed'):
+        job_store.create(job_id, NUMBERS)
+    job_store.add_result('done', {'number': NUMBERS[0], 'error': 'Court unavailable'})
+    job_store.set_status('done', DONE)
+    job_store.set_status('running', RUNNING)
+    job_store.clock = lambda: 1010.0
+    job_store.set_status('failed', FAILED)
+    job_store.clock = lambda: 1070.0
+    job_store.purge(60)
+    assert job_store.get('done') is None
+    assert job_store.get('running')['status'] == RUNNING
+    assert job_store.get('failed')['status'] == FAILED
+    job_store.set_status('failed', RUNNING)
+    job_store.clock = lambda: 2000.0
+    job_store.purge(60)
+    assert sorted(job_store.unfinished()) == ['failed', 'running']
+
+
+def test_sqlite_job_store_purge_job_results(tmp_path):
+    job_store = SQLiteJobStore(str(tmp_path / 'jobs.db'), clock=lambda: 1000.0)
+    job_store.create('job', NUMBERS)
+    job_store.set_status('job', DONE)
+    job_store.clock = lambda: 1061.0
+    job_store.purge(60)
+    assert job_store.connection.execute('SELECT COUNT(*) FROM job_numbers').fetchone() == (0,)
+
+
+def test_sqlite_job_store_add_finish_time_to_old_database(tmp_path):
+    path = str(tmp_path / 'jobs.db')
+    connection = sqlite3.connect(path)
+    connection.execute(
+        'CREATE TABLE jobs (id TEXT PRIMARY KEY, status TEXT NOT NULL, total INTEGER NOT NULL, created_at REAL NOT NULL)'
+    )
+    connection.execute("INSERT INTO jobs VALUES ('job', 'done', 0, 1000.0)")
+    connection.commit()
+    connection.close()
+    job_store = SQLiteJobStore(path, clock=lambda: 2000.0)
+    job_store.purge(60)
+    assert job_store.get('job')['status'] == DONE
+
+
+def test_sqlite_job_store_keep_jobs_after_restart(tmp_path):
+    path = str(tmp_path / 'jobs.db')
+    SQLiteJobStore(path).create('job', NUMBERS)
+    SQLiteJobStore(path).add_result('job', {'number': NUMBERS[0], 'error': 'Court unavailable'})
+    job_store = SQLiteJobStore(path)
+    assert job_store.unfinished() == ['job']
+    assert job_store.pending_numbers('job') == NUMBERS[1:]
+
+
+@pytest.mark.asyncio
+async def test_job_queue_run_submitted_job(job_queue, crawler_mock):
+    job_queue.start(Mock())
+    job = job_queue.submit(NUMBERS + NUMBERS[:1])
+    assert job['status'] == PENDING
+    assert job['total'] == 2
+    job = await wait_job(job_queue, job['id'])
+    await job_queue.stop()
+    assert job['status'] == DONE
+    assert job['done'] == 2
+    results = {item['number']: item for item in job_queue.store.results(job['id'])}
+    assert results[NUMBERS[0]]['degrees'] in ((CRAWLER_RESPONSE,), [CRAWLER_RESPONSE])
+    assert results[NUMBERS[1]]['error'] == 'Legal Process not found'
+    assert crawler_mock().execute.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_job_queue_resume_unfinished_jobs_on_start(job_queue, crawler_mock):
+    job_queue.store.create('job', NUMBERS)
+    job_queue.store.set_status('job', RUNNING)
+    job_queue.store.add_result('job', {'number': NUMBERS[1], 'error': 'Legal Process not found'})
+    job_queue.start(Mock())
+    job = await wait_job(job_queue, 'job')
+    await job_queue.stop()
+    assert job['status'] == DONE
+    crawler_mock().execute.assert_called_once_with(number=NUMBERS[0], timeout=None, priority='bulk')
+
+
+@pytest.mark.asyncio
+async def test_job_queue_fail_job_on_unexpected_error(job_queue):
+    job_queue.batch_lookup = Mock()
+    job_queue.batch_lookup.stream = Mock(side_effect=RuntimeError)
+    job_queue.start(Mock())
+    job = await wait_job(job_queue, job_queue.submit(NUMBERS)['id'])
+    await job_queue.stop()
+    assert job['status'] == FAILED
+
+
+@pytest.mark.asyncio
+async def test_job_queue_wait_timeout_without_progress(job_queue):
+    job_queue.queue = asyncio.Queue()
+    job = job_queue.submit(NUMBERS)
+    assert await job_queue.wait(job['id'], done=0, timeout=0.01) == job
+    assert await job_queue.wait(job['id']) == job
+    assert await job_queue.wait('unknown', done=0) is None
+
+
+@pytest.mark.asyncio
+async def test_job_queue_purge_finished_jobs(job_store, crawler_mock):
+    job_queue = JobQueue(job_store, BatchLookup(max_concurrency=2, court_max_concurrency=1), retention=60)
+    job_queue.start(Mock())
+    first = job_queue.submit(NUMBERS)
+    await wait_job(job_queue, first['id'])
+    job_store.clock = lambda: 1061.0
+    second = job_queue.submit(NUMBERS)
+    await wait_job(job_queue, second['id'])
+    await job_queue.stop()
+    assert job_store.get(first['id']) is None
+    assert job_store.get(second['id'])['status'] == DONE
+
+
+def test_job_queue_stats(job_queue):
+    assert job_queue.stats() == {'workers': 0, 'queued': 0}
@@ -1,10 +1,23 @@
-from unittest.mock import Mock
+import asyncio
+import base64
+import json
+from unittest.mock import ANY, Mock
 
 import pytest
+from aiohttp import ClientError
 from asynctest import CoroutineMock, patch
 from fastapi.testclient import TestClient
 
-from crawler_api.main import app, http_async_session, shutdown_event, startup
+from crawler_api.crawlers.base import RefreshState
+from crawler_api.crawlers.breaker import CircuitBreaker, CircuitOpenError
+from crawler_api.crawlers.cache import ResultCache
+from crawler_api.crawlers.helper import HostRegistry
+from crawler_api.crawlers.retry import RetryPolicy, UpstreamError
+from crawler_api.crawlers.streaming import PageTooLargeError
+from crawler_api.jobs import DONE, JobQueue, MemoryJobStore
+from crawler_api.main import (app, crawler_options, http_async_session, shutdown_event, start_job_queue, startup,
+                              warm_up_event)
+from crawler_api.revalidation import StaleWhileRevalidate
 
 from tests.fixtures import CRAWLER_RESPONSE
 
@@ -62,12 +75,16 @@ def test_required_request_body_validation_on_legal_process_url(client):
 def test_legal_process_url_response(client):
     crawler_mock = Mock()
     crawler_mock().execute = CoroutineMock(return_value=[CRAWLER_RESPONSE])
+    crawler_mock().timed_out = []
+    crawler_mock().failed = {}
     with patch('crawler_api.main.COURTS', {"12": crawler_mock}):
         data = {'number': '1234567-69.1234.1.12.1234'}
         response = client.post('/legal-process', json=data)
     assert response.status_code == 200
     expected_payload = {
-        'degrees': [CRAWLER_RESPONSE]
+        'degrees': [CRAWLER_RESPONSE],
+        'timed_out': [],
+        'failed': {}
     }
     assert response.json() == expected_payload
 
@@ -75,15 +92,22 @@ def test_legal_process_url_response(client):
 def test_select_crawler_by_courts_on_legal_process(client):
     crawler_mock = Mock()
     crawler_mock().execute = CoroutineMock(return_value=[CRAWLER_RESPONSE])
+    crawler_mock().timed_out = []
+    crawler_mock().failed = {}
     with patch('crawler_api.main.COURTS', {"12": None, "23": crawler_mock}):
         data = {'number': '1234567-63.1234.1.23.1234'}
         client.post('/legal-process', json=data)
-    crawler_mock().execute.assert_called_once_with(number='1234567-63.1234.1.23.1234')
+    crawler_mock().execute.assert_called_once_with(
+        number='1234567-63.1234.1.23.1234', timeout=None, degrees=None, include={'parties_involved', 'updates'},
+        updates_limit=None, priority='interactive'
+    )
 
 
 def test_return_404_for_empty_crawler_result_on_legal_process(client):
     crawler_mock = Mock()
     crawler_mock().execute = CoroutineMock(return_value=[])
+    crawler_mock().timed_out = []
+    crawler_mock().failed = {}
     with patch('crawler_api.main.COURTS', {"12": None, "23": crawler_mock}):
         data = {'number': '1234567-63.1234.1.23.1234'}
         response = client.post('/legal-process', json=data)
@@ -94,6 +118,8 @@ def test_return_404_for_empty_crawler_result_on_legal_process(client):
 def test_return_422_for_crawler_not_implemented_result_on_legal_process(client):
     crawler_mock = Mock()
     crawler_mock().execute = CoroutineMock(return_value=[])
+    crawler_mock().timed_out = []
+    crawler_mock().failed = {}
     with patch('crawler_api.main.COURTS', {"12": crawler_mock}):
         data = {'number': '1234567-63.1234.1.23.1234'}
         response = client.post('/legal-process', json=data)
@@ -107,9 +133,640 @@ def test_event_startup(mock_http_async_session):
     mock_http_async_session.start.assert_called_once()
 
 
+@patch('crawler_api.main.job_queue')
+@patch('crawler_api.main.http_async_session')
+def test_event_start_job_queue(mock_http_async_session, mock_job_queue):
+    start_job_queue()
+    mock_job_queue.start.assert_called_once_with(mock_http_async_session())
+
+
 @pytest.mark.asyncio
+@patch('crawler_api.main.parse_executor')
 @patch('crawler_api.main.http_async_session')
-async def test_event_shutdown_event(mock_http_async_session):
+async def test_event_shutdown_event(mock_http_async_session, mock_parse_executor):
     mock_http_async_session.stop = CoroutineMock()
     await shutdown_event()
     mock_http_async_session.stop.assert_called_once()
+    mock_parse_executor.shutdown.assert_called_once()
+
+
+@pytest.mark.asyncio
+@patch('crawler_api.main.stale_results')
+@patch('crawler_api.main.parse_executor')
+@patch('crawler_api.main.http_async_session')
+async def test_event_shutdown_event_close_stale_results(mock_http_async_session, mock_parse_executor, mock_stale_results):
+    mock_http_async_session.stop = CoroutineMock()
+    await shutdown_event()
+    mock_stale_results.close.assert_called_once()
+
+
+def test_legal_process_batch_url_response(client):
+    crawler_mock = Mock()
+    crawler_mock().execute = CoroutineMock(side_effect=[[CRAWLER_RESPONSE], []])
+    crawler_mock().timed_out = []
+    crawler_mock().failed = {}
+    with patch('crawler_api.batch.COURTS', {"12": crawler_mock}):
+        data = {'numbers': ['1234567-69.1234.1.12.1234', '7654321-03.2020.8.12.0001', '1234567-48.1234.1.02.1234']}
+        response = client.post('/legal-process/batch', json=data)
+    assert response.status_code == 200
+    assert response.json() == {
+        'results': [
+            {'number': '1234567-69.1234.1.12.1234', 'degrees': [CRAWLER_RESPONSE], 'timed_out': [],
+             'failed': {}, 'error': None},
+            {'number': '7654321-03.2020.8.12.0001', 'degrees': None, 'timed_out': [],
+             'failed': {}, 'error': 'Legal Process not found'},
+            {'number': '1234567-48.1234.1.02.1234', 'degrees': None, 'timed_out': [],
+             'failed': {}, 'error': 'Crawler not implemented'},
+        ]
+    }
+    assert crawler_mock().execute.call_args[1]['priority'] == 'normal'
+
+
+def test_request_body_validation_on_legal_process_batch_url(client):
+    data = {'numbers': ['1234567-69.1234.1.12.1234', '1234567-12.1234.1.12.1234']}
+    response = client.post('/legal-process/batch', json=data)
+    assert response.status_code == 422
+    assert response.json() == {
+        'detail': [
+            {
+                'loc': ['body', 'numbers', 1],
+                'msg': 'Invalid Number. The check digit (DV) is not correct',
+                'type': 'assertion_error'
+            }
+        ]
+    }
+
+
+def test_legal_process_batch_stream_url_response(client):
+    crawler_mock = Mock()
+    crawler_mock().execute = CoroutineMock(return_value=[CRAWLER_RESPONSE])
+    crawler_mock().timed_out = []
+    crawler_mock().failed = {}
+    with patch('crawler_api.batch.COURTS', {"12": crawler_mock}):
+        data = {'numbers': ['1234567-69.1234.1.12.1234', '1234567-48.1234.1.02.1234']}
+        response = client.post('/legal-process/batch/stream', json=data, headers={'X-Request-Priority': 'bulk'})
+    assert response.status_code == 200
+    assert crawler_mock().execute.call_args[1]['priority'] == 'bulk'
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(lines, key=lambda line: line['number']) == [
+        {'number': '1234567-48.1234.1.02.1234', 'degrees': None, 'timed_out': [],
+         'failed': {}, 'error': 'Crawler not implemented'},
+        {'number': '1234567-69.1234.1.12.1234', 'degrees': [CRAWLER_RESPONSE], 'timed_out': [], 'failed': {}, 'error': None},
+    ]
+
+
+def test_metrics_url_response(client):
+    with patch('crawler_api.main.result_cache', ResultCache(ttl=1, negative_ttl=1, max_entries=10)), \
+            patch('crawler_api.main.retry_policies', HostRegistry(RetryPolicy)), \
+            patch('crawler_api.main.circuit_breakers', HostRegistry(CircuitBreaker)) as circuit_breakers, \
+            patch('crawler_api.main.rate_limiters', None):
+        circuit_breakers['https://one']
+        response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.json() == {
+        'cache': {'size': 0, 'max_entries': 10, 'hits': 0, 'misses': 0, 'evictions': 0},
+        'single_flight': {'in_flight': 0, 'coalesced': 0},
+        'retry': {},
+        'circuit_breakers': {'https://one': {'state': 'closed', 'calls': 0, 'failures': 0, 'rejected': 0}},
+        'rate_limiters': None,
+        'stale_results': None,
+        'jobs': {'workers': 0, 'queued': 0},
+        'schedulers': None
+    }
+
+
+def test_crawler_receive_crawler_options_on_legal_process(client):
+    crawler_mock = Mock()
+    crawler_mock.return_value.execute = CoroutineMock(return_value=[CRAWLER_RESPONSE])
+    crawler_mock.return_value.timed_out = []
+    crawler_mock.return_value.failed = {}
+    with patch('crawler_api.main.COURTS', {"12": crawler_mock}):
+        client.post('/legal-process', json={'number': '1234567-69.1234.1.12.1234'})
+    crawler_mock.assert_called_once_with(ANY, **crawler_options)
+
+
+@pytest.mark.asyncio
+@patch('crawler_api.main.settings.SESSION_WARM_UP', True)
+@patch('crawler_api.main.http_async_session')
+async def test_event_warm_up(mock_http_async_session):
+    mock_http_async_session.warm_up = CoroutineMock()
+    await warm_up_event()
+    mock_http_async_session.warm_up.assert_called_once_with(
+        ['https://esaj.tjms.jus.br', 'https://www2.tjal.jus.br'], connections=1
+    )
+
+
+@pytest.mark.asyncio
+@patch('crawler_api.main.settings.SESSION_WARM_UP', False)
+@patch('crawler_api.main.http_async_session')
+async def test_event_warm_up_disabled(mock_http_async_session):
+    mock_http_async_session.warm_up = CoroutineMock()
+    await warm_up_event()
+    mock_http_async_session.warm_up.assert_not_called()
+
+
+def test_legal_process_url_response_with_timed_out_degrees(client):
+    crawler_mock = Mock()
+    crawler_mock().execute = CoroutineMock(return_value=[CRAWLER_RESPONSE])
+    crawler_mock().timed_out = ['2º']
+    crawler_mock().failed = {}
+    with patch('crawler_api.main.COURTS', {"12": crawler_mock}):
+        data = {'number': '1234567-69.1234.1.12.1234'}
+        response = client.post('/legal-process', json=data, headers={'X-Request-Timeout': '1.5'})
+    assert response.status_code == 200
+    assert response.json() == {'degrees': [CRAWLER_RESPONSE], 'timed_out': ['2º'], 'failed': {}}
+    crawler_mock().execute.assert_called_once_with(
+        number='1234567-69.1234.1.12.1234', timeout=1.5, degrees=None, include={'parties_involved', 'updates'},
+        updates_limit=None, priority='interactive'
+    )
+
+
+def test_legal_process_url_response_with_failed_degrees(client):
+    crawler_mock = Mock()
+    crawler_mock().execute = CoroutineMock(return_value=[CRAWLER_RESPONSE])
+    crawler_mock().timed_out = []
+    crawler_mock().failed = {'2º': 'Court responded with status 503'}
+    with patch('crawler_api.main.COURTS', {"12": crawler_mock}):
+        response = client.post('/legal-process', json={'number': '1234567-69.1234.1.12.1234'})
+    assert response.status_code == 200
+    assert response.json() == {
+        'degrees': [CRAWLER_RESPONSE], 'timed_out': [], 'failed': {'2º': 'Court responded with status 503'}
+    }
+
+
+def test_return_504_for_all_degrees_timed_out_on_legal_process(client):
+    crawler_mock = Mock()
+    crawler_mock().execute = CoroutineMock(return_value=[])
+    crawler_mock().timed_out = ['1º', '2º']
+    crawler_mock().failed = {}
+    with patch('crawler_api.main.COURTS', {"12": crawler_mock}):
+        data = {'number': '1234567-69.1234.1.12.1234'}
+        response = client.post('/legal-process', json=data, headers={'X-Request-Timeout': '1'})
+    assert response.status_code == 504
+    assert response.json() == {"detail": "Legal Process request timed out"}
+
+
+def test_request_priority_header_on_legal_process(client):
+    crawler_mock = Mock()
+    crawler_mock().execute = CoroutineMock(return_value=[CRAWLER_RESPONSE])
+    crawler_mock().timed_out = []
+    crawler_mock().failed = {}
+    with patch('crawler_api.main.COURTS', {"12": crawler_mock}):
+        data = {'number': '1234567-69.1234.1.12.1234'}
+        response = client.post('/legal-process', json=data, headers={'X-Request-Priority': 'bulk'})
+    assert response.status_code == 200
+    assert crawler_mock().execute.call_args[1]['priority'] == 'bulk'
+
+
+def test_request_priority_header_validation_on_legal_process(client):
+    data = {'number': '1234567-69.1234.1.12.1234'}
+    response = client.post('/legal-process', json=data, headers={'X-Request-Priority': 'urgent'})
+    assert response.status_code == 422
+    assert response.json()['detail'][0]['loc'] == ['header', 'X-Request-Priority']
+
+
+@patch('crawler_api.main.settings.REQUEST_TIMEOUT', 10)
+def test_default_request_timeout_on_legal_process(client):
+    crawler_mock = Mock()
+    crawler_mock().execute = CoroutineMock(return_value=[CRAWLER_RESPONSE])
+    crawler_mock().timed_out = []
+    crawler_mock().failed = {}
+    with patch('crawler_api.main.COURTS', {"12": crawler_mock}):
+        client.post('/legal-process', json={'number': '1234567-69.1234.1.12.1234'})
+    crawler_mock().execute.assert_called_once_with(
+        number='1234567-69.1234.1.12.1234', timeout=10, degrees=None, include={'parties_involved', 'updates'},
+        updates_limit=None, priority='interactive'
+    )
+
+
+def test_legal_process_url_response_with_include_and_updates_limit(client):
+    crawler_mock = Mock()
+    result = {key: value for key, value in CRAWLER_RESPONSE.items() if key != 'parties_involved'}
+    crawler_mock().execute = CoroutineMock(return_value=[result])
+    crawler_mock().timed_out = []
+    crawler_mock().failed = {}
+    with patch('crawler_api.main.COURTS', {"12": crawler_mock}):
+        data = {'number': '1234567-69.1234.1.12.1234', 'include': ['updates'], 'updates_limit': 3}
+        response = client.post('/legal-process', json=data)
+    assert response.status_code == 200
+    assert response.json() == {'degrees': [result], 'timed_out': [], 'failed': {}}
+    crawler_mock().execute.assert_called_once_with(
+        number='1234567-69.1234.1.12.1234', timeout=None, degrees=None, include={'updates'}, updates_limit=3,
+        priority='interactive'
+    )
+
+
+def test_legal_process_url_response_with_degrees(client):
+    crawler_mock = Mock()
+    crawler_mock().execute = CoroutineMock(return_value=[CRAWLER_RESPONSE])
+    crawler_mock().timed_out = []
+    crawler_mock().failed = {}
+    with patch('crawler_api.main.COURTS', {"02": crawler_mock}):
+        client.post('/legal-process', json={'number': '1234567-48.1234.1.02.1234', 'degrees': ['1º']})
+    assert crawler_mock().execute.call_args[1]['degrees'] == {'1º'}
+
+
+def test_legal_process_url_response_with_null_degrees(client):
+    crawler_mock = Mock()
+    crawler_mock().execute = CoroutineMock(return_value=[CRAWLER_RESPONSE])
+    crawler_mock().timed_out = []
+    crawler_mock().failed = {}
+    with patch('crawler_api.main.COURTS', {"12": crawler_mock}):
+        response = client.post('/legal-process', json={'number': '1234567-69.1234.1.12.1234', 'degrees': None})
+    assert response.status_code == 200
+    assert crawler_mock().execute.call_args[1]['degrees'] is None
+
+
+def test_return_422_for_invalid_degrees_on_legal_process(client):
+    response = client.post('/legal-process', json={'number': '1234567-48.1234.1.02.1234', 'degrees': ['3º']})
+    assert response.status_code == 422
+    assert response.json()['detail'][0]['msg'] == 'Invalid degrees. Options: 1º, 2º'
+
+
+REFRESH_RESULT = {
+    'degree': '2º',
+    'modified': True,
+    'content_hash': 'new-hash',
+    'etag': None,
+    'last_modified': None,
+    'updates': CRAWLER_RESPONSE['updates'][:1]
+}
+
+
+def test_legal_process_refresh_url_response(client):
+    crawler_mock = Mock()
+    crawler_mock().refresh = CoroutineMock(return_value=[REFRESH_RESULT])
+    crawler_mock().timed_out = []
+    crawler_mock().failed = {}
+    data = {
+        'number': '1234567-69.1234.1.12.1234',
+        'known': {'2º': {'latest_update': CRAWLER_RESPONSE['updates'][1], 'content_hash': 'hash'}}
+    }
+    with patch('crawler_api.main.COURTS', {"12": crawler_mock}):
+        response = client.post('/legal-process/refresh', json=data)
+    assert response.status_code == 200
+    assert response.json() == {'degrees': [REFRESH_RESULT], 'timed_out': [], 'failed': {}}
+    latest_update = CRAWLER_RESPONSE['updates'][1]
+    crawler_mock().refresh.assert_called_once_with(
+        {'2º': RefreshState(latest_update=(latest_update['date'], latest_update['description']), content_hash='hash')},
+        timeout=ANY,
+        priority='interactive',
+        number='1234567-69.1234.1.12.1234'
+    )
+
+
+def test_return_404_for_empty_crawler_result_on_legal_process_refresh(client):
+    crawler_mock = Mock()
+    crawler_mock().refresh = CoroutineMock(return_value=[])
+    crawler_mock().timed_out = []
+    crawler_mock().failed = {}
+    with patch('crawler_api.main.COURTS', {"12": crawler_mock}):
+        response = client.post('/legal-process/refresh', json={'number': '1234567-69.1234.1.12.1234', 'known': {'1º': {}}})
+    assert response.status_code == 404
+
+
+def test_return_422_for_invalid_known_degrees_on_legal_process_refresh(client):
+    response = client.post('/legal-process/refresh', json={'number': '1234567-69.1234.1.12.1234', 'known': {'3º': {}}})
+    assert response.status_code == 422
+    assert response.json()['detail'][0]['msg'] == 'Invalid degrees. Options: 1º, 2º'
+
+
+@pytest.mark.parametrize('fast_serialization', (False, True))
+def test_legal_process_url_stale_response(client, fast_serialization):
+    stale_results = StaleWhileRevalidate(soft_ttl=10, hard_ttl=100, max_entries=10, max_refreshes=1)
+    crawler_mock = stale_crawler_mock()
+    with patch('crawler_api.main.stale_results', stale_results), \
+            patch('crawler_api.main.settings.FAST_SERIALIZATION', fast_serialization), \
+            patch('crawler_api.main.COURTS', {"12": crawler_mock}):
+        first = client.post('/legal-process', json={'number': '1234567-69.1234.1.12.1234'})
+        second = client.post('/legal-process', json={'number': '1234567-69.1234.1.12.1234'})
+    assert first.status_code == second.status_code == 200
+    assert first.headers['Age'] == second.headers['Age'] == '0'
+    assert second.json() == first.json() == {'degrees': [CRAWLER_RESPONSE], 'timed_out': [], 'failed': {}}
+    crawler_mock().execute.assert_called_once()
+    assert stale_results.stats()['hits'] == 1
+    assert list(stale_results.entries.values())[0][1] == ((('compact', CRAWLER_RESPONSE),), [], {})
+
+
+def stale_crawler_mock():
+    crawler_mock = Mock()
+    crawler_mock().execute = CoroutineMock(return_value=[CRAWLER_RESPONSE])
+    crawler_mock().timed_out = []
+    crawler_mock().failed = {}
+    crawler_mock().compact = lambda result: ('compact', result)
+    crawler_mock().expand = lambda value: value[1]
+    return crawler_mock
+
+
+def test_legal_process_url_stale_response_do_not_keep_timed_out_result(client):
+    stale_results = StaleWhileRevalidate(
+        soft_ttl=10, hard_ttl=100, max_entries=10, max_refreshes=1, keep=lambda value: not value[1] and not value[2]
+    )
+    crawler_mock = stale_crawler_mock()
+    crawler_mock().timed_out = ['1º']
+    crawler_mock().failed = {}
+    with patch('crawler_api.main.stale_results', stale_results), patch('crawler_api.main.COURTS', {"12": crawler_mock}):
+        response = client.post('/legal-process', json={'number': '1234567-69.1234.1.12.1234'})
+    assert response.json() == {'degrees': [CRAWLER_RESPONSE], 'timed_out': ['1º'], 'failed': {}}
+    assert stale_results.stats()['size'] == 0
+
+
+def test_legal_process_url_stale_response_refresh_with_normal_priority(client):
+    clock = Mock(return_value=0)
+    stale_results = StaleWhileRevalidate(soft_ttl=10, hard_ttl=100, max_entries=10, max_refreshes=1, clock=clock)
+    crawler_mock = stale_crawler_mock()
+    with patch('crawler_api.main.stale_results', stale_results), patch('crawler_api.main.COURTS', {"12": crawler_mock}):
+        client.post('/legal-process', json={'number': '1234567-69.1234.1.12.1234'})
+        clock.return_value = 15
+        response = client.post('/legal-process', json={'number': '1234567-69.1234.1.12.1234'})
+    assert response.headers['Age'] == '15'
+    assert [call[1]['priority'] for call in crawler_mock().execute.call_args_list] == ['interactive', 'normal']
+
+
+def test_legal_process_url_paginated_response(client):
+    crawler_mock = Mock()
+    crawler_mock().execute = CoroutineMock(return_value=[{**CRAWLER_RESPONSE, 'degree': '2º'}])
+    crawler_mock().timed_out = []
+    crawler_mock().failed = {}
+    with patch('crawler_api.main.COURTS', {"12": crawler_mock}):
+        data = {'number': '1234567-69.1234.1.12.1234', 'page_size': 2}
+        response = client.post('/legal-process', json=data)
+    assert response.status_code == 200
+    degree = response.json()['degrees'][0]
+    assert degree['parties_involved'] == CRAWLER_RESPONSE['parties_involved']
+    assert degree['next_parties_involved_cursor'] is None
+    assert degree['updates'] == CRAWLER_RESPONSE['updates'][:2]
+    with patch('crawler_api.main.COURTS', {"12": crawler_mock}):
+        response = client.get('/legal-process/updates', params={'cursor': degree['next_updates_cursor']})
+    assert response.status_code == 200
+    assert response.json() == {'items': CRAWLER_RESPONSE['updates'][2:], 'next_cursor': None}
+    assert crawler_mock().execute.call_args_list[1][1] == {
+        'number': '1234567-69.1234.1.12.1234',
+        'timeout': None,
+        'degrees': {'2º'},
+        'include': {'parties_involved', 'updates'},
+        'updates_limit': None,
+        'priority': 'interactive'
+    }
+
+
+def test_legal_process_parties_involved_page_url_response(client):
+    crawler_mock = Mock()
+    crawler_mock().execute = CoroutineMock(return_value=[{**CRAWLER_RESPONSE, 'degree': '2º'}])
+    crawler_mock().timed_out = []
+    crawler_mock().failed = {}
+    with patch('crawler_api.main.COURTS', {"12": crawler_mock}):
+        data = {'number': '1234567-69.1234.1.12.1234', 'page_size': 1}
+        cursor = client.post('/legal-process', json=data).json()['degrees'][0]['next_parties_involved_cursor']
+        response = client.get('/legal-process/parties-involved', params={'cursor': cursor})
+    assert response.status_code == 200
+    assert response.json() == {'items': CRAWLER_RESPONSE['parties_involved'][1:], 'next_cursor': None}
+
+
+def test_return_410_for_cursor_of_changed_legal_process_page(client):
+    crawler_mock = Mock()
+    crawler_mock().execute = CoroutineMock(side_effect=[
+        [{**CRAWLER_RESPONSE, 'degree': '2º'}],
+        [{**CRAWLER_RESPONSE, 'degree': '2º', 'updates': CRAWLER_RESPONSE['updates'][1:]}]
+    ])
+    crawler_mock().timed_out = []
+    crawler_mock().failed = {}
+    with patch('crawler_api.main.COURTS', {"12": crawler_mock}):
+        data = {'number': '1234567-69.1234.1.12.1234', 'page_size': 1}
+        cursor = client.post('/legal-process', json=data).json()['degrees'][0]['next_updates_cursor']
+        response = client.get('/legal-process/updates', params={'cursor': cursor})
+    assert response.status_code == 410
+    assert response.json() == {'detail': 'Legal Process changed since the first page'}
+
+
+@pytest.mark.parametrize('url', ('/legal-process/updates', '/legal-process/parties-involved'))
+def test_return_422_for_invalid_cursor_on_legal_process_page(client, url):
+    response = client.get(url, params={'cursor': 'invalid'})
+    assert response.status_code == 422
+    assert response.json() == {'detail': 'Invalid cursor'}
+
+
+def test_return_422_for_cursor_of_section_not_included_on_legal_process_page(client):
+    cursor = base64.urlsafe_b64encode(
+        b'{"query": {"number": "1234567-69.1234.1.12.1234", "include": ["updates"]}, '
+        b'"section": "parties_involved", "offset": 0, "limit": 2}'
+    ).decode()
+    response = client.get('/legal-process/parties-involved', params={'cursor': cursor})
+    assert response.status_code == 422
+    assert response.json() == {'detail': 'Invalid cursor'}
+
+
+def test_return_422_for_cursor_of_other_section_on_legal_process_page(client):
+    crawler_mock = Mock()
+    crawler_mock().execute = CoroutineMock(return_value=[{**CRAWLER_RESPONSE, 'degree': '2º'}])
+    crawler_mock().timed_out = []
+    crawler_mock().failed = {}
+    with patch('crawler_api.main.COURTS', {"12": crawler_mock}):
+        data = {'number': '1234567-69.1234.1.12.1234', 'page_size': 1}
+        cursor = client.post('/legal-process', json=data).json()['degrees'][0]['next_updates_cursor']
+        response = client.get('/legal-process/parties-involved', params={'cursor': cursor})
+    assert response.status_code == 422
+    assert response.json() == {'detail': 'Invalid cursor'}
+
+
+def post_with_serialization(client, fast_serialization, url, data, court_module='crawler_api.main'):
+    crawler_mock = Mock()
+    crawler_mock().execute = CoroutineMock(return_value=[{**CRAWLER_RESPONSE, 'degree': '2º'}])
+    crawler_mock().refresh = CoroutineMock(return_value=[REFRESH_RESULT])
+    crawler_mock().timed_out = []
+    crawler_mock().failed = {}
+    with patch('crawler_api.main.settings.FAST_SERIALIZATION', fast_serialization):
+        with patch(f'{court_module}.COURTS', {"12": crawler_mock}):
+            return client.post(url, json=data)
+
+
+@pytest.mark.parametrize(
+    'url, data, court_module',
+    (
+        ('/legal-process', {'number': '1234567-69.1234.1.12.1234'}, 'crawler_api.main'),
+        ('/legal-process', {'number': '1234567-69.1234.1.12.1234', 'include': ['updates']}, 'crawler_api.main'),
+        ('/legal-process', {'number': '1234567-69.1234.1.12.1234', 'page_size': 1}, 'crawler_api.main'),
+        (
+            '/legal-process/refresh',
+            {'number': '1234567-69.1234.1.12.1234', 'known': {'2º': {'content_hash': 'hash'}}},
+            'crawler_api.main'
+        ),
+        (
+            '/legal-process/batch',
+            {'numbers': ['1234567-69.1234.1.12.1234', '1234567-48.1234.1.02.1234']},
+            'crawler_api.batch'
+        ),
+        (
+            '/legal-process/batch/stream',
+            {'numbers': ['1234567-69.1234.1.12.1234', '1234567-48.1234.1.02.1234']},
+            'crawler_api.batch'
+        ),
+    )
+)
+def test_fast_serialization_response_equals_response_model(client, url, data, court_module):
+    response = post_with_serialization(client, False, url, data, court_module)
+    fast_response = post_with_serialization(client, True, url, data, court_module)
+    assert fast_response.status_code == response.status_code == 200
+    assert fast_response.headers['content-type'] == response.headers['content-type']
+    assert [json.loads(line) for line in sorted(fast_response.text.splitlines())] == [
+        json.loads(line) for line in sorted(response.text.splitlines())
+    ]
+
+
+@pytest.mark.parametrize('section', ('updates', 'parties_involved'))
+def test_fast_serialization_page_response_equals_response_model(client, section):
+    data = {'number': '1234567-69.1234.1.12.1234', 'page_size': 1}
+    cursor = post_with_serialization(client, False, '/legal-process', data).json()['degrees'][0][f'next_{section}_cursor']
+    url = f'/legal-process/{section.replace("_", "-")}'
+    responses = []
+    for fast_serialization in (False, True):
+        crawler_mock = Mock()
+        crawler_mock().execute = CoroutineMock(return_value=[{**CRAWLER_RESPONSE, 'degree': '2º'}])
+        crawler_mock().timed_out = []
+        crawler_mock().failed = {}
+        with patch('crawler_api.main.settings.FAST_SERIALIZATION', fast_serialization):
+            with patch('crawler_api.main.COURTS', {"12": crawler_mock}):
+                responses.append(client.get(url, params={'cursor': cursor}).json())
+    assert responses[0] == responses[1]
+
+
+def test_request_timeout_header_validation_on_legal_process(client):
+    data = {'number': '1234567-69.1234.1.12.1234'}
+    response = client.post('/legal-process', json=data, headers={'X-Request-Timeout': '0'})
+    assert response.status_code == 422
+    assert response.json()['detail'][0]['loc'] == ['header', 'X-Request-Timeout']
+
+
+def test_crawler_options():
+    assert set(crawler_options) == {
+        'cache', 'single_flight', 'parse_executor', 'retry_policies', 'circuit_breakers', 'rate_limiters', 'stream_parse',
+        'parser_backend', 'page_store', 'schedulers'
+    }
+
+
+def test_return_503_for_circuit_open_on_legal_process(client):
+    crawler_mock = Mock()
+    crawler_mock().execute = CoroutineMock(side_effect=CircuitOpenError())
+    with patch('crawler_api.main.COURTS', {"12": crawler_mock}):
+        data = {'number': '1234567-69.1234.1.12.1234'}
+        response = client.post('/legal-process', json=data)
+    assert response.status_code == 503
+    assert response.json() == {"detail": "Court unavailable"}
+
+
+def test_return_502_for_court_page_too_large_on_legal_process(client):
+    crawler_mock = Mock()
+    crawler_mock().execute = CoroutineMock(side_effect=PageTooLargeError())
+    with patch('crawler_api.main.COURTS', {"12": crawler_mock}):
+        data = {'number': '1234567-69.1234.1.12.1234'}
+        response = client.post('/legal-process', json=data)
+    assert response.status_code == 502
+    assert response.json() == {"detail": "Court page too large"}
+
+
+@pytest.mark.parametrize('status, status_code', ((503, 503), (429, 503), (500, 502)))
+def test_return_court_error_for_upstream_error_on_legal_process(client, status, status_code):
+    crawler_mock = Mock()
+    crawler_mock().execute = CoroutineMock(side_effect=UpstreamError(status))
+    with patch('crawler_api.main.COURTS', {"12": crawler_mock}):
+        data = {'number': '1234567-69.1234.1.12.1234'}
+        response = client.post('/legal-process', json=data)
+    assert response.status_code == status_code
+    assert response.json() == {"detail": f"Court responded with status {status}"}
+
+
+@pytest.mark.parametrize(
+    'error, status_code, detail',
+    (
+        (ClientError(), 502, 'Court request failed: ClientError'),
+        (asyncio.TimeoutError(), 504, 'Court request failed: TimeoutError'),
+    )
+)
+def test_return_court_error_for_failed_request_on_legal_process(client, error, status_code, detail):
+    crawler_mock = Mock()
+    crawler_mock().execute = CoroutineMock(side_effect=error)
+    with patch('crawler_api.main.COURTS', {"12": crawler_mock}):
+        data = {'number': '1234567-69.1234.1.12.1234'}
+        response = client.post('/legal-process', json=data)
+    assert response.status_code == status_code
+    assert response.json() == {"detail": detail}
+
+
+@pytest.mark.parametrize('fast_serialization', (False, True))
+def test_legal_process_validate_url_response(client, fast_serialization):
+    with patch('crawler_api.main.settings.FAST_SERIALIZATION', fast_serialization):
+        response = client.post(
+            '/legal-process/validate', json={'numbers': ['1234567-69.1234.1.12.1234', '1234567-00.1234.1.12.1234']}
+        )
+    assert response.status_code == 200
+    assert response.json() == {
+        'valid': [True, False],
+        'courts': ['12', None],
+        'errors': [None, 'Invalid Number. The check digit (DV) is not correct']
+    }
+
+
+def test_return_422_for_empty_numbers_on_legal_process_validate(client):
+    response = client.post('/legal-process/validate', json={'numbers': []})
+    assert response.status_code == 422
+
+
+@pytest.fixture
+def job_queue():
+    job_queue = JobQueue(MemoryJobStore(clock=lambda: 1000.0), Mock())
+    job_queue.queue = Mock()
+    with patch('crawler_api.main.job_queue', job_queue):
+        yield job_queue
+
+
+def test_legal_process_job_url_response(client, job_queue):
+    response = client.post('/legal-process/jobs', json={'numbers': ['1234567-69.1234.1.12.1234']})
+    assert response.status_code == 202
+    job = response.json()
+    assert job == {'id': ANY, 'status': 'pending', 'total': 1, 'done': 0, 'created_at': 1000.0}
+    job_queue.queue.put_nowait.assert_called_once_with(job['id'])
+
+
+def test_request_body_validation_on_legal_process_job_url(client, job_queue):
+    response = client.post('/legal-process/jobs', json={'numbers': ['1234567-00.1234.1.12.1234']})
+    assert response.status_code == 422
+
+
+@pytest.mark.parametrize('fast_serialization', (False, True))
+def test_legal_process_job_results_url_response(client, job_queue, fast_serialization):
+    job_id = job_queue.submit(['1234567-69.1234.1.12.1234', '7654321-03.2020.8.12.0001'])['id']
+    job_queue.store.add_result(job_id, {'number': '1234567-69.1234.1.12.1234', 'degrees': [CRAWLER_RESPONSE]})
+    with patch('crawler_api.main.settings.FAST_SERIALIZATION', fast_serialization):
+        response = client.get(f'/legal-process/jobs/{job_id}', params={'limit': 1})
+        next_response = client.get(f'/legal-process/jobs/{job_id}', params={'offset': 1, 'done': 1, 'wait': 0.01})
+    assert response.status_code == next_response.status_code == 200
+    assert response.json() == {
+        'id': job_id,
+        'status': 'pending',
+        'total': 2,
+        'done': 1,
+        'created_at': 1000.0,
+        'results': [
+            {'number': '1234567-69.1234.1.12.1234', 'degrees': [CRAWLER_RESPONSE], 'timed_out': [],
+             'failed': {}, 'error': None}
+        ],
+        'next_offset': 1
+    }
+    assert next_response.json()['results'] == []
+    assert next_response.json()['next_offset'] == 1
+
+
+def test_legal_process_finished_job_results_url_response(client, job_queue):
+    job_id = job_queue.submit(['1234567-69.1234.1.12.1234', '7654321-03.2020.8.12.0001'])['id']
+    job_queue.store.add_result(job_id, {'number': '1234567-69.1234.1.12.1234', 'error': 'Court unavailable'})
+    job_queue.store.set_status(job_id, DONE)
+    response = client.get(f'/legal-process/jobs/{job_id}')
+    assert response.json()['status'] == 'done'
+    assert response.json()['next_offset'] is None
+
+
+def test_return_404_for_unknown_job(client, job_queue):
+    response = client.get('/legal-process/jobs/unknown')
+    assert response.status_code == 404
+    assert response.json() == {'detail': 'Job not found'}
@@ -0,0 +1,83 @@
+import base64
+
+import pytest
+
+from crawler_api.models.requests import LegalProcess, LegalProcessCursor
+from crawler_api.pagination import decode_cursor, encode_cursor, get_page, get_snapshot, paginate
+
+from tests.fixtures import CRAWLER_RESPONSE
+
+
+@pytest.fixture
+def cursor():
+    query = LegalProcess(number='1234567-69.1234.1.12.1234', degrees=['2º'], include=['updates'])
+    return LegalProcessCursor(query=query, section='updates', offset=0, limit=2, snapshot='snapshot')
+
+
+def test_decode_encoded_cursor(cursor):
+    assert decode_cursor(encode_cursor(cursor)) == cursor
+
+
+@pytest.mark.parametrize(
+    'value',
+    (
+        'invalid',
+        base64.urlsafe_b64encode(b'{}').decode(),
+        base64.urlsafe_b64encode(
+            b'{"query": {"number": "1234"}, "section": "updates", "offset": 0, "limit": 2}'
+        ).decode(),
+        base64.urlsafe_b64encode(
+            b'{"query": {"number": "1234567-69.1234.1.12.1234", "include": ["updates"]}, '
+            b'"section": "parties_involved", "offset": 0, "limit": 2}'
+        ).decode(),
+    )
+)
+def test_decode_invalid_cursor(value):
+    with pytest.raises(ValueError):
+        decode_cursor(value)
+
+
+def test_get_page(cursor):
+    items, next_cursor = get_page([1, 2, 3, 4, 5], cursor)
+    assert items == [1, 2]
+    items, next_cursor = get_page([1, 2, 3, 4, 5], decode_cursor(next_cursor))
+    assert items == [3, 4]
+    items, next_cursor = get_page([1, 2, 3, 4, 5], decode_cursor(next_cursor))
+    assert items == [5]
+    assert next_cursor is None
+
+
+def test_get_page_keep_cursor_snapshot(cursor):
+    _, next_cursor = get_page([1, 2, 3, 4, 5], cursor)
+    assert decode_cursor(next_cursor).snapshot == 'snapshot'
+
+
+def test_get_snapshot():
+    updates = [{'date': '01/01/2020', 'description': 'Test'}]
+    assert get_snapshot(updates) == get_snapshot([{'description': 'Test', 'date': '01/01/2020'}])
+    assert get_snapshot(updates) == get_snapshot(tuple(updates))
+    assert get_snapshot(updates) != get_snapshot(updates + updates)
+
+
+def test_get_page_without_next_page(cursor):
+    assert get_page([1, 2], cursor) == ([1, 2], None)
+
+
+def test_paginate():
+    legal_process = LegalProcess(number='1234567-69.1234.1.12.1234', page_size=1)
+    result = paginate({**CRAWLER_RESPONSE, 'degree': '2º'}, legal_process)
+    assert result['parties_involved'] == CRAWLER_RESPONSE['parties_involved'][:1]
+    assert result['updates'] == CRAWLER_RESPONSE['updates'][:1]
+    cursor = decode_cursor(result['next_updates_cursor'])
+    assert cursor.section == 'updates'
+    assert (cursor.offset, cursor.limit) == (1, 1)
+    assert cursor.query == legal_process.copy(update={'degrees': {'2º'}, 'page_size': None})
+    assert cursor.snapshot == get_snapshot(CRAWLER_RESPONSE['updates'])
+    assert decode_cursor(result['next_parties_involved_cursor']).section == 'parties_involved'
+
+
+def test_paginate_only_included_sections():
+    legal_process = LegalProcess(number='1234567-69.1234.1.12.1234', include=['updates'], page_size=10)
+    updates = [{'date': '01/01/2020', 'description': 'Test'}]
+    result = paginate({'degree': '1º', 'updates': updates}, legal_process)
+    assert result == {'degree': '1º', 'updates': updates, 'next_updates_cursor': None}
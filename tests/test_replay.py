@@ -0,0 +1,71 @@
+import json
+import os
+import runpy
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from crawler_api.crawlers.store import PageStore
+from crawler_api.replay import main, replay, replay_page
+
+from tests.fixtures import CRAWLER_RESPONSE
+
+
+@pytest.fixture
+def page_store(tmp_path):
+    path = os.path.join(os.path.dirname(__file__), 'crawler', 'fixtures', 'tjms_second_degree.html')
+    with open(path, 'rb') as f:
+        body = f.read()
+    page_store = PageStore(str(tmp_path / 'store'), clock=lambda: 1000.0)
+    page_store.put('tjms', 'Test', '1234567-69.1234.1.12.1234', body, 'utf-8')
+    page_store.put('tjms', '1º', '1234567-69.1234.1.12.1234', b'<html></html>', 'utf-8')
+    page_store.put('unknown', '1º', '1234567-69.1234.1.12.1234', body, 'utf-8')
+    return page_store
+
+
+@pytest.mark.parametrize('parser_backend', ('parsel', 'lxml'))
+def test_replay_parse_stored_pages(page_store, parser_backend):
+    assert list(replay(page_store, workers=1, parser_backend=parser_backend)) == [
+        {
+            'court': 'tjms',
+            'degree': '1º',
+            'number': '1234567-69.1234.1.12.1234',
+            'fetched_at': 1000.0,
+            'result': None
+        },
+        {
+            'court': 'tjms',
+            'degree': 'Test',
+            'number': '1234567-69.1234.1.12.1234',
+            'fetched_at': 1000.0,
+            'result': CRAWLER_RESPONSE
+        }
+    ]
+
+
+def test_replay_page(page_store):
+    entry = page_store.latest('tjms', '1234567-69.1234.1.12.1234')['Test']
+    assert replay_page(page_store.path, 'lxml', entry) == CRAWLER_RESPONSE
+
+
+def test_replay_main_write_output_file(page_store, tmp_path, capsys):
+    output = tmp_path / 'results.jsonl'
+    main([page_store.path, '--court', 'tjms', '--workers', '1', '--output', str(output)])
+    lines = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [line['result'] for line in lines] == [None, CRAWLER_RESPONSE]
+    assert capsys.readouterr().err == '2 pages parsed\n'
+
+
+def test_replay_main_write_stdout(page_store, capsysbinary):
+    main([page_store.path, '--workers', '1'])
+    output = capsysbinary.readouterr()
+    assert len(output.out.splitlines()) == 2
+    assert output.err == b'2 pages parsed\n'
+
+
+def test_replay_module_validate_arguments(page_store, capsys):
+    with patch.object(sys, 'argv', ['replay', page_store.path, '--court', 'invalid']):
+        with pytest.raises(SystemExit):
+            runpy.run_module('crawler_api.replay', run_name='__main__')
+    assert "invalid choice: 'invalid'" in capsys.readouterr().err
@@ -0,0 +1,163 @@
+import asyncio
+
+import pytest
+from asynctest import CoroutineMock
+
+from crawler_api.revalidation import StaleWhileRevalidate
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+async def wait_refreshes(stale_results):
+    await asyncio.wait(list(stale_results.lookups.values()))
+    await asyncio.sleep(0)
+
+
+@pytest.fixture
+def stale_results(clock):
+    return StaleWhileRevalidate(soft_ttl=10, hard_ttl=100, max_entries=2, max_refreshes=1, clock=clock)
+
+
+@pytest.mark.asyncio
+async def test_stale_while_revalidate_lookup_on_miss(stale_results):
+    lookup = CoroutineMock(return_value='One')
+    assert await stale_results.get('key', lookup) == ('One', 0)
+    assert await stale_results.get('key', lookup) == ('One', 0)
+    lookup.assert_called_once()
+    assert stale_results.stats()['misses'] == 1
+    assert stale_results.stats()['hits'] == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_while_revalidate_serve_stale_value_and_refresh_in_background(stale_results, clock):
+    stale_results.set('key', 'Old')
+    clock.now = 15
+    lookup = CoroutineMock(return_value='New')
+    assert await stale_results.get('key', lookup) == ('Old', 15)
+    assert stale_results.stats()['refreshing'] == 1
+    await wait_refreshes(stale_results)
+    lookup.assert_called_once()
+    assert stale_results.stats()['refreshing'] == 0
+    assert await stale_results.get('key', lookup) == ('New', 0)
+    assert stale_results.stats()['stale_hits'] == 1
+    assert stale_results.stats()['refreshes'] == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_while_revalidate_lookup_expired_value_before_return(stale_results, clock):
+    stale_results.set('key', 'Old')
+    clock.now = 100
+    assert await stale_results.get('key', CoroutineMock(return_value='New')) == ('New', 0)
+    assert stale_results.stats()['misses'] == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_while_revalidate_share_refresh_of_the_same_key(stale_results, clock):
+    stale_results.set('key', 'Old')
+    clock.now = 15
+    event = asyncio.Event()
+
+    async def lookup():
+        await event.wait()
+        return 'New'
+    assert await stale_results.get('key', lookup) == ('Old', 15)
+    assert await stale_results.get('key', lookup) == ('Old', 15)
+    clock.now = 100
+    expired = asyncio.ensure_future(stale_results.get('key', lookup))
+    await asyncio.sleep(0)
+    event.set()
+    assert await expired == ('New', 0)
+    assert stale_results.stats()['refreshes'] == 1
+    assert stale_results.stats()['skipped_refreshes'] == 0
+
+
+@pytest.mark.asyncio
+async def test_stale_while_revalidate_skip_refresh_over_max_refreshes(stale_results, clock):
+    stale_results.set('one', 'One')
+    stale_results.set('two', 'Two')
+    clock.now = 15
+    event = asyncio.Event()
+
+    async def lookup():
+        await event.wait()
+        return 'New'
+    assert await stale_results.get('one', lookup) == ('One', 15)
+    assert await stale_results.get('two', lookup) == ('Two', 15)
+    event.set()
+    await asyncio.sleep(0)
+    assert stale_results.stats()['refreshes'] == 1
+    assert stale_results.stats()['skipped_refreshes'] == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_while_revalidate_keep_stale_value_on_failed_refresh(stale_results, clock):
+    stale_results.set('key', 'Old')
+    clock.now = 15
+    assert await stale_results.get('key', CoroutineMock(side_effect=ValueError)) == ('Old', 15)
+    await wait_refreshes(stale_results)
+    assert stale_results.stats()['failed_refreshes'] == 1
+    assert await stale_results.get('key', CoroutineMock(return_value='New')) == ('Old', 15)
+
+
+@pytest.mark.asyncio
+async def test_stale_while_revalidate_refresh_with_refresh_lookup(stale_results, clock):
+    stale_results.set('key', 'Old')
+    clock.now = 15
+    lookup = CoroutineMock(return_value='Lookup')
+    refresh = CoroutineMock(return_value='Refresh')
+    assert await stale_results.get('key', lookup, refresh=refresh) == ('Old', 15)
+    await wait_refreshes(stale_results)
+    lookup.assert_not_called()
+    assert await stale_results.get('key', lookup, refresh=refresh) == ('Refresh', 0)
+
+
+@pytest.mark.asyncio
+async def test_stale_while_revalidate_keep_only_accepted_values(clock):
+    stale_results = StaleWhileRevalidate(
+        soft_ttl=10, hard_ttl=100, max_entries=2, max_refreshes=1, keep=lambda value: value != 'Partial', clock=clock
+    )
+    assert await stale_results.get('one', CoroutineMock(return_value='Partial')) == ('Partial', 0)
+    assert stale_results.stats()['size'] == 0
+    stale_results.set('two', 'Complete')
+    clock.now = 15
+    assert await stale_results.get('two', CoroutineMock(return_value='Partial')) == ('Complete', 15)
+    await wait_refreshes(stale_results)
+    assert await stale_results.get('two', CoroutineMock()) == ('Complete', 15)
+
+
+@pytest.mark.asyncio
+async def test_stale_while_revalidate_raise_lookup_error_on_miss(stale_results):
+    with pytest.raises(ValueError):
+        await stale_results.get('key', CoroutineMock(side_effect=ValueError))
+    assert stale_results.stats()['size'] == 0
+    assert stale_results.stats()['failed_refreshes'] == 0
+
+
+@pytest.mark.asyncio
+async def test_stale_while_revalidate_close_cancel_refreshes(stale_results, clock):
+    stale_results.set('key', 'Old')
+    clock.now = 15
+    await stale_results.get('key', asyncio.Event().wait)
+    lookups = list(stale_results.lookups.values())
+    stale_results.close()
+    await asyncio.wait(lookups)
+    assert stale_results.stats()['refreshing'] == 0
+    assert stale_results.stats()['failed_refreshes'] == 0
+
+
+def test_stale_while_revalidate_evict_least_recently_used(stale_results):
+    stale_results.set('one', 'One')
+    stale_results.set('two', 'Two')
+    stale_results.set('three', 'Three')
+    assert list(stale_results.entries) == ['two', 'three']
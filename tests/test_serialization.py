@@ -0,0 +1,26 @@
+import orjson
+
+from crawler_api.serialization import dumps_batch_item, get_batch_item
+
+
+def test_get_batch_item_fill_defaults():
+    assert get_batch_item({'number': '1234567-69.1234.1.12.1234', 'error': 'Legal Process not found'}) == {
+        'number': '1234567-69.1234.1.12.1234',
+        'degrees': None,
+        'timed_out': [],
+        'failed': {},
+        'error': 'Legal Process not found'
+    }
+
+
+def test_get_batch_item_keep_result():
+    item = {'number': '1234567-69.1234.1.12.1234', 'degrees': ({'degree': '1º'},), 'timed_out': ['2º']}
+    assert get_batch_item(item) == {**item, 'failed': {}, 'error': None}
+
+
+def test_dumps_batch_item():
+    line = dumps_batch_item({'number': '1234567-69.1234.1.12.1234', 'degrees': ({'degree': '1º'},), 'timed_out': []})
+    assert line.endswith(b'\n')
+    assert orjson.loads(line) == {
+        'number': '1234567-69.1234.1.12.1234', 'degrees': [{'degree': '1º'}], 'timed_out': [], 'failed': {}, 'error': None
+    }
@@ -1,6 +1,6 @@
 import pytest
-from aiohttp import ClientSession
-from asynctest import CoroutineMock, Mock
+from aiohttp import ClientError, ClientSession, ClientTimeout
+from asynctest import CoroutineMock, MagicMock, Mock, call
 
 from crawler_api.session import HttpAsyncSession
 
@@ -34,3 +34,36 @@ def test_call_http_async_session(http_async_session):
 def test_assert_error_for_invalid_session_call_http_async_session(http_async_session):
     with pytest.raises(AssertionError):
         http_async_session().get(url='test')
+
+
+def test_start_http_async_session_with_connector_settings():
+    http_async_session = HttpAsyncSession(
+        limit=10, limit_per_host=5, keepalive_timeout=30, dns_cache_ttl=60, timeout=20, connect_timeout=2, read_timeout=5
+    )
+    http_async_session.start()
+    connector = http_async_session.session.connector
+    assert connector.limit == 10
+    assert connector.limit_per_host == 5
+    assert connector._keepalive_timeout == 30
+    assert connector._cached_hosts._ttl == 60
+    assert http_async_session.session.timeout == ClientTimeout(total=20, connect=2, sock_read=5)
+
+
+@pytest.mark.asyncio
+async def test_warm_up_http_async_session(http_async_session):
+    http_async_session.session = MagicMock()
+    response = http_async_session.session.head.return_value.__aenter__.return_value
+    response.release = CoroutineMock()
+    await http_async_session.warm_up(['https://one', 'https://two'], connections=2)
+    assert http_async_session.session.head.call_args_list == [
+        call('https://one'), call('https://one'), call('https://two'), call('https://two')
+    ]
+    assert response.release.call_count == 4
+
+
+@pytest.mark.asyncio
+async def test_warm_up_http_async_session_ignore_errors(http_async_session):
+    http_async_session.session = MagicMock()
+    http_async_session.session.head.return_value.__aenter__.side_effect = ClientError()
+    await http_async_session.warm_up(['https://one'])
+    http_async_session.session.head.assert_called_once_with('https://one')
@@ -0,0 +1,79 @@
+import random
+
+import pytest
+from pydantic import ValidationError
+
+from crawler_api.models.requests import LegalProcess
+from crawler_api.validation import INVALID_DIGIT, INVALID_FORMAT, VALID, validate_number, validate_numbers
+
+NUMBERS = [
+    '1234567-69.1234.1.12.1234',
+    '1234567-48.1234.1.02.1234',
+    '7654321-03.2020.8.12.0001',
+    '1234567-00.1234.1.12.1234',
+    '1234567-69.1234.1.12.12345',
+    '1234567-69.1234.1.12.123',
+    '1234567-69.1234.1.12.123a',
+    '1234567-69,1234.1.12.1234',
+    '1234567-69.1234.1.12.1234\n',
+    ' 234567-69.1234.1.12.1234',
+    '١٢٣٤٥٦٧-٦٩.١٢٣٤.١.١٢.١٢٣٤',
+    '١٢٣٤٥٦٧-٠٠.١٢٣٤.١.١٢.١٢٣٤',
+    '1234567-69.1234.1.12.123é',
+    '',
+]
+
+
+def random_number():
+    number, year, segment, unit, court = (random.randrange(10 ** size) for size in (7, 4, 1, 2, 4))
+    check_digit = 98 - int(f'{number:07}{year:04}{segment}{unit:02}{court:04}00') % 97
+    number = f'{number:07}-{check_digit:02}.{year:04}.{segment}.{unit:02}.{court:04}'
+    if random.random() < 0.5:
+        position = random.randrange(len(number))
+        number = number[:position] + random.choice('0123456789-.x٣') + number[position + 1:]
+    return number
+
+
+def get_validator_error(number):
+    try:
+        LegalProcess(number=number)
+    except ValidationError as error:
+        return error.errors()[0]['msg']
+    return None
+
+
+def test_validate_numbers_equals_legal_process_validators():
+    random.seed(97)
+    numbers = NUMBERS + [random_number() for _ in range(5000)]
+    validation = validate_numbers(numbers)
+    errors = [get_validator_error(number) for number in numbers]
+    assert validation.errors.tolist() == errors
+    assert validation.valid.tolist() == [error is None for error in errors]
+    assert validation.courts.tolist() == [
+        LegalProcess(number=number).court if error is None else None for number, error in zip(numbers, errors)
+    ]
+
+
+def test_validate_numbers_result():
+    validation = validate_numbers(['1234567-48.1234.1.02.1234', '1234', '١٢٣٤٥٦٧-٦٩.١٢٣٤.١.١٢.١٢٣٤'])
+    assert validation.valid.tolist() == [True, False, True]
+    assert validation.courts.tolist() == ['02', None, '١٢']
+    assert validation.errors.tolist() == [None, 'Invalid number format. Example: 1234567-12.1234.1.12.1234', None]
+
+
+def test_validate_numbers_empty():
+    validation = validate_numbers([])
+    assert validation.valid.tolist() == validation.courts.tolist() == validation.errors.tolist() == []
+
+
+@pytest.mark.parametrize(
+    'number, code',
+    (
+        ('1234567-69.1234.1.12.1234', VALID),
+        ('١٢٣٤٥٦٧-٦٩.١٢٣٤.١.١٢.١٢٣٤', VALID),
+        ('1234567-00.1234.1.12.1234', INVALID_DIGIT),
+        ('1234567-69.1234.1.12.123a', INVALID_FORMAT),
+    )
+)
+def test_validate_number(number, code):
+    assert validate_number(number) == code